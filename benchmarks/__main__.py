@@ -0,0 +1,94 @@
+"""
+Command line interface of the benchmarks. Run from the repository root.
+
+Running all cases and saving the results:
+
+    python -m benchmarks run --output results.json
+
+Comparing two results, e.g. of two commits. Exits with 1 if a case is slower by more than the threshold:
+
+    python -m benchmarks compare baseline.json results.json --threshold 10
+
+Running and comparing to a baseline in one step:
+
+    python -m benchmarks run --output results.json --baseline baseline.json
+"""
+
+import argparse
+import pathlib
+import sys
+
+from benchmarks import suite
+
+
+def _print_results(results: dict) -> None:
+    for name, value in results['results'].items():
+        print('{:<28}{:>12.3f} µs'.format(name, value * 1e6))
+
+
+def _print_comparison(rows: list, threshold: float) -> None:
+    print('{:<28}{:>12}{:>12}{:>10}'.format('case', 'baseline', 'current', 'change'))
+    for name, base, value, change, regression in rows:
+        if base is None:
+            print('{:<28}{:>12}{:>10.3f}µs{:>10}'.format(name, '-', value * 1e6, 'new'))
+            continue
+        flag = '  REGRESSION' if regression else ''
+        print('{:<28}{:>10.3f}µs{:>10.3f}µs{:>9.1f}%{}'.format(name, base * 1e6, value * 1e6, change, flag))
+    print('threshold: {}%'.format(threshold))
+
+
+def _compare(baseline: dict, current: dict, threshold: float) -> int:
+    rows, regressions = suite.compare(baseline, current, threshold=threshold)
+    _print_comparison(rows, threshold)
+    if regressions:
+        print('Regressions: {}'.format(', '.join(regressions)))
+        return 1
+    return 0
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='simplesi microbenchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='run the benchmarks')
+    run.add_argument('cases', nargs='*', help='the cases to run, all if omitted')
+    run.add_argument('--output', type=pathlib.Path, help='save the results to this JSON file')
+    run.add_argument('--baseline', type=pathlib.Path, help='compare the results to this JSON file')
+    run.add_argument('--threshold', type=float, default=10.0, help='regression threshold in percent')
+    run.add_argument('--repeat', type=int, default=5, help='runs per case, the best one is taken')
+    run.add_argument('--scale', type=float, default=1.0, help='multiplies the number of executions per run')
+
+    compare = commands.add_parser('compare', help='compare two results')
+    compare.add_argument('baseline', type=pathlib.Path)
+    compare.add_argument('current', type=pathlib.Path)
+    compare.add_argument('--threshold', type=float, default=10.0, help='regression threshold in percent')
+
+    commands.add_parser('list', help='list the cases')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        for name in suite.CASES:
+            print(name)
+        return 0
+
+    if args.command == 'compare':
+        return _compare(suite.load(args.baseline), suite.load(args.current), args.threshold)
+
+    unknown = [x for x in args.cases if x not in suite.CASES]
+    if unknown:
+        parser.error('unknown cases: {}'.format(', '.join(unknown)))
+
+    results = suite.run(names=args.cases or None, repeat=args.repeat, scale=args.scale)
+    if args.output is not None:
+        suite.save(results, args.output)
+
+    if args.baseline is not None:
+        return _compare(suite.load(args.baseline), results, args.threshold)
+
+    _print_results(results)
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,266 @@
+"""
+The microbenchmarks of simplesi.
+
+Every case is a timeit statement with its setup. The result of a case is the best of `repeat` runs,
+in seconds per execution of the statement.
+"""
+
+import contextlib
+import datetime
+import json
+import pathlib
+import platform
+import subprocess
+import timeit
+
+import simplesi
+
+ENVIRONMENTS_PATH = pathlib.Path(simplesi.__file__).parent / 'environments'
+
+# all shipped environment definitions, the settings and preferred units are not environments
+ENVIRONMENTS = sorted(x.stem for x in ENVIRONMENTS_PATH.glob('*.json') if not x.stem.startswith('_'))
+
+SETUP = """import simplesi as si
+si.environment(env_name='US_customary', replace=True)
+si.environment(env_name='structural', replace=False)
+si.environment.settings['to_fails'] = 'raise'
+import math
+x = 37 * si.mm
+y = 55 * si.mm
+z = 0
+F = 12.5 * si.kN
+"""
+
+SETUP_LOAD = """import simplesi as si
+from simplesi.environment import Environment
+"""
+
+# name: (statement, setup, number of executions per run)
+CASES = {
+    'arithmetic_chain': ("(z + x - y) / (x + y - z) * math.log(x / y)", SETUP, 20000),
+    'multiplication': ("x * F", SETUP, 50000),
+    'addition': ("x + y", SETUP, 50000),
+    'comparison': ("x < y", SETUP, 50000),
+    'to': ("F.to('N')", SETUP, 20000),
+    'str': ("str(F)", SETUP, 20000),
+    'str_auto': ("str(F)", SETUP + "si.environment.apply_preferences({})\nsi.environment.settings['print_unit'] = 'auto'\n",
+                 20000),
+    'dimensions': ("Dimensions(1, 1, -2, 0, 0, 0, 0)", SETUP + "from simplesi.dimensions import Dimensions", 50000),
+    'power': ("x ** 2", SETUP, 50000),
+    'sqrt': ("A.sqrt()", SETUP + "A = x * y", 50000),
+    'physrep': ("F('N')", SETUP, 20000),
+    'value_in': ("F.value_in('N')", SETUP, 50000),
+    'builtin_sum': ("sum(values)", SETUP + "values = [i * si.kN for i in range(1000)]", 200),
+    'si_fsum': ("si.fsum(values)", SETUP + "values = [i * si.kN for i in range(1000)]", 200),
+    'builtin_max': ("max(values)", SETUP + "values = [i * si.kN for i in range(1000)]", 200),
+    'si_max': ("si.max(values)", SETUP + "values = [i * si.kN for i in range(1000)]", 200),
+    'pickle': ("pickle.loads(pickle.dumps(values))",
+               SETUP + "import pickle\nvalues = [i * si.kN for i in range(1000)]", 200),
+    'parse': ("si.parse('12.5 kN*m/s')", SETUP, 20000),
+    'to_expression': ("F.to('kg*m/s^2')", SETUP, 20000),
+}
+
+SETUP_IO = SETUP + """import io
+from simplesi import io as si_io
+data = 'beam,span [m],load\\n' + ''.join('B{0},{0}.5,{0} kN/m\\n'.format(i) for i in range(1000))
+"""
+
+SETUP_EXPR = SETUP + """import numpy as np
+ex = si.expr.var('x', si.mm)
+ey = si.expr.var('y', si.mm)
+kernel = si.expr.compile((z + ex - ey) / (ex + ey - z) * si.expr.log(ex / ey))
+xs = si.PhysicalArray.from_unit(np.linspace(10, 100, 1000), si.mm)
+ys = [i * si.mm for i in range(10, 1010)]
+"""
+
+# arithmetic_chain compiled to a kernel: once, and for 1000 inputs as arrays and one by one
+CASES['expr_kernel'] = ("kernel(x, y)", SETUP_EXPR, 20000)
+CASES['expr_array'] = ("kernel(xs, y)", SETUP_EXPR, 200)
+CASES['chain_loop'] = ("[(z + a - y) / (a + y - z) * math.log(a / y) for a in ys]", SETUP_EXPR, 20)
+
+SETUP_CHECKED = SETUP + """
+@si.checked(inputs={'a': 'mm', 'b': 'mm'}, returns='mm')
+def checked(a, b):
+    return a + b
+"""
+
+CASES['checked_call'] = ("checked(x, y)", SETUP_CHECKED, 50000)
+
+SETUP_SWEEP = SETUP + """
+def moment(span, q):
+    return q * span ** 2 / 8
+spans = si.linspace(3 * si.m, 12 * si.m, 200)
+loads = si.linspace(1 * si.kN_m, 10 * si.kN_m, 50)
+"""
+
+# 10000 combinations: evaluated with arrays, and in a nested loop
+CASES['sweep'] = ("si.sweep(moment, span=spans, q=loads)", SETUP_SWEEP, 20)
+CASES['sweep_loop'] = ("[[moment(s, q) for q in loads] for s in spans]", SETUP_SWEEP, 2)
+
+SETUP_MATRIX = SETUP + """import numpy as np
+n = 200
+values = np.eye(n) * 4 - np.eye(n, k=1) - np.eye(n, k=-1)
+K = si.PhysicalMatrix.from_units(values, rows=['kN', 'kNm'] * (n // 2), columns=['1/m', '1'] * (n // 2))
+F = si.PhysicalVector.from_units(np.ones(n), ['kN', 'kNm'] * (n // 2))
+u = K.solve(F)
+"""
+
+# a system of 200 equations of forces and moments
+CASES['matrix_solve'] = ("K.solve(F)", SETUP_MATRIX, 200)
+CASES['matrix_product'] = ("K @ u", SETUP_MATRIX, 2000)
+
+SETUP_COMBINATIONS = SETUP + """import numpy as np
+rng = np.random.default_rng(0)
+cases = {name: si.PhysicalArray.from_unit(rng.normal(size=1000), si.kNm)
+         for name in ['G1', 'G2', 'Q1', 'Q2', 'Q3', 'W']}
+combinations = si.combinations.Combinations.leading(permanent={'G1': (1.35, 1.0), 'G2': (1.35, 1.0)},
+                                                    variable={'Q1': (1.5, 0.7), 'Q2': (1.5, 0.7), 'Q3': (1.5, 0.5),
+                                                              'W': (1.5, 0.6)})
+"""
+# the envelope of 64 combinations of 6 load cases at 1000 points
+CASES['envelope'] = ("si.combinations.envelope(cases, combinations)", SETUP_COMBINATIONS, 200)
+
+SETUP_SOLVE = SETUP + """def stress(h):
+    return 30 * si.kNm / (200 * si.mm * h ** 2 / 6)
+"""
+
+# a root of a dozen calls with Physical instances, an integral of several hundred calls of the compiled function
+CASES['solve'] = ("si.solve(stress, 10 * si.mm, 200 * si.mm, target=235 * si.MPa)", SETUP_SOLVE, 1000)
+CASES['integrate'] = ("si.integrate(stress, 10 * si.mm, 200 * si.mm)", SETUP_SOLVE, 200)
+CASES['integrate_compiled'] = ("si.integrate(stress, 10 * si.mm, 200 * si.mm, compile=True)", SETUP_SOLVE, 200)
+
+SETUP_MATH = SETUP + """import numpy as np
+angle = 30 * si.deg
+angles = si.PhysicalArray.from_unit(np.linspace(0, 90, 10000), si.deg)
+"""
+
+# the sine of an angle, and of 10000 angles in one call
+CASES['math_sin'] = ("si.math.sin(angle)", SETUP_MATH, 100000)
+CASES['math_sin_array'] = ("si.math.sin(angles)", SETUP_MATH, 1000)
+
+SETUP_TABLE = SETUP + """import numpy as np
+temperatures = si.PhysicalArray.from_unit(np.linspace(0, 100, 21), si.K)
+table = si.Table(temperatures, values=si.PhysicalArray.from_unit(np.linspace(1800, 280, 21), si.Pa * si.s),
+                 method='cubic')
+t = 37.5 * si.K
+queries = si.PhysicalArray.from_unit(np.linspace(0, 100, 10000), si.K)
+"""
+
+# a monotone cubic table of 21 breakpoints: one value, and 10000 values in one call
+CASES['table_lookup'] = ("table(t)", SETUP_TABLE, 100000)
+CASES['table_array'] = ("table(queries)", SETUP_TABLE, 1000)
+
+# reading 1000 rows of a header unit and a unit in the cells
+CASES['read_csv'] = ("for chunk in si_io.read_csv(io.StringIO(data)): pass", SETUP_IO, 20)
+
+for _name in ENVIRONMENTS:
+    # loading into a fresh environment
+    CASES['load_{}'.format(_name)] = (
+        "Environment(si_base_units=si.base_units, preferred_units={{}}, "
+        "settings=dict(si.environment_settings, cache=True))(env_name='{}')".format(_name), SETUP_LOAD, 20)
+
+# loading without the on-disk cache: parsing and checking the json file
+CASES['load_structural_uncached'] = (
+    "Environment(si_base_units=si.base_units, preferred_units={}, settings=dict(si.environment_settings, cache=False))"
+    "(env_name='structural')", SETUP_LOAD, 20)
+
+# loading only the definitions, the units are created on first access
+CASES['load_structural_lazy'] = (
+    "Environment(si_base_units=si.base_units, preferred_units={}, settings=dict(si.environment_settings, cache=True))"
+    "(env_name='structural', lazy=True)", SETUP_LOAD, 20)
+
+# reloading with replace=True into the environment of the module
+CASES['reload_replace'] = ("si.environment(env_name='structural', replace=True)", SETUP_LOAD, 20)
+
+# loading again without replace, only the changed units are processed
+CASES['reload_incremental'] = ("si.environment(env_name='structural')", SETUP_LOAD, 20)
+
+
+def _commit() -> str:
+    """The current git commit, if available"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+@contextlib.contextmanager
+def _restored_environment():
+    """Restores the settings and preferred units of simplesi.environment changed by the setup of a case"""
+    env = simplesi.environment
+    settings, preferred_units = dict(env.settings), env.preferred_units
+    try:
+        yield
+    finally:
+        # in place, the settings dict is shared with simplesi.environment_settings
+        env.settings.clear()
+        env.settings.update(settings)
+        env.apply_preferences(preferred_units)
+
+
+def run(names: list = None, repeat: int = 5, scale: float = 1.0) -> dict:
+    """
+    Runs the cases and returns the results with some information about the run.
+
+    :param names: the cases to run, all if None
+    :param repeat: number of runs per case, the best one is taken
+    :param scale: multiplies the number of executions per run
+    """
+    names = list(CASES) if names is None else names
+
+    results = {}
+    for name in names:
+        stmt, setup, number = CASES[name]
+        number = max(1, int(number * scale))
+        with _restored_environment():
+            best = min(timeit.repeat(stmt=stmt, setup=setup, number=number, repeat=repeat))
+        results[name] = best / number
+
+    return {
+        'meta': {
+            'commit': _commit(),
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'simplesi': simplesi.__version__,
+            'repeat': repeat,
+            'scale': scale,
+        },
+        'results': results,
+    }
+
+
+def save(results: dict, path: pathlib.Path) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=4)
+
+
+def load(path: pathlib.Path) -> dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(baseline: dict, current: dict, threshold: float = 10.0) -> tuple:
+    """
+    Compares two results case by case.
+
+    :param threshold: a case is a regression if it is slower than the baseline by more than this percentage
+    :return: rows of (name, baseline, current, change in percent, regression) and the names of the regressions
+    """
+    rows = []
+    regressions = []
+    for name, value in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            # a new case, nothing to compare to
+            rows.append((name, None, value, None, False))
+            continue
+
+        change = (value - base) / base * 100
+        regression = change > threshold
+        if regression:
+            regressions.append(name)
+        rows.append((name, base, value, change, regression))
+
+    return rows, regressions
@@ -0,0 +1,72 @@
+"""
+Per-operation cost of validating vs trusted construction of the results of operations.
+
+The workload is the one from main.py. Run from the repository root:
+
+    python -m benchmarks.trusted_construction
+"""
+
+import timeit
+
+import simplesi as si
+from simplesi import Physical
+
+SETUP = """import simplesi as si
+si.environment(env_name='US_customary')
+si.environment(env_name='structural', replace=False)
+import math
+import random"""
+
+WORKLOAD = """
+x = random.randint(1, 100) * si.mm
+y = random.randint(1, 100) * si.mm
+z = 0
+
+def f(x, y, z):
+    _ret = (z + x - y) / (x + y - z) * math.log(x/y)
+
+f(x, y, z)
+"""
+
+# number of operations creating a Physical in the workload: 2 multiplications, 2 additions, 2 subtractions
+OPERATIONS = 6
+
+NUMBER = 100000
+REPEAT = 5
+
+
+def _validating(cls, value, dimensions, conv_factor, symbol):
+    # the results of the operations created as before: through __init__, with all checks
+    return cls(value, dimensions, conv_factor, symbol)
+
+
+def measure() -> dict:
+    """Best of REPEAT runs of the workload, in microseconds per operation"""
+
+    def run():
+        return min(timeit.repeat(setup=SETUP, stmt=WORKLOAD, number=NUMBER, repeat=REPEAT)) / NUMBER / OPERATIONS * 1e6
+
+    results = {'trusted': run()}
+
+    trusted = Physical.__dict__['_trusted']
+    Physical._trusted = classmethod(_validating)
+    try:
+        results['validating'] = run()
+    finally:
+        Physical._trusted = trusted
+
+    si.environment.settings['validation'] = 'trusted'
+    try:
+        results['trusted, no input validation'] = run()
+    finally:
+        si.environment.settings['validation'] = 'strict'
+
+    return results
+
+
+if __name__ == '__main__':  # pragma: no cover
+    results = measure()
+    for name, value in results.items():
+        print('{:<32}{:.3f} µs/operation'.format(name, value))
+    saving = results['validating'] - results['trusted']
+    print('{:<32}{:.3f} µs/operation ({:.0%})'.format('saving', saving, saving / results['validating']))
@@ -9,9 +9,14 @@ from __future__ import annotations
 
 __version__ = "0.1"
 
-import math
+import builtins
+import contextlib
+import contextvars
+import math as _math
 import pprint
+import sys
 
+from simplesi import stats
 from simplesi.dimensions import Dimensions
 
 RE_TOL = 1e-9
@@ -42,16 +47,23 @@ class Physical:
         :param conv_factor: number of base SI units in this unit. e.g. 1 ft = 0.3048 m -> conv_factor = 0.3048
         :param symbol: the symbol of the unit for pretty printing, e.g. cubic meter: 'm³'
         """
+        env = _current_environment.get(environment)
 
         # being strict about the input makes life easier later
-        if not isinstance(value, NUMBER):
-            raise ValueError("Value must be a number, you have {}.".format(type(value)))
+        # validation can be switched off by the setting 'validation' once the input is known to be correct
+        if env.settings.get('validation') != 'trusted':
+            if not isinstance(value, NUMBER):
+                raise ValueError("Value must be a number, you have {}.".format(type(value)))
+
+            if not isinstance(conv_factor, NUMBER):
+                raise ValueError("Conversion factor must be a number, you have {}.".format(type(conv_factor)))
 
-        if not isinstance(conv_factor, NUMBER):
-            raise ValueError("Conversion factor must be a number, you have {}.".format(type(conv_factor)))
+            if conv_factor <= 0:
+                raise ValueError("Conversion factor must be positive, you have {}.".format(conv_factor))
 
-        if conv_factor <= 0:
-            raise ValueError("Conversion factor must be positive, you have {}.".format(conv_factor))
+        # the dimension algebra works on the interned Dimensions only
+        if not isinstance(dimensions, Dimensions):
+            dimensions = Dimensions(*dimensions)
 
         # # use a scalar if you have no dimensions
         # if dimensions.dimensionsless:
@@ -62,18 +74,29 @@ class Physical:
         self.conv_factor = conv_factor
         self.symbol = symbol
 
+    @classmethod
+    def _trusted(cls, value, dimensions: Dimensions, conv_factor, symbol):
+        """
+        Creates an instance without any checks.
+        Used for the results of operations, whose operands were already validated.
+        """
+        self = object.__new__(cls)
+        self.value = value
+        self.dimensions = dimensions
+        self.conv_factor = conv_factor
+        self.symbol = symbol
+        return self
+
     def __call__(self, unit: str = None) -> PhysRep:
         """Returns the value in the given unit as a PhysRep instance"""
         if unit is None:
-            unit = self.get_preferred_units()
-            if unit is None:
-                _, unit = split_str(str(self))
-                # raise ValueError("No preferred unit found for the dimensions {}, can't provide PhysRep.".format(self.dimensions))
+            unit = self._print_unit()
         return self._repr(unit)
 
     @classmethod
     def as_str(cls, value: NUMBER) -> str:
         """Returns the value as a string with N significant digits"""
+        env = _current_environment.get(environment)
 
         if not isinstance(value, NUMBER):
             raise ValueError("Value must be a number, you have {}.".format(type(value)))
@@ -84,9 +107,9 @@ class Physical:
 
         # it is truly a float
         # formatting to N significant digits
-        _ret1 = '{:.{}g}'.format(value, environment.settings.get('significant_digits'))
+        _ret1 = '{:.{}g}'.format(value, env.settings.get('significant_digits'))
         # formatting to at least 2 deciman spaces
-        _ret2 = '{:.{}f}'.format(value, min(2, environment.settings.get('significant_digits')))
+        _ret2 = '{:.{}f}'.format(value, builtins.min(2, env.settings.get('significant_digits')))
 
         # making sure scientific notation does not kick in
         if any(x in _ret1 for x in '+-'):
@@ -96,12 +119,15 @@ class Physical:
         return sorted([_ret1, _ret2], key=lambda x: len(x))[-1]
 
     def get_preferred_units(self):
-        unit = {k for k, v in environment.preferred_units.items() if v == self.dimensions}
-        unit = unit.pop() if unit else None
-        return unit
+        return _current_environment.get(environment).preferred_unit(self.dimensions)
 
     def __str__(self):
         """A pretty print of the Physical instance"""
+        return self.to(self._print_unit())
+
+    def _print_unit(self) -> str:
+        """The unit to print the Physical instance in, if no unit is given"""
+        env = _current_environment.get(environment)
 
         # checking if there is a preferred unit for the dimensions
         unit = self.get_preferred_units()
@@ -109,23 +135,31 @@ class Physical:
         # if there is no preferred unit, use the smallest or largest available from the environment
         if unit is None:
             # possible units, ascending order
-            unit = tuple(
-                k for k, v in sorted(self.all_units.items(), key=lambda x: x[1].get('Value') * x[1].get('Factor')) if
-                v.get('Dimension') == self.dimensions)
+            units = env.units_by_scale(self.dimensions)
 
-            if not unit:
+            if not units:
+                # e.g. parsed from a unit expression, printed as given
+                if self.symbol is not None and env.find_unit(self.dimensions, self.symbol) is not None:
+                    return self.symbol
                 raise ValueError('No units found for the dimensions {}.'.format(self.dimensions))
 
             # using the unit as set
-            printsetting = environment.settings.get('print_unit', None)
+            printsetting = env.settings.get('print_unit', None)
             if printsetting == 'smallest':
-                unit = unit[0]
+                unit = units[0][0]
             elif printsetting == 'largest':
-                unit = unit[-1]
+                unit = units[-1][0]
+            elif printsetting == 'auto':
+                # the unit that shows the value as a readable number
+                unit = env.scaled_unit(self.dimensions, self._magnitude())
             else:
-                unit = unit[0]
+                unit = units[0][0]
 
-        return self.to(unit)
+        return unit
+
+    def _magnitude(self) -> float:
+        """The absolute value in SI units, used to choose the unit to print in"""
+        return abs(self.value)
 
     def __repr__(self):
         """
@@ -144,21 +178,30 @@ class Physical:
     @property
     def all_units(self):
         """Returns an environment-like dict made from environment.environment and the base si units"""
-        # the base SI units
-        env = {k: {'Dimension': v.dimensions, 'Factor': v.conv_factor, 'Symbol': k, "Value": v.value} for k, v in
-               environment.si_base_units.items()}
-        env.update(environment.environment)
-        return env
+        return _current_environment.get(environment).all_units
 
     def _repr(self, unit: str) -> PhysRep:
         """
         Representation of the Physical instance in the given unit, as a pair of value, unit.
         THIS IS NOT A SRTING, but a glorified NamedTuple.
         """
-        u = self.to(unit)  # getting the string representation
-        rep = split_str(u)  # splitting it into value and unit, both strings
+        env = _current_environment.get(environment)
+        _, definition = env.resolve_unit(self.dimensions, unit)
+
+        return PhysRep(self.value / (definition['Value'] * definition['Factor']), definition['Symbol'])
+
+    def value_in(self, unit: str) -> float:
+        """
+        The value in the given unit as a float, e.g. (1 * si.m).value_in('mm') = 1000.0
 
-        return PhysRep(*rep)
+        Unlike to(), the value is not rounded and a ValueError is raised if the unit is not available,
+        regardless of the setting 'to_fails'.
+
+        :param unit: from the environment either the key or the symbol of a unit
+        """
+        env = _current_environment.get(environment)
+        _, definition = env.resolve_unit(self.dimensions, unit)
+        return self.value / (definition['Value'] * definition['Factor'])
 
     def to(self, unit: str = None) -> str:
         """
@@ -174,20 +217,20 @@ class Physical:
         :param unit: from the environment either the key or the symbol of a unit
         :return:
         """
+        env = _current_environment.get(environment)
 
         def print_or_raise():
             # either print it or raise an exception, based on the setting
-            if environment.settings.get('to_fails') == 'print':
+            if stats.enabled:
+                stats.record('to.failed')
+            if env.settings.get('to_fails') == 'print':
                 # print it by the dimensions
                 # results something like 1.73 kg⁰‧⁵ × m⁰‧⁵ × s⁻¹‧⁰
                 _ret = []
-                for u, ex in zip(environment.si_base_units.keys(), self.dimensions):  # SI base unit, exponent
+                for u, ex in zip(env.si_base_units.keys(), self.dimensions):  # SI base unit, exponent
                     # getting rid of unnecessary zeros
-                    try:
-                        ex.is_integer()
-                        ex = int(ex)
-                    except AttributeError:
-                        pass
+                    if not isinstance(ex, int):  # fractional exponents are shown as decimals
+                        ex = float(ex)
                     if ex == 0:  # u^ex = 1 removed
                         continue
                     elif ex == 1:  # ex = 1 -> simply the SI base unit
@@ -209,82 +252,54 @@ class Physical:
                 return self.as_str(self.value) + ' \u00d7 '.join(_ret)
                 return "{} ".format(self.value) + ' \u00d7 '.join(_ret)
 
-            elif environment.settings.get('to_fails') == 'raise':
+            elif env.settings.get('to_fails') == 'raise':
 
                 raise ValueError(
                     'Conversion not possible. Possible values to use are: {}'.format(
-                        possible_units))
-
-        value = self.value
-
-        # looking for the units in the environment that have the same dimensionality
-        env = self.all_units
-        units_same_dims = {k: v for k, v in env.items() if v['Dimension'] == self.dimensions}
-
-        # going over the units with same dims, looking for the desired unit in the keys and symbols
-        keys = list(units_same_dims.keys())
-        symbols = list(x.get('Symbol') for x in units_same_dims.values())
-        keys_and_symbols = sorted(set(keys + symbols))
-        possible_units = ', '.join('"{}"'.format(x) for x in keys_and_symbols)
+                        env.possible_units(self.dimensions)))
 
         # there is a unit given as argument to print self in
         if unit is not None:  # a unit is provided to print self in
+            # looking for the unit among the keys and symbols of the units with the same dimensionality
+            found = env.find_unit(self.dimensions, unit)
+
             # the unit is not found in the environment
-            if unit not in keys_and_symbols:
+            if found is None:
+                if stats.enabled:
+                    stats.record('to.failed')
 
                 # either print the value or raise an exception
-                # either print the value or raise an exceptionprint
-                if environment.settings.get('to_fails') == 'raise':
+                # the list of possible units is built only on this failure path
+                if env.settings.get('to_fails') == 'raise':
                     raise ValueError(
                         'Conversion not possible. Possible values to use are: {}'.format(
-                            possible_units))
-                elif environment.settings.get('to_fails') == 'print':
+                            env.possible_units(self.dimensions)))
+                elif env.settings.get('to_fails') == 'print':
                     print(
                         'Conversion not possible. Possible values to use are: {}'.format(
-                            possible_units))
+                            env.possible_units(self.dimensions)))
 
             else:  # the requested unit was found
-                # finding the requested unit
-                available = {k: v for k, v in units_same_dims.items() if v.get('Symbol') == unit or k == unit}
-
-                # is the requested unit available? If not, give the possible alternatives
-                if not available:
-                    _list = ', '.join(['"{}"'.format(v.get('Symbol', k)) for k, v in units_same_dims.items()])
-                    print('No unit for conversion defined. Compatible units are: {}'.format(_list))
-                    return
-
-                # this should not be possible for many reasons but still
-                if len(available) > 1:
-                    raise ValueError(
-                        'More than one unit found for the given dimensions. This means, symbols and keys in the environment are used multiple times.')
-
-                # finally, the unit is found and we are sure there is only one
-                # but maybe we found it by the symbol -> let's find the unit
-                if available.get(unit, None) is None:
-                    unit = list(available.keys())[0]
-
-                # last check: if the unit is found, but the value is missing, raise an error
-                # this should not happen as we check for the existence of the value in the environment but still
+                _, definition = found
 
-                _value = available[unit].get('Value', 1)
-                _factor = available[unit].get('Factor', 1)
-                _symbol = available[unit].get('Symbol', '')
+                divider = definition['Value'] * definition['Factor']
+                new_value = self.value / divider
 
-                divider = _value * _factor
-                new_value = value / divider
-
-                return '{} {}'.format(self.as_str(new_value), _symbol)
+                return '{} {}'.format(self.as_str(new_value), definition['Symbol'])
 
         else:  # no unit is provided to print self in
 
             # no units available in the environment
-            if not units_same_dims:
+            if not env.units_by_scale(self.dimensions):
                 # either print the value or raise an exception
                 return print_or_raise()
 
             # there are some units available, list them.
             else:
-                if environment.settings.get('to_fails') == 'raise':
+                if stats.enabled:
+                    stats.record('to.failed')
+                possible_units = env.possible_units(self.dimensions)
+                if env.settings.get('to_fails') == 'raise':
                     raise ValueError('Conversion not possible. Possible values to use are: {}'.format(possible_units))
                 else:
                     return 'Conversion not possible. Possible values to use are: {}'.format(possible_units)
@@ -314,11 +329,19 @@ class Physical:
             (self.value, self.dimensions, self.conv_factor)
         )
 
+    def __reduce__(self):
+        # compact: no slot names, the default conversion factor and symbol are left out.
+        # the interned Dimensions are written once per pickle and referenced by the others
+        if self.conv_factor == 1.0 and self.symbol is None:
+            return _unpickle, (self.value, self.dimensions)
+        return _unpickle, (self.value, self.dimensions, self.conv_factor, self.symbol)
+
     def __round__(self, n=None):
+        env = _current_environment.get(environment)
         if n is None:
-            n = environment.settings.get('significant_digits')
+            n = env.settings.get('significant_digits')
 
-        return Physical(round(self.value, n), self.dimensions, self.conv_factor, self.symbol)
+        return Physical._trusted(round(self.value, n), self.dimensions, self.conv_factor, self.symbol)
 
     def __contains__(self, other):
         return False
@@ -330,14 +353,14 @@ class Physical:
 
         # comparison between Physical and a zero
         if isinstance(other, NUMBER) and other == 0:
-            return math.isclose(self.value, 0, rel_tol=RE_TOL, abs_tol=ABS_TOL)
+            return _math.isclose(self.value, 0, rel_tol=RE_TOL, abs_tol=ABS_TOL)
 
         # otherwise only compare between Physical instances
         self._check_other(other, "__eq__")
 
         # comparable dimensions
         if self.dimensions == other.dimensions:
-            return math.isclose(self.value, other.value, rel_tol=RE_TOL, abs_tol=ABS_TOL)
+            return _math.isclose(self.value, other.value, rel_tol=RE_TOL, abs_tol=ABS_TOL)
 
         else:
             raise ValueError(
@@ -426,7 +449,7 @@ class Physical:
             new_value = self.value + other.value
             new_factor = self.conv_factor
 
-            return Physical(
+            return Physical._trusted(
                 new_value,
                 self.dimensions,
                 new_factor,
@@ -463,7 +486,7 @@ class Physical:
             new_value = self.value - other.value
             new_factor = self.conv_factor
 
-            return Physical(
+            return Physical._trusted(
                 new_value,
                 self.dimensions,
                 new_factor,
@@ -481,7 +504,7 @@ class Physical:
         # only subtracting from 0 is allowed.
         if isinstance(other, NUMBER):
             if other == 0:
-                return Physical(
+                return Physical._trusted(
                     -self.value,
                     self.dimensions,
                     self.conv_factor,
@@ -505,25 +528,29 @@ class Physical:
 
         # multiplying by a number e.g. 2 * si.m
         if isinstance(other, NUMBER):
-            return Physical(
+            return Physical._trusted(
                 self.value * other,
                 self.dimensions,
                 self.conv_factor,
                 self.symbol,
             )
 
+        # the vectors and matrices of quantities multiply themselves, e.g. si.kN * vector
+        if isinstance(other, _SCALED_BY_PHYSICAL):
+            return NotImplemented
+
         # compare only between Physical instances
         self._check_other(other, "__mul__")
 
         # multiplying by another Physical instance, e.g. si.N * si.m
-        new_dims = Dimensions(*[x + y for x, y in zip(self.dimensions, other.dimensions)])
+        new_dims = self.dimensions.multiply(other.dimensions)
         new_value = self.value * other.value
 
         # if the result is dimensionless, the value is returned
         if new_dims.dimensionsless:
             return new_value
         else:
-            return Physical(new_value, new_dims)
+            return Physical._trusted(new_value, new_dims, 1.0, None)
 
     def __imul__(self, other):
         raise ValueError(
@@ -541,7 +568,7 @@ class Physical:
                 raise ZeroDivisionError("Cannot divide by zero.")
 
             # division by a number e.g. 5 * si.m / 2 = 2.5 * si.m
-            return Physical(
+            return Physical._trusted(
                 self.value / other,
                 self.dimensions,
                 self.conv_factor,
@@ -552,7 +579,7 @@ class Physical:
         self._check_other(other, "__truediv__")
 
         # division by a Physical instance e.g. 5 * si.m / 2 * si.m = 2.5
-        new_dims = Dimensions(*[x - y for x, y in zip(self.dimensions, other.dimensions)])
+        new_dims = self.dimensions.divide(other.dimensions)
         try:
             new_value = self.value / other.value
         except ZeroDivisionError:
@@ -562,15 +589,15 @@ class Physical:
         if new_dims.dimensionsless:
             return new_value
         else:
-            return Physical(new_value, new_dims)
+            return Physical._trusted(new_value, new_dims, 1.0, None)
 
     def __rtruediv__(self, other):
 
         if isinstance(other, NUMBER):
 
-            return Physical(
+            return Physical._trusted(
                 other / self.value,
-                Dimensions(*[-x for x in self.dimensions]),
+                self.dimensions.power(-1),
                 self.conv_factor,
                 self.symbol,
             )
@@ -592,11 +619,15 @@ class Physical:
 
             new_value = self.value ** other
 
-            new_dimensions = Dimensions(*[x * other for x in self.dimensions])
+            new_dimensions = self.dimensions.power(other)
             if new_dimensions.dimensionsless:
                 return new_value
 
-            return Physical(new_value, new_dimensions)
+            # a negative value to a fractional power is complex, which __init__ used to reject
+            if not isinstance(new_value, NUMBER):
+                raise ValueError("Value must be a number, you have {}.".format(type(new_value)))
+
+            return Physical._trusted(new_value, new_dimensions, 1.0, None)
 
         else:
             raise ValueError(
@@ -620,28 +651,20 @@ class Physical:
         """
         return self ** (1 / n)
 
-    def _trigfcn(self, fcn: str):
-        """Tries to import fcn from the math module"""
-        import importlib
-        math_module = importlib.import_module('math')
-        fcn = getattr(math, fcn)
-        if fcn is None:
-            raise ValueError("{!r} not found in the math module".format(fcn))
-
-        if self.symbol == 'rad':
-            return fcn(self.value)
-        elif self.symbol == '°':
-            return fcn(math.radians(self.value))
-        else:
-            raise ValueError('Use radian or degree, not "{}"'.format(self.symbol))
-
     @property
     def sin(self):
-        return self._trigfcn('sin')
+        """The sine of the angle, see simplesi.math.sin()"""
+        return math.sin(self)
 
     @property
     def cos(self):
-        return self._trigfcn('cos')
+        """The cosine of the angle, see simplesi.math.cos()"""
+        return math.cos(self)
+
+
+def _unpickle(value, dimensions: Dimensions, conv_factor=1.0, symbol=None) -> Physical:
+    """Creates the unpickled Physical, see Physical.__reduce__"""
+    return Physical._trusted(value, dimensions, conv_factor, symbol)
 
 
 class PhysRep:
@@ -680,7 +703,8 @@ class PhysRep:
         self.unit = unit
 
     def __str__(self):
-        val = round(self.value, environment.settings.get('significant_digits'))
+        env = _current_environment.get(environment)
+        val = round(self.value, env.settings.get('significant_digits'))
         return '{} {}'.format(val, self.unit)
 
     def __repr__(self):
@@ -724,17 +748,17 @@ class PhysRep:
     @property
     def physical(self):
         """Returns a physical of the same value and unit"""
+        env = _current_environment.get(environment)
 
-        keys = environment.namespace_module.__dict__.keys()
-        new_unit = [x for x in keys if x == self.unit]
-        if not new_unit:
-            raise ValueError('unit {} is not defined in the environment'.format(self.unit))
-        elif len(new_unit) > 1:
-            raise ValueError('unit {} is defined multiple times in the environment'.format(self.unit))
-        else:
-            new_unit = new_unit[0]
+        new_unit = env.physical(self.unit)
+        if new_unit is None:
+            # maybe an expression of units, e.g. 'kN/m^2'
+            try:
+                new_unit = parse_unit(self.unit)
+            except ValueError:
+                raise ValueError('unit {} is not defined in the environment'.format(self.unit)) from None
 
-        return self.value * environment.namespace_module.__dict__[new_unit]
+        return self.value * new_unit
 
 
 def split_str(physical: str) -> tuple[float, str]:
@@ -743,6 +767,62 @@ def split_str(physical: str) -> tuple[float, str]:
     return float(value), unit
 
 
+def values_in(physicals, unit: str) -> list[float]:
+    """
+    The values of the Physical instances in the given unit, as floats.
+
+    All instances must have the same dimensions. The unit is looked up only once.
+    """
+    env = _current_environment.get(environment)
+    physicals = list(physicals)
+    if not physicals:
+        return []
+
+    dimensions = physicals[0].dimensions
+    _, definition = env.resolve_unit(dimensions, unit)
+    divider = definition['Value'] * definition['Factor']
+
+    values = []
+    for physical in physicals:
+        # Dimensions are interned, identity is equality
+        if physical.dimensions is not dimensions:
+            raise ValueError('All Physical instances must have the same dimensions.')
+        values.append(physical.value / divider)
+
+    return values
+
+
+def parse_unit(expression: str):
+    """
+    The unit given by an expression of the units of the environment, e.g. parse_unit('kN/m^2').
+
+    The expression is compiled only once, later calls with the same expression are a dict lookup.
+    A float is returned if the expression is dimensionsless, e.g. 'mm/m'. See simplesi.parsing for the grammar.
+    """
+    env = _current_environment.get(environment)
+    compiled = env.compile_unit(expression)
+    if compiled.dimensions.dimensionsless:
+        return compiled.factor
+    return Physical._trusted(compiled.factor, compiled.dimensions, 1.0, compiled.symbol)
+
+
+def parse(quantity: str):
+    """
+    The Physical given as a value and a unit expression, e.g. parse('12.5 kN*m/s').
+
+    Without a unit the value is returned as a float. See parse_unit().
+    """
+    env = _current_environment.get(environment)
+    value, expression = parsing.split_quantity(quantity)
+    if not expression:
+        return value
+
+    compiled = env.compile_unit(expression)
+    if compiled.dimensions.dimensionsless:
+        return value * compiled.factor
+    return Physical._trusted(value * compiled.factor, compiled.dimensions, 1.0, compiled.symbol)
+
+
 def justvalue(physical: str) -> float:
     """
     Given a string representation of the Physical instance, returns the value
@@ -754,14 +834,15 @@ def justvalue(physical: str) -> float:
 
 
 # The seven SI base units
+# these are created before the environment, hence without validation (and the settings to decide about it)
 base_units = {
-    "kg": Physical(1, Dimensions(1, 0, 0, 0, 0, 0, 0)),
-    "m": Physical(1, Dimensions(0, 1, 0, 0, 0, 0, 0)),
-    "s": Physical(1, Dimensions(0, 0, 1, 0, 0, 0, 0)),
-    "A": Physical(1, Dimensions(0, 0, 0, 1, 0, 0, 0)),
-    "cd": Physical(1, Dimensions(0, 0, 0, 0, 1, 0, 0)),
-    "K": Physical(1, Dimensions(0, 0, 0, 0, 0, 1, 0)),
-    "mol": Physical(1, Dimensions(0, 0, 0, 0, 0, 0, 1)),
+    "kg": Physical._trusted(1, Dimensions(1, 0, 0, 0, 0, 0, 0), 1.0, None),
+    "m": Physical._trusted(1, Dimensions(0, 1, 0, 0, 0, 0, 0), 1.0, None),
+    "s": Physical._trusted(1, Dimensions(0, 0, 1, 0, 0, 0, 0), 1.0, None),
+    "A": Physical._trusted(1, Dimensions(0, 0, 0, 1, 0, 0, 0), 1.0, None),
+    "cd": Physical._trusted(1, Dimensions(0, 0, 0, 0, 1, 0, 0), 1.0, None),
+    "K": Physical._trusted(1, Dimensions(0, 0, 0, 0, 0, 1, 0), 1.0, None),
+    "mol": Physical._trusted(1, Dimensions(0, 0, 0, 0, 0, 0, 1), 1.0, None),
 }
 
 # # preferred units
@@ -784,15 +865,101 @@ preferred_units = {
 environment_settings = {
     'to_fails': 'print',  # raise, print
     'significant_digits': 3,
-    'print_unit': 'smallest',  # smallest, largest
-    # 'print_unit': 'largest',  # smallest, largest
+    'print_unit': 'smallest',  # smallest, largest, auto
+    # 'print_unit': 'largest',  # smallest, largest, auto
+    'validation': 'strict',  # strict, trusted
+    'cache': False,  # use the on-disk cache of the environment files
 }
 # import json
 # with open('_settings.json', 'w', encoding='utf-8') as f:
 #     json.dump(environment_settings, f, ensure_ascii=True, indent=4)
 
+from simplesi import parsing
 from simplesi.environment import Environment
 
 environment = Environment(si_base_units=base_units,
                           preferred_units=preferred_units,
                           settings=environment_settings)
+
+# the environment of the current thread or asyncio task, if set by use_environment()
+_current_environment = contextvars.ContextVar('simplesi_environment')
+
+
+def current_environment() -> Environment:
+    """The environment used in the current context: the one set by use_environment(), else simplesi.environment"""
+    return _current_environment.get(environment)
+
+
+@contextlib.contextmanager
+def use_environment(env: Environment = None, settings: dict = None, preferred_units: dict = None):
+    """
+    Uses an immutable snapshot of the environment in the current context, i.e. the thread or asyncio task.
+
+    Other threads and tasks are not affected, so they can print and convert with different settings in parallel,
+    without locking. The snapshot is not changed by loading units into the environment later, see Environment.snapshot().
+
+    with si.use_environment(settings={'significant_digits': 5}, preferred_units={'kNm': [1, 2, -2, 0, 0, 0, 0]}):
+        print(moment)
+
+    :param env: the environment to use, by default the current one
+    :param settings: settings changed in the snapshot
+    :param preferred_units: the preferred units of the snapshot
+    :return: the snapshot
+    """
+    snapshot = (env or current_environment()).snapshot(settings=settings, preferred_units=preferred_units)
+    token = _current_environment.set(snapshot)
+    try:
+        yield snapshot
+    finally:
+        _current_environment.reset(token)
+
+
+def set_environment(env: Environment) -> Environment:
+    """
+    Publishes the environment as simplesi.environment, used by all contexts without use_environment().
+
+    The environment is replaced in a single assignment, so readers in other threads see either the old or the new one.
+    env stays a mutable environment: units can be loaded and settings changed later, as with simplesi.environment.
+    Loading units by calling env pushes them to the simplesi namespace right away, an environment made from the unit
+    definitions, Environment(environment=...), does not change the namespace until its units are used. Returns env.
+    """
+    global environment
+    if env.frozen:
+        raise ValueError('A snapshot can not be published, it can not be changed. Publish a new Environment instead.')
+    environment = env
+    return env
+
+
+def __getattr__(name: str):
+    """The units of a lazily loaded environment are created on first access, e.g. si.kN"""
+    _environment = globals().get('environment')
+    unit = None if _environment is None or name.startswith('__') else _environment.physical(name)
+    if unit is None:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+    # cached in the module, the next access does not get here
+    if _environment.namespace_module is sys.modules[__name__]:
+        globals()[name] = unit
+    return unit
+
+
+def __dir__():
+    return sorted(set(globals()) | set(environment.all_units))
+
+
+from simplesi.arrays import PhysicalArray
+from simplesi.matrix import PhysicalMatrix, PhysicalVector
+
+# Physical.__mul__ leaves the product with these to their __rmul__
+_SCALED_BY_PHYSICAL = (PhysicalVector, PhysicalMatrix)
+from simplesi.tables import Table
+
+# these shadow the builtins of the same name in this module, see simplesi.reductions
+from simplesi.reductions import sum, fsum, mean, min, max, argmin, argmax, argsort, sort
+from simplesi.parallel import parallel_map
+from simplesi.checking import checked
+from simplesi.sweep import sweep, linspace
+from simplesi.solvers import solve, integrate, minimize
+from simplesi import expr, combinations
+# the mathematical functions of Physical instances, the math module of the standard library is _math
+from simplesi import math
@@ -0,0 +1,340 @@
+"""
+Arrays of physical quantities of the same dimensions.
+
+A PhysicalArray holds one Dimensions and a NumPy float buffer of the values in SI units.
+The dimensions are checked once per operation, the values are handled by NumPy.
+
+>>> import numpy as np
+>>> import simplesi as si
+>>> si.environment(env_name='structural')
+>>> spans = si.PhysicalArray.from_unit([3, 4.5, 6], si.m)
+>>> q = 1.5 * si.kN_m
+>>> moments = q * spans ** 2 / 8
+>>> moments.to('kNm')
+array([1.6875  , 3.796875, 6.75    ])
+>>> print(moments)
+[1.69, 3.80, 6.75] kNm
+
+NumPy is an optional dependency, it is needed only to use PhysicalArray.
+"""
+
+from __future__ import annotations
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from simplesi import Physical, NUMBER, RE_TOL, ABS_TOL, current_environment, stats
+from simplesi.dimensions import Dimensions
+
+# operands that scale the values without changing the dimensions
+SCALARS = NUMBER if np is None else NUMBER + (np.ndarray,)
+
+
+class PhysicalArray(Physical):
+    """
+    An array of physical quantities with the same dimensions.
+
+    The value is a NumPy float array of the values in SI units, the other attributes are the same as of Physical.
+    Being a subclass of Physical, operations with a Physical as the left operand are handled by PhysicalArray,
+    with the Physical broadcast over the array.
+
+    If an operation yields a dimensionsless result, a NumPy array is returned.
+    """
+
+    __slots__ = ()
+
+    # NumPy arrays as left operand leave the operation to PhysicalArray
+    __array_ufunc__ = None
+
+    def __init__(
+            self,
+            value,
+            dimensions: Dimensions,
+            conv_factor: float = 1.0,
+            symbol: str = None,
+    ):
+        """
+
+        :param value: the values in SI units, anything NumPy can convert to a float array
+        :param dimensions: dimensionality
+        :param conv_factor: number of base SI units in this unit, see Physical
+        :param symbol: the symbol of the unit for pretty printing
+        """
+
+        if np is None:
+            raise ImportError("PhysicalArray requires NumPy.")
+
+        try:
+            value = np.asarray(value, dtype=float)
+        except (TypeError, ValueError):
+            raise ValueError("Values must be numbers, you have {}.".format(value)) from None
+
+        if current_environment().settings.get('validation') != 'trusted':
+            if not isinstance(conv_factor, NUMBER):
+                raise ValueError("Conversion factor must be a number, you have {}.".format(type(conv_factor)))
+
+            if conv_factor <= 0:
+                raise ValueError("Conversion factor must be positive, you have {}.".format(conv_factor))
+
+        if not isinstance(dimensions, Dimensions):
+            dimensions = Dimensions(*dimensions)
+
+        self.value = value
+        self.dimensions = dimensions
+        self.conv_factor = conv_factor
+        self.symbol = symbol
+
+    @classmethod
+    def from_unit(cls, values, unit: Physical) -> PhysicalArray:
+        """The array of values given in the unit, e.g. PhysicalArray.from_unit([1, 2], si.mm)"""
+        if np is None:
+            raise ImportError("PhysicalArray requires NumPy.")
+        return cls(np.asarray(values, dtype=float) * unit.value, unit.dimensions, unit.conv_factor, unit.symbol)
+
+    @classmethod
+    def from_physicals(cls, physicals) -> PhysicalArray:
+        """The array of the Physical instances, which must all have the same dimensions"""
+        physicals = list(physicals)
+        if not physicals:
+            raise ValueError("Can not create a PhysicalArray from an empty sequence.")
+
+        first = physicals[0]
+        dimensions = first.dimensions if isinstance(first, Physical) else None
+        for p in physicals:
+            if not isinstance(p, Physical):
+                raise ValueError("Can only create a PhysicalArray from Physical instances, not {}.".format(type(p)))
+            if p.dimensions != dimensions:
+                raise ValueError("Can only create a PhysicalArray from Physical instances of equal dimension.")
+
+        return cls([p.value for p in physicals], dimensions, first.conv_factor, first.symbol)
+
+    def __reduce__(self):
+        # see Physical.__reduce__
+        return _unpickle, (self.value, self.dimensions, self.conv_factor, self.symbol)
+
+    def _new(self, value, dimensions: Dimensions):
+        """The result of an operation: an array, or the values if the result is dimensionsless"""
+        if dimensions.dimensionsless:
+            return value
+        return PhysicalArray._trusted(value, dimensions, 1.0, None)
+
+    ### Array protocol ###
+
+    @property
+    def shape(self) -> tuple:
+        return self.value.shape
+
+    def __len__(self):
+        return len(self.value)
+
+    def __getitem__(self, item):
+        value = self.value[item]
+        if np.ndim(value) == 0:
+            return Physical._trusted(float(value), self.dimensions, self.conv_factor, self.symbol)
+        return PhysicalArray._trusted(value, self.dimensions, self.conv_factor, self.symbol)
+
+    def __iter__(self):
+        for value in self.value:
+            yield Physical._trusted(float(value), self.dimensions, self.conv_factor, self.symbol)
+
+    ### Printing ###
+
+    def _magnitude(self) -> float:
+        """The largest absolute value, so that no value is shown as a huge number"""
+        if not self.value.size or np.isnan(self.value).all():
+            return 0.0
+        return float(np.nanmax(np.abs(self.value)))
+
+    def __str__(self):
+        """A pretty print of the PhysicalArray instance"""
+        unit = self._print_unit()
+        values = self.to(unit)
+        _, definition = current_environment().find_unit(self.dimensions, unit)
+        return '[{}] {}'.format(', '.join(self.as_str(float(x)) for x in values.flat), definition['Symbol'])
+
+    def __repr__(self):
+        return "PhysicalArray(value={!r}, dimensions={}, conv_factor={}, symbol={})".format(self.value,
+                                                                                           self.dimensions,
+                                                                                           self.conv_factor,
+                                                                                           self.symbol)
+
+    def to(self, unit: str = None):
+        """
+        Returns the values in the given unit as a float array.
+
+        The unit must be defined in the environment, given by its key or symbol.
+        If it is not, depending on the setting 'to_fails' a ValueError is raised or the possible units are printed.
+        """
+        environment = current_environment()
+        found = None if unit is None else environment.find_unit(self.dimensions, unit)
+
+        if found is None:
+            if stats.enabled:
+                stats.record('to.failed')
+            message = 'Conversion not possible. Possible values to use are: {}'.format(
+                environment.possible_units(self.dimensions))
+            if environment.settings.get('to_fails') == 'raise':
+                raise ValueError(message)
+            print(message)
+            return None
+
+        _, definition = found
+        return self.value / (definition['Value'] * definition['Factor'])
+
+    ### "Magic" Methods ###
+
+    def _check_other(self, other, operation: str):
+
+        if not isinstance(other, Physical):
+            raise ValueError(
+                f"Can only {operation} between Physical or PhysicalArray instances, these are {type(other)} and {type(self)}"
+            )
+
+        if self.dimensions != other.dimensions:
+            raise ValueError(
+                f"Can only {operation} between Physical or PhysicalArray instances of equal dimension."
+            )
+
+    def __abs__(self):
+        return PhysicalArray._trusted(np.abs(self.value), self.dimensions, self.conv_factor, self.symbol)
+
+    def __bool__(self):
+        # same as NumPy: ambiguous for more than one element
+        return bool(self.value)
+
+    __hash__ = None
+
+    def __round__(self, n=None):
+        if n is None:
+            n = current_environment().settings.get('significant_digits')
+
+        return PhysicalArray._trusted(np.round(self.value, n), self.dimensions, self.conv_factor, self.symbol)
+
+    def __eq__(self, other):
+
+        # comparison to zero
+        if isinstance(other, NUMBER) and other == 0:
+            return np.isclose(self.value, 0, rtol=RE_TOL, atol=ABS_TOL)
+
+        self._check_other(other, "__eq__")
+        return np.isclose(self.value, other.value, rtol=RE_TOL, atol=ABS_TOL)
+
+    def __ne__(self, other):
+        return ~self.__eq__(other)
+
+    def __gt__(self, other):
+        if isinstance(other, NUMBER) and other == 0:
+            return self.value > 0
+        self._check_other(other, "__gt__")
+        return self.value > other.value
+
+    def __ge__(self, other):
+        if isinstance(other, NUMBER) and other == 0:
+            return self.value >= 0
+        self._check_other(other, "__ge__")
+        return self.value >= other.value
+
+    def __lt__(self, other):
+        if isinstance(other, NUMBER) and other == 0:
+            return self.value < 0
+        self._check_other(other, "__lt__")
+        return self.value < other.value
+
+    def __le__(self, other):
+        if isinstance(other, NUMBER) and other == 0:
+            return self.value <= 0
+        self._check_other(other, "__le__")
+        return self.value <= other.value
+
+    def __add__(self, other):
+
+        # addition to 0 is allowed, see Physical
+        if isinstance(other, NUMBER) and other == 0:
+            return self
+
+        self._check_other(other, "__add__")
+        return PhysicalArray._trusted(self.value + other.value, self.dimensions, self.conv_factor, self.symbol)
+
+    def __radd__(self, other):
+        return self.__add__(other)
+
+    def __sub__(self, other):
+
+        if isinstance(other, NUMBER) and other == 0:
+            return self
+
+        self._check_other(other, "__sub__")
+        return PhysicalArray._trusted(self.value - other.value, self.dimensions, self.conv_factor, self.symbol)
+
+    def __rsub__(self, other):
+
+        # only subtracting from 0 is allowed.
+        if isinstance(other, NUMBER) and other == 0:
+            return PhysicalArray._trusted(-self.value, self.dimensions, self.conv_factor, self.symbol)
+
+        self._check_other(other, "__rsub__")
+        return PhysicalArray._trusted(other.value - self.value, self.dimensions, self.conv_factor, self.symbol)
+
+    def __mul__(self, other):
+
+        # multiplying by numbers, elementwise if an array
+        if isinstance(other, SCALARS):
+            return PhysicalArray._trusted(self.value * other, self.dimensions, self.conv_factor, self.symbol)
+
+        if not isinstance(other, Physical):
+            raise ValueError(
+                f"Can only __mul__ between Physical or PhysicalArray instances, these are {type(other)} and {type(self)}"
+            )
+
+        return self._new(self.value * other.value, self.dimensions.multiply(other.dimensions))
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def __truediv__(self, other):
+
+        if isinstance(other, SCALARS):
+            if isinstance(other, NUMBER) and other == 0:
+                raise ZeroDivisionError("Cannot divide by zero.")
+            return PhysicalArray._trusted(self.value / other, self.dimensions, self.conv_factor, self.symbol)
+
+        if not isinstance(other, Physical):
+            raise ValueError(
+                f"Can only __truediv__ between Physical or PhysicalArray instances, these are {type(other)} and {type(self)}"
+            )
+
+        if isinstance(other.value, NUMBER) and other.value == 0:
+            raise ZeroDivisionError("Cannot divide by zero.")
+
+        return self._new(self.value / other.value, self.dimensions.divide(other.dimensions))
+
+    def __rtruediv__(self, other):
+
+        if isinstance(other, SCALARS):
+            return self._new(other / self.value, self.dimensions.power(-1))
+
+        if not isinstance(other, Physical):
+            raise ValueError(
+                f"Can only __rtruediv__ between Physical or PhysicalArray instances, these are {type(other)} and {type(self)}"
+            )
+
+        return self._new(other.value / self.value, other.dimensions.divide(self.dimensions))
+
+    def __pow__(self, other):
+
+        if isinstance(other, NUMBER):
+            # complex, NumPy gives NaN. Physical.__pow__ raises the same way.
+            if not float(other).is_integer() and (self.value < 0).any():
+                raise ValueError("Cannot raise negative values to the fractional power {}.".format(other))
+            return self._new(self.value ** other, self.dimensions.power(other))
+
+        raise ValueError(
+            "Cannot raise a PhysicalArray to the power of {}, use a number".format(type(other))
+        )
+
+
+def _unpickle(value, dimensions: Dimensions, conv_factor, symbol) -> PhysicalArray:
+    """Creates the unpickled PhysicalArray, see PhysicalArray.__reduce__"""
+    return PhysicalArray._trusted(value, dimensions, conv_factor, symbol)
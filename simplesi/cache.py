@@ -0,0 +1,130 @@
+"""
+On-disk cache of the checked and normalized environment definitions.
+
+Loading an environment file means reading the json, checking and normalizing every unit definition.
+The result is saved in the cache directory, keyed by the path, modification time and size of the json file
+and the version of simplesi. Later loads of the same file skip parsing and checking, and any change of the
+json file invalidates the cached definitions.
+
+The cache directory is, in order of precedence:
+- the SIMPLESI_CACHE_DIR environment variable,
+- XDG_CACHE_HOME/simplesi or LOCALAPPDATA/simplesi,
+- ~/.cache/simplesi
+
+The cache is written using marshal, which only handles builtin types - nothing is executed when loading.
+It is used only if the setting 'cache' of the environment is True. The entries of json files that no longer exist are
+removed whenever a new entry is written, see prune().
+"""
+
+import hashlib
+import marshal
+import os
+import pathlib
+import tempfile
+
+from simplesi.dimensions import Dimensions
+
+# version of the content of the cache files
+_FORMAT = 1
+
+
+def cache_dir() -> pathlib.Path:
+    """The directory of the cache"""
+    path = os.environ.get('SIMPLESI_CACHE_DIR')
+    if path:
+        return pathlib.Path(path)
+
+    base = os.environ.get('XDG_CACHE_HOME') or os.environ.get('LOCALAPPDATA')
+    if base:
+        return pathlib.Path(base) / 'simplesi'
+
+    return pathlib.Path.home() / '.cache' / 'simplesi'
+
+
+def _key(path: pathlib.Path) -> tuple:
+    """Identifies the content of the json file"""
+    from simplesi import __version__
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    return path, stat.st_mtime_ns, stat.st_size, __version__
+
+
+def _cache_file(key: tuple) -> pathlib.Path:
+    return cache_dir() / (hashlib.sha1(key[0].encode('utf-8')).hexdigest() + '.marshal')
+
+
+def load(path: pathlib.Path):
+    """The cached definitions of the json file at path, None if there is no valid cache"""
+    try:
+        key = _key(path)
+        with open(_cache_file(key), 'rb') as f:
+            content = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+    # different file content, simplesi version or cache format
+    if not isinstance(content, dict) or content.get('key') != key or content.get('format') != _FORMAT:
+        return None
+
+    definitions = content['definitions']
+    for definition in definitions.values():
+        definition['Dimension'] = Dimensions(*definition['Dimension'])
+
+    return definitions
+
+
+def _exponents(dimensions) -> tuple:
+    """The exponents as marshal can write them, the fractional ones as float. Dimensions() makes them exact again."""
+    return tuple(x if isinstance(x, int) else float(x) for x in dimensions)
+
+
+def save(path: pathlib.Path, definitions: dict) -> None:
+    """Saves the checked and normalized definitions of the json file at path. Failing to write is not an error."""
+    try:
+        key = _key(path)
+        content = {
+            'format': _FORMAT,
+            'key': key,
+            'definitions': {unit: {k: _exponents(v) if k == 'Dimension' else v for k, v in definition.items()}
+                            for unit, definition in definitions.items()},
+        }
+
+        cache_file = _cache_file(key)
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        new = not cache_file.exists()
+
+        # written to a temporary file first so that concurrent readers never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=cache_file.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(marshal.dumps(content))
+            os.replace(tmp, cache_file)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+        if new:
+            prune()
+
+    except (OSError, ValueError):
+        pass
+
+
+def prune() -> int:
+    """Removes the entries of the json files that no longer exist, returns the number of entries removed"""
+    removed = 0
+    for cache_file in cache_dir().glob('*.marshal'):
+        try:
+            with open(cache_file, 'rb') as f:
+                content = marshal.loads(f.read())
+            path = content['key'][0]
+        except (OSError, EOFError, ValueError, TypeError, KeyError, IndexError):
+            # not readable, it is written again when its json file is loaded
+            continue
+        if not os.path.exists(path):
+            try:
+                os.unlink(cache_file)
+                removed += 1
+            except OSError:
+                pass
+    return removed
@@ -0,0 +1,194 @@
+"""
+Checking the dimensions of the arguments of a function once, at the call, and computing with plain floats inside.
+
+>>> import simplesi as si
+>>> si.environment(env_name='structural')
+>>> @si.checked(inputs={'L': 'm', 'q': 'kN/m'}, returns='kNm')
+... def moment(L, q):
+...     return q * L ** 2 / 8
+>>> print(moment(4 * si.m, 1.5 * si.kN_m))
+3 kNm
+>>> moment(4 * si.m, 1.5 * si.kN)
+Traceback (most recent call last):
+...
+ValueError: Argument "q" of moment() must be in kN/m, you have 1.50 kN.
+
+The units can also be given as string annotations, e.g. def moment(L: 'm', q: 'kN/m') -> 'kNm'.
+"""
+
+import functools
+import inspect
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from simplesi import Physical, NUMBER, current_environment
+
+
+def _strip(value, unit: str, name: str, fn):
+    """The value of the argument in the unit as a float, or a float array for a PhysicalArray"""
+    compiled = current_environment().compile_unit(unit)
+    if isinstance(value, Physical):
+        # Dimensions are interned, identity is equality
+        if value.dimensions is not compiled.dimensions:
+            raise ValueError('Argument "{}" of {}() must be in {}, you have {}.'.format(
+                name, fn.__name__, unit, value))
+        return value.value / compiled.factor
+
+    if not compiled.dimensions.dimensionsless:
+        raise ValueError('Argument "{}" of {}() must be a Physical in {}, you have {}.'.format(
+            name, fn.__name__, unit, value))
+    # numbers are taken as they are for dimensionless units
+    return value
+
+
+def _wrap(result, unit: str, fn):
+    """The result of the function given in the unit as a Physical"""
+    compiled = current_environment().compile_unit(unit)
+    if isinstance(result, Physical):
+        if result.dimensions is not compiled.dimensions:
+            raise ValueError('The result of {}() must be in {}, you have {}.'.format(fn.__name__, unit, result))
+        return result
+
+    if compiled.dimensions.dimensionsless:
+        return result
+
+    if np is not None and isinstance(result, np.ndarray):
+        from simplesi.arrays import PhysicalArray
+        return PhysicalArray._trusted(result * compiled.factor, compiled.dimensions, 1.0, None)
+    return Physical._trusted(result * compiled.factor, compiled.dimensions, 1.0, None)
+
+
+class _Plan:
+    """
+    Which arguments of a call are converted, worked out once for the number of positional and the keyword arguments.
+    The compiled units are kept until the unit definitions of the environment change.
+    """
+
+    __slots__ = ('names', 'defaults', 'result_unit', 'positional', 'keywords', 'result', 'expressions')
+
+    def __init__(self, signature: inspect.Signature, units: dict, result_unit, args: tuple, kwargs: dict):
+        # raises TypeError for an invalid call, the same as calling the function
+        bound = signature.bind(*args, **kwargs)
+        # the positional arguments are given in the order of these parameters, the rest go to *args
+        names = [name for name, parameter in signature.parameters.items()
+                 if parameter.kind in (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)]
+
+        self.names = []  # (index or name, name, unit) of the arguments to convert
+        self.defaults = []  # (name, unit, default) of the Physical defaults of the arguments not given
+        for index, name in enumerate(names[:len(args)]):
+            if name in units:
+                self.names.append((index, name, units[name]))
+        for name in kwargs:
+            if name in units:
+                self.names.append((name, name, units[name]))
+        for name, parameter in signature.parameters.items():
+            if (name in units and name not in bound.arguments and isinstance(parameter.default, Physical)
+                    and parameter.kind is not inspect.Parameter.POSITIONAL_ONLY):
+                self.defaults.append((name, units[name], parameter.default))
+
+        self.result_unit = result_unit
+        self.expressions = None
+
+    def resolve(self, env) -> None:
+        """Compiles the units in the environment"""
+        converters = []
+        for key, name, unit in self.names:
+            compiled = env.compile_unit(unit)
+            converters.append((key, name, unit, compiled.dimensions, compiled.factor))
+        self.positional = [x for x in converters if isinstance(x[0], int)]
+        self.keywords = [x for x in converters if not isinstance(x[0], int)]
+
+        if self.result_unit is None or isinstance(self.result_unit, tuple):
+            self.result = None
+        else:
+            compiled = env.compile_unit(self.result_unit)
+            self.result = compiled.dimensions, compiled.factor
+
+        # replaced by the environment when the unit definitions change
+        self.expressions = env._expressions
+
+
+def checked(inputs: dict = None, returns=None):
+    """
+    Decorator checking the dimensions of the arguments and converting them to floats in the given units.
+
+    The function is called with the values of the arguments in their units, e.g. 4.0 for 4 * si.m declared as 'm',
+    or float arrays for PhysicalArrays. Its result is taken in the unit given by returns and wrapped into a Physical.
+    Arguments without a unit are passed as they are.
+
+    The units are unit expressions, e.g. 'kN/m^2', resolved by the current environment. The compiled expressions are
+    compiled once for each way of calling the function, e.g. with two positional arguments, and kept until the unit
+    definitions of the environment change. Checking an argument is then an identity test of its Dimensions.
+
+    :param inputs: the units of the arguments by name. If None, the string annotations of the function are used.
+    :param returns: the unit of the result, a tuple of units if the function returns a tuple, None for no conversion.
+    If inputs is None, the string return annotation is used.
+    :return: the decorator
+    """
+
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        if inputs is None:
+            units = {k: v.annotation for k, v in signature.parameters.items() if isinstance(v.annotation, str)}
+            result_unit = returns
+            if result_unit is None and isinstance(signature.return_annotation, str):
+                result_unit = signature.return_annotation
+        else:
+            units = dict(inputs)
+            result_unit = returns
+
+        unknown = [x for x in units if x not in signature.parameters]
+        if unknown:
+            raise ValueError('{}() has no arguments {}.'.format(fn.__name__, unknown))
+
+        plans = {}
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (len(args), tuple(kwargs))
+            plan = plans.get(key)
+            if plan is None:
+                plan = plans[key] = _Plan(signature, units, result_unit, args, kwargs)
+
+            env = current_environment()
+            if plan.expressions is not env._expressions:
+                plan.resolve(env)
+
+            if plan.positional:
+                args = list(args)
+                for index, name, unit, dimensions, factor in plan.positional:
+                    value = args[index]
+                    # Dimensions are interned, identity is equality
+                    if isinstance(value, Physical) and value.dimensions is dimensions:
+                        args[index] = value.value / factor
+                    else:
+                        args[index] = _strip(value, unit, name, fn)
+            for name, _, unit, dimensions, factor in plan.keywords:
+                value = kwargs[name]
+                if isinstance(value, Physical) and value.dimensions is dimensions:
+                    kwargs[name] = value.value / factor
+                else:
+                    kwargs[name] = _strip(value, unit, name, fn)
+            for name, unit, default in plan.defaults:
+                kwargs[name] = _strip(default, unit, name, fn)
+
+            result = fn(*args, **kwargs)
+
+            if plan.result is not None and isinstance(result, NUMBER):
+                dimensions, factor = plan.result
+                return Physical._trusted(result * factor, dimensions, 1.0, None)
+            if result_unit is None:
+                return result
+            if isinstance(result_unit, tuple):
+                if not isinstance(result, tuple) or len(result) != len(result_unit):
+                    raise ValueError('{}() must return a tuple of {} values.'.format(fn.__name__, len(result_unit)))
+                return tuple(_wrap(x, unit, fn) for x, unit in zip(result, result_unit))
+            return _wrap(result, result_unit, fn)
+
+        return wrapper
+
+    return decorator
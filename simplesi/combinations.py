@@ -0,0 +1,227 @@
+"""
+Load combinations and their envelopes.
+
+The results of the load cases, e.g. the bending moments at many points, are combined with a table of factors: one
+row of factors per combination, one column per load case. All combinations are evaluated as one matrix product of the
+factors and the results, then the largest and the smallest value of every point and the combination giving it are
+taken. The dimensions of the results are checked once, when they are stacked.
+
+>>> import simplesi as si
+>>> si.environment(env_name='structural')
+>>> cases = {
+...     'G': si.PhysicalArray.from_unit([10, 20, 10], si.kNm),
+...     'Q': si.PhysicalArray.from_unit([5, 10, -5], si.kNm),
+...     'W': si.PhysicalArray.from_unit([-8, 2, 8], si.kNm),
+... }
+>>> combinations = si.combinations.Combinations.leading(permanent={'G': (1.35, 1.0)},
+...                                                    variable={'Q': (1.5, 0.7), 'W': (1.5, 0.6)})
+>>> envelope = si.combinations.envelope(cases, combinations)
+>>> print(envelope.max)
+[21, 43.80, 25.50] kNm
+>>> envelope.governing('max')[2]
+'1.35 G + 1.5 W'
+
+NumPy is needed to use them.
+"""
+
+import itertools
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from simplesi import Physical, NUMBER
+from simplesi.arrays import PhysicalArray
+from simplesi.dimensions import Dimensions
+
+# the number of results of the combinations computed at once, the points are taken in chunks of this many results
+CHUNK_SIZE = 4_000_000
+
+DIMENSIONLESS = Dimensions(0, 0, 0, 0, 0, 0, 0)
+
+
+class Combinations:
+    """
+    Named combinations of load cases: the factor of every load case in every combination.
+
+    names are the names of the combinations, cases the names of the load cases and factors the matrix of the factors,
+    one row per combination and one column per load case.
+    """
+
+    def __init__(self, factors: dict):
+        """
+
+        :param factors: the factors of the load cases by the name of the combination, e.g.
+        {'ULS-1': {'G': 1.35, 'Q': 1.5}, 'ULS-2': {'G': 1.0, 'Q': 1.5}}. Load cases not given have a factor of 0.
+        """
+        if np is None:
+            raise ImportError("Combinations require NumPy.")
+        if not factors:
+            raise ValueError('There are no combinations.')
+
+        for name, row in factors.items():
+            for case, factor in row.items():
+                if not isinstance(factor, NUMBER):
+                    raise ValueError('The factor of "{}" in "{}" must be a number, you have {}.'.format(
+                        case, name, factor))
+
+        self.names = tuple(factors)
+        self.cases = tuple(dict.fromkeys(case for row in factors.values() for case in row))
+        self.factors = np.array([[row.get(case, 0.0) for case in self.cases] for row in factors.values()],
+                                dtype=float).reshape(len(self.names), len(self.cases))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __repr__(self):
+        return 'Combinations({})'.format(self.table())
+
+    def table(self) -> dict:
+        """The factors by the name of the combination and the name of the load case, without the zero factors"""
+        return {name: {case: float(x) for case, x in zip(self.cases, row) if x}
+                for name, row in zip(self.names, self.factors)}
+
+    @classmethod
+    def leading(cls, permanent: dict, variable: dict = None, favourable: bool = True) -> 'Combinations':
+        """
+        The combinations of permanent and variable actions, each variable action leading in turn, see EN 1990 6.10.
+
+        The leading action has the factor gamma, the accompanying ones gamma * psi0. If favourable, also the
+        combinations with the lower factors of the permanent actions, without some of the accompanying actions and
+        with the permanent actions only are given, so that the envelope covers actions that reduce the result.
+        Combinations with the same factors are given once. The name of a combination is its formula, e.g. '1.35 G + 1.5 Q + 0.9 W'.
+
+        :param permanent: the factors of the permanent actions by name: a number or (upper, lower), e.g. (1.35, 1.0)
+        :param variable: (gamma, psi0) of the variable actions by name, e.g. {'Q': (1.5, 0.7)}
+        :param favourable: whether to give the combinations of the favourable actions
+        """
+        variable = variable or {}
+        upper = {k: v[0] if isinstance(v, tuple) else v for k, v in permanent.items()}
+        lower = {k: v[1] if isinstance(v, tuple) else v for k, v in permanent.items()}
+        permanents = [upper, lower] if favourable and lower != upper else [upper]
+
+        rows = []
+        for leading in list(variable) or [None]:
+            others = [x for x in variable if x != leading]
+            for factors in permanents:
+                # every accompanying action is present or, if favourable, absent
+                for present in itertools.product(*[(True, False) if favourable else (True,) for _ in others]):
+                    row = dict(factors)
+                    if leading is not None:
+                        row[leading] = variable[leading][0]
+                    for case, used in zip(others, present):
+                        if used:
+                            row[case] = variable[case][0] * variable[case][1]
+                    rows.append(row)
+
+        # no variable action at all, e.g. if all of them reduce the result
+        if favourable and variable:
+            rows.extend(dict(factors) for factors in permanents)
+
+        table = {}
+        for row in rows:
+            name = ' + '.join('{:g} {}'.format(x, case) for case, x in row.items() if x)
+            table.setdefault(name, row)
+        return cls(table)
+
+
+class Envelope:
+    """
+    The envelope of the combinations: the largest and the smallest result of every point and the combination giving it.
+
+    max and min have the shape of the results of the load cases, argmax and argmin are the indices of the governing
+    combinations in names.
+    """
+
+    def __init__(self, names: tuple, maximum, minimum, argmax, argmin):
+        self.names = names
+        self.max = maximum
+        self.min = minimum
+        self.argmax = argmax
+        self.argmin = argmin
+
+    def __repr__(self):
+        return 'Envelope(max={!r}, min={!r})'.format(self.max, self.min)
+
+    def governing(self, which: str = 'max') -> np.ndarray:
+        """The names of the governing combinations, of the largest ('max') or the smallest ('min') results"""
+        if which not in ('max', 'min'):
+            raise ValueError("which must be 'max' or 'min', you have {}.".format(which))
+        return np.array(self.names, dtype=object)[self.argmax if which == 'max' else self.argmin]
+
+
+def _stack(cases: dict, names: tuple) -> tuple:
+    """The results of the load cases as the rows of a matrix, after checking that all have the same dimensions"""
+    rows = []
+    first = None
+    for name in names:
+        if name not in cases:
+            raise ValueError('There are no results of the load case "{}".'.format(name))
+
+        result = cases[name]
+        if isinstance(result, (list, tuple)) and result and all(isinstance(x, Physical) for x in result):
+            result = PhysicalArray.from_physicals(result)
+        if not isinstance(result, Physical):
+            result = Physical._trusted(np.asarray(result, dtype=float), DIMENSIONLESS, 1.0, None)
+
+        if first is None:
+            first = result
+        # Dimensions are interned, identity is equality
+        elif result.dimensions is not first.dimensions:
+            raise ValueError('The results of the load cases must have equal dimensions, "{}" has {}, "{}" has {}.'
+                             .format(names[0], first.dimensions, name, result.dimensions))
+        if np.shape(result.value) != np.shape(first.value):
+            raise ValueError('The results of the load cases must have the same shape, "{}" has {}, "{}" has {}.'
+                             .format(names[0], np.shape(first.value), name, np.shape(result.value)))
+        rows.append(np.ravel(result.value))
+
+    return np.array(rows, dtype=float), first
+
+
+def _result(value, first: Physical):
+    """The values of the envelope with the dimensions, the conversion factor and the symbol of the results"""
+    value = value.reshape(np.shape(first.value))
+    if first.dimensions.dimensionsless:
+        return value
+    return PhysicalArray._trusted(value, first.dimensions, first.conv_factor, first.symbol)
+
+
+def envelope(cases: dict, combinations, chunk_size: int = None):
+    """
+    The envelope of the combinations of the results of the load cases.
+
+    :param cases: the results of the load cases by name: PhysicalArrays, e.g. the moments at many points, Physical
+    instances, sequences of Physical instances or numbers. All of the same dimensions and shape.
+    The results can also be dicts of quantities, e.g. {'G': {'M': ..., 'V': ...}, 'Q': {...}}, their envelopes are
+    then returned as a dict by quantity.
+    :param combinations: a Combinations or a dict of the factors, see Combinations
+    :param chunk_size: the number of results of the combinations computed at once, CHUNK_SIZE by default
+    :return: an Envelope, or a dict of them by quantity
+    """
+    if not isinstance(combinations, Combinations):
+        combinations = Combinations(combinations)
+
+    if cases and all(isinstance(x, dict) for x in cases.values()):
+        quantities = dict.fromkeys(q for x in cases.values() for q in x)
+        return {q: envelope({name: x[q] for name, x in cases.items() if q in x}, combinations, chunk_size)
+                for q in quantities}
+
+    values, first = _stack(cases, combinations.cases)
+    points = values.shape[1]
+    step = max(1, (chunk_size or CHUNK_SIZE) // len(combinations))
+
+    maximum, minimum = np.empty(points), np.empty(points)
+    argmax, argmin = np.empty(points, dtype=int), np.empty(points, dtype=int)
+    for start in range(0, points, step):
+        chunk = slice(start, start + step)
+        # all combinations at once: (combinations x cases) @ (cases x points)
+        results = combinations.factors @ values[:, chunk]
+        argmax[chunk] = results.argmax(axis=0)
+        argmin[chunk] = results.argmin(axis=0)
+        maximum[chunk] = np.take_along_axis(results, argmax[None, chunk], axis=0)[0]
+        minimum[chunk] = np.take_along_axis(results, argmin[None, chunk], axis=0)[0]
+
+    shape = np.shape(first.value)
+    return Envelope(combinations.names, _result(maximum, first), _result(minimum, first), argmax.reshape(shape),
+                    argmin.reshape(shape))
@@ -1,8 +1,35 @@
-import functools
+import itertools
+import math
+from fractions import Fraction
 from typing import NamedTuple
 
+# a float exponent this close to a fraction with a denominator up to _MAX_DENOMINATOR is taken as that fraction,
+# e.g. 1 / 3 is Fraction(1, 3)
+_MAX_DENOMINATOR = 1000
+_TOLERANCE = 1e-9
 
-class Dimensions(NamedTuple):
+
+def _exact(exponent):
+    """The exponent as int if integral, as Fraction otherwise"""
+    if isinstance(exponent, int):
+        return exponent
+
+    if isinstance(exponent, float):
+        if exponent.is_integer():
+            return int(exponent)
+        if not math.isfinite(exponent):
+            return exponent
+        fraction = Fraction(exponent).limit_denominator(_MAX_DENOMINATOR)
+        if abs(fraction - exponent) > _TOLERANCE:
+            # not a simple fraction, kept exactly as given
+            fraction = Fraction(exponent)
+    else:
+        fraction = Fraction(exponent)
+
+    return int(fraction) if fraction.denominator == 1 else fraction
+
+
+class _Exponents(NamedTuple):
     kg: float
     m: float
     s: float
@@ -11,10 +38,85 @@ class Dimensions(NamedTuple):
     K: float
     mol: float
 
-    @property
-    @functools.lru_cache(maxsize=None)
-    def dimensionsless(self):
-        return all(x == 0 for x in self)
+
+class Dimensions(_Exponents):
+    """
+    The dimensions of a Physical as the exponents of the seven SI base units.
+
+    Instances are interned: there is exactly one Dimensions object per exponent vector, so
+    - uid is a small integer identifying the exponent vector, usable as a dict key,
+    - dimensionsless is computed once, when the vector is first seen,
+    - the results of multiply(), divide() and power() are memoized per instance.
+    Exponents that are integral floats are stored as int, so Dimensions(0, 1, 0, 0, 0, 0, 0) and
+    Dimensions(0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 0.0) are the same object.
+    Other exponents are stored as Fraction, so they are exact: the dimensions of x ** (1 / 3) cubed are the
+    dimensions of x. Fractions with a small denominator are recognized in floats, e.g. 0.5 or 1 / 3.
+    Integral exponents are never Fractions, so the usual dimensions cost only integer operations.
+
+    The interned instances are never freed. This is fine as long as the exponents are not
+    generated arbitrarily, e.g. raising to many different float powers.
+    """
+
+    _interned = {}
+    _uids = itertools.count()
+
+    def __new__(cls, kg, m, s, A, cd, K, mol):
+        exponents = (kg, m, s, A, cd, K, mol)
+
+        # fast path: (1, 0, ...) and (1.0, 0.0, ...) are equal keys
+        try:
+            return cls._interned[exponents]
+        except KeyError:
+            pass
+
+        exponents = tuple(_exact(x) for x in exponents)
+        try:
+            return cls._interned[exponents]
+        except KeyError:
+            pass
+
+        self = tuple.__new__(cls, exponents)
+        self.uid = next(cls._uids)
+        self.dimensionsless = all(x == 0 for x in exponents)
+        self._products = {}
+        self._quotients = {}
+        self._powers = {}
+
+        # setdefault makes sure only one instance wins if created concurrently
+        return cls._interned.setdefault(exponents, self)
+
+    @classmethod
+    def _make(cls, iterable):
+        return cls(*iterable)
+
+    def __reduce__(self):
+        # the memo tables and the uid are local to the process, only the exponents are pickled
+        return self.__class__, tuple(self)
+
+    def multiply(self, other: 'Dimensions') -> 'Dimensions':
+        """The dimensions of the product of two quantities"""
+        try:
+            return self._products[other.uid]
+        except KeyError:
+            result = self._products[other.uid] = Dimensions(*[x + y for x, y in zip(self, other)])
+            return result
+
+    def divide(self, other: 'Dimensions') -> 'Dimensions':
+        """The dimensions of the quotient of two quantities"""
+        try:
+            return self._quotients[other.uid]
+        except KeyError:
+            result = self._quotients[other.uid] = Dimensions(*[x - y for x, y in zip(self, other)])
+            return result
+
+    def power(self, exponent: float) -> 'Dimensions':
+        """The dimensions of the quantity raised to the given power"""
+        try:
+            return self._powers[exponent]
+        except KeyError:
+            exact = _exact(exponent)
+            result = self._powers[exponent] = Dimensions(*[x * exact for x in self])
+            return result
 
 
 if __name__ == '__main__':  # pragma: no cover
@@ -1,3 +1,5 @@
+import bisect
+import copy
 import math
 import pprint
 from dataclasses import dataclass, field
@@ -5,9 +7,12 @@ import pathlib
 import json
 import sys
 import builtins
-from types import ModuleType
+from types import MappingProxyType, ModuleType
 
 from simplesi import NUMBER
+from simplesi import cache
+from simplesi import parsing
+from simplesi import stats
 from simplesi.dimensions import Dimensions
 
 
@@ -45,6 +50,27 @@ class Environment:
                 print(error)
             raise ValueError("Errors in the environment.")
 
+        self._normalize_definitions(self.environment)
+
+        # the units are pushed to the module namespace unless told otherwise, see __call__
+        self.namespace_module = sys.modules[__name__.split('.')[0]]
+
+        # lookup structures used by the Physical instances to find units
+        self._units = {}
+        self._build_registry()
+        self._build_preferred()
+
+        # the units redefined by the last call
+        self.overridden_units = ()
+
+        # snapshots can not be changed, see snapshot()
+        self.frozen = False
+        # True while the lookup structures are shared with a snapshot, they are copied before the next change
+        self._shared = False
+
+        # the namespace all the units were last pushed to, see __call__
+        self._pushed_to = None
+
         # # checking preferred units: all values must be unique.
         # # This is so when printing the Physical in preferred units the choice is unambiguous.
         # if self.preferred_units:
@@ -100,23 +126,28 @@ class Environment:
                  top_level: bool = False,
                  preferred_units: dict = None,
                  settings: dict = None,
+                 lazy: bool = False,
                  ):
         """
         Loads the environment from a json file.
 
         :param env_name: name of the environment file without the .json extension
         :param env_path: path to the environment file. If None, the file is assumed to be in the "environments" subfolder.
-        :param replace: if True, the previously defined environment is removed first.
+        :param replace: if True, the previously defined environment is removed first. If False, only the new units and
+        the ones defined differently are processed, these latter are listed in overridden_units.
         :param top_level: if True the environment is pushed to the top level namespace. If False, it is pushed to the module namespace.
         :param preferred_units: defines which unit to use by default when printing the Physical object.
         :param env_dict: a dictionary of the environment. If provided, the env_name and env_path are ignored.
+        :param lazy: if True, only the definitions are loaded and the units are created on first access, e.g. si.kN.
+        Works only with the module namespace, if top_level is True, all units are created.
         :return:
         """
+        self._check_not_frozen()
 
         # no environment provided, trying to find the file by path and name
         if not env_dict:
 
-            units_environment = self._read_from_file(_path=env_path, _name=env_name)
+            units_environment = self._load_definitions(_path=env_path, _name=env_name)
 
             # # no env_path provided: default location
             # if env_path is None:
@@ -138,28 +169,10 @@ class Environment:
         # environment from a dict
         else:
             units_environment = env_dict
+            with stats.timer('environment.validate'):
+                self._check_and_normalize(units_environment, env_path)
 
-        _ret = self._check_environment_definition(units_environment)
-        if _ret:
-            for error in _ret:
-                print(error)
-            raise ValueError("Errors in the environment file at {}.".format(env_path))
-
-        # reading the environment file
-        for unit, definitions in units_environment.items():
-            # previous checks make sure Dimension is present and correwt
-            dimensions = definitions.get("Dimension")
-            # the unitname, if not defined
-            symbol = definitions.get("Symbol", unit)
-            # conversion factor is 1 if not defined
-            conv_factor = definitions.get("Factor", 1)
-            # Value is 1 if not defined
-            value = definitions.get("Value", 1)
-
-            units_environment[unit]["Dimension"] = Dimensions(*dimensions)
-            units_environment[unit]["Symbol"] = symbol
-            units_environment[unit]["Factor"] = conv_factor
-            units_environment[unit]["Value"] = value
+        pushed_to = self._pushed_to
 
         # deciding which namespace to push the environment to
         # top level -> builtins. In this case the units are available simply by name, e.g. "m" or "kg"
@@ -187,31 +200,47 @@ class Environment:
                     pass
             # to be synced, the environment is also emptied
             self.environment = None
+            self._units = {}
 
         # updating the environment
         if self.environment is None:
             self.environment = {}
-        self.environment.update(units_environment)
+
+        # only the new units and the ones with a changed definition are processed
+        changed = {k: v for k, v in units_environment.items() if self.environment.get(k) != v}
+        self.overridden_units = tuple(k for k in changed if k in self.environment)
+
+        self._unshare()
+        self.environment.update(changed)
+        for unit in changed:
+            self._units.pop(unit, None)
 
         # pusing the environment to the chosen namespace. To do this, first the environment is
         # used to generate a dict of Physical objects, which is then pushed to the namespace.
-        self._units = {}
-        from simplesi import Physical
-        for unit, definitions in self.environment.items():
-            # Physical holds:
-            # - the value of the unit. The value of non-SI units is the value in SI units.
-            # - the conversion factor for non_SI units. For SI units this is 1.
-            # - the dimensions of the unit as a Dimensions object
-
-            self._units[unit] = Physical(value=definitions.get('Value') * definitions.get('Factor'),
-                                         conv_factor=definitions.get('Factor'),
-                                         dimensions=definitions.get("Dimension"),
-                                         symbol=definitions.get("Symbol"),
-                                         )
-
-        # push
-        self._push_vars(self._units, self.namespace_module)  # from the userdefined environment
-        self._push_vars(self.si_base_units, self.namespace_module)  # base units
+        if lazy and not top_level:
+            # only the definitions are kept, the module __getattr__ creates the units on first access.
+            # units created earlier but redefined now are removed so that they are created again.
+            with stats.timer('environment.push'):
+                for unit in changed:
+                    self.namespace_module.__dict__.pop(unit, None)
+                self._push_vars(self.si_base_units, self.namespace_module)  # base units
+        else:
+            # push, only the changed units are created and pushed. All of them if they have not been pushed to this
+            # namespace yet, e.g. loaded lazily before or into another namespace.
+            pending = changed if pushed_to is self.namespace_module else self.environment
+            with stats.timer('environment.build'):
+                units = {unit: self._materialize(unit) for unit in pending}
+            with stats.timer('environment.push'):
+                self._push_vars(units, self.namespace_module)  # from the userdefined environment
+                self._push_vars(self.si_base_units, self.namespace_module)  # base units
+            self._pushed_to = self.namespace_module
+
+        # the lookup structures are updated only here, when the units change
+        with stats.timer('environment.build'):
+            if replace:
+                self._build_registry()
+            else:
+                self._register(changed)
 
         # settings, print preferences
         if settings is not None:
@@ -232,6 +261,317 @@ class Environment:
                 except:
                     raise
 
+        self._build_preferred()
+
+    @classmethod
+    def _normalize_definitions(cls, definitions: dict) -> None:
+        """Fills in the defaults of the unit definitions in place. The definitions must be checked before."""
+        for unit, definition in definitions.items():
+            # previous checks make sure Dimension is present and correct
+            definition["Dimension"] = Dimensions(*definition.get("Dimension"))
+            # the unitname, if not defined
+            definition["Symbol"] = definition.get("Symbol", unit)
+            # conversion factor is 1 if not defined
+            definition["Factor"] = definition.get("Factor", 1)
+            # Value is 1 if not defined
+            definition["Value"] = definition.get("Value", 1)
+
+    def _build_registry(self) -> None:
+        """
+        Builds the lookup structures used to resolve units from scratch.
+
+        - all_units: environment-like dict made from the base si units and the environment
+        - units by dimensions: the (key, definition) pairs of the units, in ascending order of their scale
+        - names by dimensions: every key and symbol mapped to its (key, definition) pair
+        - physicals: every key and symbol mapped to its Physical instance
+        - unit keys: the keys and symbols of the units not created yet mapped to the key, see physical()
+        """
+
+        # the base SI units
+        self.all_units = {k: {'Dimension': v.dimensions, 'Factor': v.conv_factor, 'Symbol': k, "Value": v.value}
+                          for k, v in self.si_base_units.items()}
+        self._keys_by_dimensions = {}
+        for unit, definition in self.all_units.items():
+            self._keys_by_dimensions.setdefault(definition['Dimension'], {})[unit] = None
+
+        self._units_by_dimensions = {}
+        self._scales_by_dimensions = {}
+        self._names_by_dimensions = {}
+        self._ambiguous_names = set()
+
+        # the base units take precedence as they are pushed last
+        self._physicals = dict(self.si_base_units)
+        self._unit_keys = {}
+
+        # the compiled unit expressions, see compile_unit()
+        self._expressions = {}
+        self._shared = False
+
+        for dims in self._keys_by_dimensions:
+            self._index_dimensions(dims)
+
+        self._register(self.environment)
+
+    def _unshare(self) -> None:
+        """Copies the unit definitions and the lookup structures shared with a snapshot, once before they change"""
+        if not self._shared:
+            return
+        self.environment = dict(self.environment)
+        self._units = dict(self._units)
+        self.all_units = dict(self.all_units)
+        self._keys_by_dimensions = dict(self._keys_by_dimensions)
+        self._units_by_dimensions = dict(self._units_by_dimensions)
+        self._scales_by_dimensions = dict(self._scales_by_dimensions)
+        self._names_by_dimensions = dict(self._names_by_dimensions)
+        self._physicals = dict(self._physicals)
+        self._unit_keys = dict(self._unit_keys)
+        self._shared = False
+
+    def _register(self, definitions: dict) -> None:
+        """
+        Updates the lookup structures in place with the new or changed unit definitions.
+        Only the dimensions concerned are indexed again.
+        """
+
+        if not definitions:
+            return
+
+        # the compiled unit expressions may use the changed units
+        self._expressions = {}
+
+        # copied once if a snapshot shares them, see snapshot()
+        self._unshare()
+
+        affected = set()
+        for unit, definition in definitions.items():
+            dims = definition['Dimension']
+            old = self.all_units.get(unit)
+
+            if old is not None and old['Dimension'] != dims:
+                self._keys_by_dimensions[old['Dimension']] = {k: v for k, v in
+                                                             self._keys_by_dimensions[old['Dimension']].items()
+                                                             if k != unit}
+                affected.add(old['Dimension'])
+            # the keys of a dimension are copied once, a snapshot may still share them
+            if dims not in affected:
+                self._keys_by_dimensions[dims] = dict(self._keys_by_dimensions.get(dims, {}))
+            self._keys_by_dimensions[dims][unit] = None
+            affected.add(dims)
+            self.all_units[unit] = definition
+
+            # the base units take precedence
+            if unit in self.si_base_units:
+                continue
+
+            # forgetting the Physical instance of the old definition
+            if old is not None:
+                old_physical = self._physicals.pop(unit, None)
+                self._unit_keys.pop(unit, None)
+                if old_physical is not None and self._physicals.get(old['Symbol']) is old_physical:
+                    del self._physicals[old['Symbol']]
+                if self._unit_keys.get(old['Symbol']) == unit:
+                    del self._unit_keys[old['Symbol']]
+
+            # in lazy mode, the units are created when first asked for, see physical()
+            physical = self._units.get(unit)
+            if physical is not None:
+                self._physicals[unit] = physical
+                if definition['Symbol'] not in self._unit_keys:
+                    self._physicals.setdefault(definition['Symbol'], physical)
+            else:
+                self._unit_keys[unit] = unit
+                if definition['Symbol'] not in self._physicals:
+                    self._unit_keys.setdefault(definition['Symbol'], unit)
+
+        for dims in affected:
+            self._index_dimensions(dims)
+
+    def _index_dimensions(self, dims: Dimensions) -> None:
+        """Indexes the units of the given dimensions by scale and by name"""
+
+        units = [(unit, self.all_units[unit]) for unit in self._keys_by_dimensions.get(dims, ())]
+        self._ambiguous_names = {x for x in self._ambiguous_names if x[0] != dims}
+        if not units:
+            self._keys_by_dimensions.pop(dims, None)
+            self._units_by_dimensions.pop(dims, None)
+            self._scales_by_dimensions.pop(dims, None)
+            self._names_by_dimensions.pop(dims, None)
+            return
+
+        # sorting is stable, units of the same scale keep the order of the definition
+        units = sorted(units, key=lambda x: x[1]['Value'] * x[1]['Factor'])
+        self._units_by_dimensions[dims] = tuple(units)
+        # the scales and keys of the SI units, for the binary search in scaled_unit(). Other unit systems,
+        # e.g. lbf or mile, only if there are no SI units of the dimensions.
+        scaled = [x for x in units if x[1]['Factor'] == 1] or units
+        self._scales_by_dimensions[dims] = (tuple(x[1]['Value'] for x in scaled), tuple(x[0] for x in scaled))
+
+        names = {}
+        ambiguous = set()
+        for unit, definition in units:
+            for name in (unit, definition['Symbol']):
+                # the same name is used by multiple units of the same dimensions
+                if name in names and names[name][0] != unit:
+                    ambiguous.add(name)
+                names[name] = (unit, definition)
+        for name in ambiguous:
+            del names[name]
+            self._ambiguous_names.add((dims, name))
+        self._names_by_dimensions[dims] = names
+
+    def _build_preferred(self) -> None:
+        """Builds the lookup of the preferred units by dimensions"""
+        self._preferred_by_dimensions = {Dimensions(*v): k for k, v in (self.preferred_units or {}).items()}
+
+    def units_by_scale(self, dimensions: Dimensions) -> tuple:
+        """The (key, definition) pairs of the units with the given dimensions, in ascending order of their scale"""
+        return self._units_by_dimensions.get(dimensions, ())
+
+    def scaled_unit(self, dimensions: Dimensions, magnitude: float):
+        """
+        The key of the unit with the given dimensions that shows the magnitude, in SI units, as a number of at least 1
+        and as small as possible, e.g. 100 N rather than 0.1 kN or 100000 mN. Binary search over the scales of the units.
+        Only the SI units, i.e. with a Factor of 1, are considered, unless there are none with the dimensions.
+        The smallest unit if the magnitude is smaller than all, None if there are no units with the dimensions.
+        """
+        try:
+            scales, keys = self._scales_by_dimensions[dimensions]
+        except KeyError:
+            return None
+
+        # NaN is not comparable, the smallest unit is used
+        index = bisect.bisect_right(scales, magnitude) - 1 if magnitude == magnitude else 0
+        return keys[index if index > 0 else 0]
+
+    def find_unit(self, dimensions: Dimensions, name: str):
+        """
+        Returns the (key, definition) pair of the unit with the given dimensions, found by its key or symbol.
+        If there is no such unit, None is returned.
+        """
+        found = self._names_by_dimensions.get(dimensions, {}).get(name)
+        if found is not None:
+            return found
+
+        if (dimensions, name) in self._ambiguous_names:
+            raise ValueError(
+                'More than one unit found for the given dimensions. This means, symbols and keys in the environment are used multiple times.')
+
+        # not a unit of the environment, but maybe an expression of units, e.g. 'kN/m^2'
+        try:
+            compiled = self.compile_unit(name)
+        except ValueError:
+            return None
+        if compiled.dimensions is not dimensions:
+            return None
+        return name, compiled.definition
+
+    def compile_unit(self, expression: str) -> parsing.UnitExpression:
+        """
+        The unit expression, e.g. 'kN/m^2', compiled into its dimensions, factor and symbol. See simplesi.parsing.
+        The compiled expressions are cached until the units of the environment change.
+        """
+        try:
+            return self._expressions[expression]
+        except (KeyError, TypeError):
+            pass
+
+        compiled = self._expressions[expression] = parsing.compile_unit(expression, self.physical)
+        return compiled
+
+    def resolve_unit(self, dimensions: Dimensions, name: str):
+        """
+        Returns the (key, definition) pair of the unit with the given dimensions, found by its key or symbol.
+        Unlike find_unit(), a ValueError is raised if there is no such unit, regardless of the settings.
+        """
+        found = self.find_unit(dimensions, name)
+        if found is None:
+            raise ValueError(
+                'Conversion not possible. Possible values to use are: {}'.format(self.possible_units(dimensions)))
+        return found
+
+    def possible_units(self, dimensions: Dimensions) -> str:
+        """The keys and symbols of the units with the given dimensions, as a string for the error messages"""
+        names = set()
+        for unit, definition in self.units_by_scale(dimensions):
+            names.update((unit, definition['Symbol']))
+        return ', '.join('"{}"'.format(x) for x in sorted(names))
+
+    def preferred_unit(self, dimensions: Dimensions):
+        """The preferred unit for the given dimensions, None if there is none"""
+        return self._preferred_by_dimensions.get(dimensions)
+
+    def physical(self, name: str):
+        """The Physical instance of the unit defined by its key or symbol, None if there is none"""
+        try:
+            return self._physicals[name]
+        except KeyError:
+            pass
+
+        # not created yet
+        unit = self._unit_keys.get(name)
+        if unit is None:
+            return None
+
+        physical = self._physicals[name] = self._materialize(unit)
+        return physical
+
+    def _materialize(self, unit: str):
+        """Creates the Physical instance of the unit from its definition"""
+        physical = self._units.get(unit)
+        if physical is not None:
+            return physical
+
+        from simplesi import Physical
+        definitions = self.environment[unit]
+
+        # Physical holds:
+        # - the value of the unit. The value of non-SI units is the value in SI units.
+        # - the conversion factor for non_SI units. For SI units this is 1.
+        # - the dimensions of the unit as a Dimensions object
+        physical = self._units[unit] = Physical(value=definitions.get('Value') * definitions.get('Factor'),
+                                                conv_factor=definitions.get('Factor'),
+                                                dimensions=definitions.get("Dimension"),
+                                                symbol=definitions.get("Symbol"),
+                                                )
+        return physical
+
+    def _check_and_normalize(self, definitions: dict, _path: pathlib.Path = None) -> None:
+        """Checks the unit definitions, then fills in the defaults in place"""
+        _ret = self._check_environment_definition(definitions)
+        if _ret:
+            for error in _ret:
+                print(error)
+            raise ValueError("Errors in the environment file at {}.".format(_path))
+
+        self._normalize_definitions(definitions)
+
+    def _load_definitions(self, _name: str, _path: pathlib.Path = None) -> dict:
+        """
+        Returns the checked and normalized unit definitions from the json file.
+
+        If the setting 'cache' is True, the definitions are taken from the on-disk cache if the json file
+        did not change since it was cached, see the cache module.
+        """
+
+        use_cache = (self.settings or {}).get('cache', False)
+
+        path = (pathlib.Path(__file__).parent / 'environments' if _path is None else _path) / (_name + ".json")
+        if use_cache:
+            with stats.timer('environment.read'):
+                definitions = cache.load(path)
+            if definitions is not None:
+                return definitions
+
+        with stats.timer('environment.read'):
+            definitions = self._read_from_file(_name=_name, _path=_path)
+        with stats.timer('environment.validate'):
+            self._check_and_normalize(definitions, _path)
+
+        if use_cache:
+            cache.save(path, definitions)
+
+        return definitions
+
     def _read_from_file(self, _name: str, _path: pathlib.Path = None):
         """
         Reads the json file at the given location.
@@ -267,18 +607,53 @@ class Environment:
         return content
 
     def apply_settings(self, settings: dict | pathlib.Path):
+        self._check_not_frozen()
         self.settings = settings
 
     def apply_preferences(self, preferred_units):
+        self._check_not_frozen()
         self.preferred_units = preferred_units
+        self._build_preferred()
+
+    def snapshot(self, settings: dict = None, preferred_units: dict = None) -> 'Environment':
+        """
+        An immutable copy of the environment, e.g. for simplesi.use_environment().
+
+        The settings and the preferred units are read-only, loading units into a snapshot raises a ValueError.
+        The unit definitions and lookup structures are shared with this environment until units are loaded into it next:
+        they are copied then, once, so the snapshot does not see later changes of this environment. The caches of the
+        units created lazily and of the compiled unit expressions are copied, the snapshot never writes to this
+        environment.
+
+        :param settings: settings changed in the snapshot, e.g. {'significant_digits': 5}
+        :param preferred_units: the preferred units of the snapshot, by default the ones of this environment
+        """
+        snapshot = copy.copy(self)
+        self._shared = True
+        snapshot._units = dict(self._units)
+        snapshot._physicals = dict(self._physicals)
+        snapshot._expressions = dict(self._expressions)
+        snapshot.settings = MappingProxyType({**(self.settings or {}), **(settings or {})})
+        if preferred_units is not None:
+            snapshot.preferred_units = {k: v if isinstance(v, Dimensions) else Dimensions(*v)
+                                        for k, v in preferred_units.items()}
+        snapshot.preferred_units = MappingProxyType(dict(snapshot.preferred_units or {}))
+        snapshot._build_preferred()
+        snapshot.frozen = True
+        return snapshot
+
+    def _check_not_frozen(self) -> None:
+        if self.frozen:
+            raise ValueError('The environment is a snapshot, it can not be changed. Load the units into a new '
+                             'Environment and publish it by simplesi.set_environment().')
 
     def _push_vars(self, units_dict: dict, module: ModuleType) -> None:
         module.__dict__.update(units_dict)
 
     @property
     def number_defined_units(self):
-        from simplesi import Physical
-        return len({k: v for k, v in self.namespace_module.__dict__.items() if isinstance(v, Physical)})
+        # units of a lazy environment are defined even if not created yet
+        return len(self.all_units)
 
 
 if __name__ == '__main__':  # pragma: no cover
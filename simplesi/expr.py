@@ -0,0 +1,471 @@
+"""
+Evaluating one formula for many inputs.
+
+Operations on the variables made by var() do not compute anything, they build an expression graph. The dimensions are
+checked once, while the graph is built, then compile() turns the graph into a Kernel: a plain Python function of the
+values in SI units, without any dimension bookkeeping. Called with PhysicalArray inputs, the kernel evaluates the
+formula for all of them at once with NumPy.
+
+>>> import simplesi as si
+>>> si.environment(env_name='structural')
+>>> x = si.expr.var('x', si.mm)
+>>> y = si.expr.var('y', si.mm)
+>>> f = si.expr.compile((x - y) / (x + y) * si.expr.log(x / y))
+>>> print(f)
+Kernel(((x - y) / (x + y)) * log(x / y), variables=('x', 'y'))
+>>> round(f(37 * si.mm, 55 * si.mm), 4)
+0.0776
+>>> g = si.expr.compile(x * y * 1.5 * si.kN_m2)
+>>> print(g(x=si.PhysicalArray.from_unit([1000, 2000], si.mm), y=2 * si.m))
+[3, 6] kN
+
+Constants, e.g. 1.5 * si.kN_m2 above, are taken by their value in SI units when the graph is built.
+The mathematical functions of the kernels are the functions of this module, e.g. si.expr.sqrt(), as math.sqrt()
+can not be applied to an Expression.
+"""
+
+import builtins
+import functools
+import math
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from simplesi import Physical, NUMBER, current_environment
+from simplesi.dimensions import Dimensions
+
+DIMENSIONLESS = Dimensions(0, 0, 0, 0, 0, 0, 0)
+
+# the functions of the kernels by name: the function used for floats and the one used for NumPy arrays
+_FUNCTIONS = {
+    'sqrt': ('sqrt', 'sqrt'),
+    'exp': ('exp', 'exp'),
+    'log': ('log', 'log'),
+    'log10': ('log10', 'log10'),
+    'sin': ('sin', 'sin'),
+    'cos': ('cos', 'cos'),
+    'tan': ('tan', 'tan'),
+    'asin': ('asin', 'arcsin'),
+    'acos': ('acos', 'arccos'),
+    'atan': ('atan', 'arctan'),
+    'sinh': ('sinh', 'sinh'),
+    'cosh': ('cosh', 'cosh'),
+    'tanh': ('tanh', 'tanh'),
+}
+
+_BINARY = ('+', '-', '*', '/', '**')
+
+
+class Expression(Physical):
+    """
+    A node of an expression graph: a variable, a constant or an operation on other nodes.
+
+    Being a subclass of Physical, operations with a Physical as the left operand are handled by Expression,
+    the same as for PhysicalArray. An Expression has dimensions but no value.
+    """
+
+    __slots__ = ('op', 'args')
+
+    def __init__(self, op: str, args: tuple, dimensions: Dimensions):
+        """
+
+        :param op: 'var', 'const', an operator, e.g. '+', 'neg', 'abs' or the name of a function, e.g. 'sqrt'
+        :param args: the name of a variable, the value of a constant or the operands
+        :param dimensions: the dimensions of the result
+        """
+        self.op = op
+        self.args = args
+        self.dimensions = dimensions
+        self.value = None
+        self.conv_factor = 1.0
+        self.symbol = None
+
+    def __str__(self):
+        return _format(self)
+
+    def __repr__(self):
+        return 'Expression({}, dimensions={})'.format(_format(self), self.dimensions)
+
+    def to(self, unit: str = None):
+        raise ValueError('An Expression has no value, compile() it and call the kernel.')
+
+    def value_in(self, unit: str):
+        raise ValueError('An Expression has no value, compile() it and call the kernel.')
+
+    def _compare(self, other):
+        raise ValueError('Expressions can not be compared, compile() them and compare the results.')
+
+    __eq__ = __ne__ = __lt__ = __le__ = __gt__ = __ge__ = _compare
+    __hash__ = object.__hash__
+
+    def _binary(self, op: str, other, reflected: bool = False):
+        other = _wrap(other)
+        left, right = (other, self) if reflected else (self, other)
+
+        if op in ('+', '-'):
+            if left.dimensions is not right.dimensions:
+                raise ValueError("Cannot {} between {} and {}: dimensions are incompatible".format(
+                    'add' if op == '+' else 'subtract', left, right))
+            dimensions = left.dimensions
+        elif op == '*':
+            dimensions = left.dimensions.multiply(right.dimensions)
+        else:
+            dimensions = left.dimensions.divide(right.dimensions)
+
+        return Expression(op, (left, right), dimensions)
+
+    def __add__(self, other):
+        # addition to 0 is allowed, see Physical
+        if isinstance(other, NUMBER) and other == 0:
+            return self
+        return self._binary('+', other)
+
+    def __radd__(self, other):
+        if isinstance(other, NUMBER) and other == 0:
+            return self
+        return self._binary('+', other, reflected=True)
+
+    def __sub__(self, other):
+        if isinstance(other, NUMBER) and other == 0:
+            return self
+        return self._binary('-', other)
+
+    def __rsub__(self, other):
+        # only subtracting from 0 is allowed, see Physical
+        if isinstance(other, NUMBER) and other == 0:
+            return -self
+        return self._binary('-', other, reflected=True)
+
+    def __mul__(self, other):
+        return self._binary('*', other)
+
+    def __rmul__(self, other):
+        return self._binary('*', other, reflected=True)
+
+    def __truediv__(self, other):
+        return self._binary('/', other)
+
+    def __rtruediv__(self, other):
+        return self._binary('/', other, reflected=True)
+
+    def __pow__(self, other):
+        if isinstance(other, NUMBER):
+            return Expression('**', (self, _wrap(other)), self.dimensions.power(other))
+
+        other = _wrap(other)
+        if not (self.dimensions.dimensionsless and other.dimensions.dimensionsless):
+            raise ValueError("Cannot raise {} to the power of {}, the exponent must be a number".format(self, other))
+        return Expression('**', (self, other), DIMENSIONLESS)
+
+    def __rpow__(self, other):
+        return _wrap(other).__pow__(self)
+
+    def __neg__(self):
+        return Expression('neg', (self,), self.dimensions)
+
+    def __abs__(self):
+        return Expression('abs', (self,), self.dimensions)
+
+    def sqrt(self):
+        return sqrt(self)
+
+    def root(self, n: NUMBER = 2):
+        return self ** (1 / n)
+
+
+def _wrap(value) -> Expression:
+    """The operand as an Expression: a constant if a number or a Physical"""
+    if isinstance(value, Expression):
+        return value
+    if isinstance(value, NUMBER):
+        return Expression('const', (float(value),), DIMENSIONLESS)
+    if isinstance(value, Physical) and isinstance(value.value, NUMBER):
+        return Expression('const', (float(value.value),), value.dimensions)
+    raise ValueError("Only numbers, Physical instances and expressions can be used in an expression, not {}.".format(
+        type(value)))
+
+
+def var(name: str, unit=None) -> Expression:
+    """
+    A variable of an expression.
+
+    :param name: the name of the variable, the keyword argument of the kernel
+    :param unit: the dimensions of the variable: a Physical, e.g. si.mm, a unit expression, e.g. 'kN/m', or a
+    Dimensions. Dimensionless if not given.
+    :return: the variable
+    """
+    if unit is None:
+        dimensions = DIMENSIONLESS
+    elif isinstance(unit, Dimensions):
+        dimensions = unit
+    elif isinstance(unit, str):
+        dimensions = current_environment().compile_unit(unit).dimensions
+    elif isinstance(unit, Physical):
+        dimensions = unit.dimensions
+    else:
+        raise ValueError('The unit of a variable must be a Physical, a unit expression or a Dimensions, not {}.'.format(
+            type(unit)))
+
+    return Expression('var', (str(name),), dimensions)
+
+
+def _function(name: str, doc: str):
+    def function(x) -> Expression:
+        x = _wrap(x)
+        if name == 'sqrt':
+            return Expression(name, (x,), x.dimensions.power(0.5))
+        if not x.dimensions.dimensionsless:
+            raise ValueError('The argument of {}() must be dimensionless, not {}.'.format(name, x))
+        return Expression(name, (x,), DIMENSIONLESS)
+
+    function.__name__ = function.__qualname__ = name
+    function.__doc__ = doc
+    return function
+
+
+sqrt = _function('sqrt', 'The square root')
+exp = _function('exp', 'e to the power of the dimensionless argument')
+log = _function('log', 'The natural logarithm of the dimensionless argument')
+log10 = _function('log10', 'The base 10 logarithm of the dimensionless argument')
+sin = _function('sin', 'The sine of the dimensionless argument, in radians')
+cos = _function('cos', 'The cosine of the dimensionless argument, in radians')
+tan = _function('tan', 'The tangent of the dimensionless argument, in radians')
+asin = _function('asin', 'The arc sine of the dimensionless argument, in radians')
+acos = _function('acos', 'The arc cosine of the dimensionless argument, in radians')
+atan = _function('atan', 'The arc tangent of the dimensionless argument, in radians')
+sinh = _function('sinh', 'The hyperbolic sine of the dimensionless argument')
+cosh = _function('cosh', 'The hyperbolic cosine of the dimensionless argument')
+tanh = _function('tanh', 'The hyperbolic tangent of the dimensionless argument')
+
+
+def _text(op: str, operands: list) -> str:
+    """The Python text of an operation on its operands, given as (op, text) pairs"""
+    texts = [_parenthesized(*x) for x in operands]
+    if op in _BINARY:
+        return '{} {} {}'.format(texts[0], op, texts[1])
+    if op == 'neg':
+        return '-{}'.format(texts[0])
+    # a function, the argument needs no parentheses
+    return '{}({})'.format(op, operands[0][1])
+
+
+def _parenthesized(op: str, text: str) -> str:
+    """Operations and negative numbers are parenthesized as operands"""
+    if op in _BINARY or op == 'neg' or text.startswith('-'):
+        return '({})'.format(text)
+    return text
+
+
+def _format(node: Expression) -> str:
+    """The formula of the expression"""
+    if node.op == 'var':
+        return node.args[0]
+    if node.op == 'const':
+        return repr(node.args[0])
+    return _text(node.op, [(x.op, _format(x)) for x in node.args])
+
+
+class Kernel:
+    """
+    An expression compiled into a Python function of the values of its variables in SI units.
+
+    The kernel is called with the variables as positional arguments in the order of self.variables, or as keyword
+    arguments by name. The arguments are Physical instances or PhysicalArrays of the dimensions of the variables,
+    or numbers and NumPy arrays for dimensionless variables. Their dimensions are checked once per call.
+    The result is a Physical, or a PhysicalArray if any argument is an array, of self.dimensions.
+    Dimensionless results are returned as numbers or NumPy arrays.
+    """
+
+    def __init__(self, expression, variables: tuple = None):
+        """
+
+        :param expression: the expression to compile
+        :param variables: the names of the variables in the order of the positional arguments of the kernel,
+        by default in the order of their first appearance in the expression
+        """
+        expression = _wrap(expression)
+        self.expression = expression
+        self.dimensions = expression.dimensions
+
+        nodes, found = _unique_nodes(expression)
+        if variables is None:
+            variables = tuple(found)
+        else:
+            variables = tuple(variables)
+            if sorted(variables) != sorted(found):
+                raise ValueError('The variables must be {}, you have {}.'.format(sorted(found), sorted(variables)))
+
+        self.variables = variables
+        self._dimensions = tuple(found[x] for x in variables)
+        self.source = _source(nodes, {x: '_v{}'.format(i) for i, x in enumerate(variables)})
+
+        self._float = self._build(False)
+        self._array = None
+
+    def __str__(self):
+        return 'Kernel({}, variables={})'.format(_format(self.expression), self.variables)
+
+    __repr__ = __str__
+
+    def _build(self, vectorized: bool):
+        if vectorized:
+            if np is None:
+                raise ImportError("Evaluating a Kernel for arrays requires NumPy.")
+            namespace = {'_' + k: getattr(np, v[1]) for k, v in _FUNCTIONS.items()}
+        else:
+            namespace = {'_' + k: getattr(math, v[0]) for k, v in _FUNCTIONS.items()}
+        namespace['_inf'] = math.inf
+        namespace['_nan'] = math.nan
+
+        exec(_code(self.source), namespace)
+        return namespace['kernel']
+
+    def function(self, vectorized: bool = False):
+        """
+        The compiled function: it takes the values of the variables in SI units as positional arguments and returns
+        the value of the result in SI units. There are no checks at all.
+
+        :param vectorized: the function for NumPy arrays if True, for floats otherwise
+        """
+        if not vectorized:
+            return self._float
+        if self._array is None:
+            self._array = self._build(True)
+        return self._array
+
+    def __call__(self, *args, **kwargs):
+        if kwargs:
+            args = self._bind(args, kwargs)
+        elif len(args) != len(self.variables):
+            raise ValueError('The kernel takes {} arguments {}, you have {}.'.format(
+                len(self.variables), self.variables, len(args)))
+
+        values = []
+        vectorized = False
+        for arg, name, dimensions in zip(args, self.variables, self._dimensions):
+            if isinstance(arg, Physical):
+                # Dimensions are interned, identity is equality
+                if arg.dimensions is not dimensions:
+                    raise ValueError('The dimensions of "{}" must be {}, you have {}.'.format(name, dimensions, arg))
+                arg = arg.value
+            elif not dimensions.dimensionsless:
+                raise ValueError('"{}" must be a Physical of dimensions {}, you have {}.'.format(name, dimensions, arg))
+
+            if not isinstance(arg, NUMBER):
+                if np is None or not isinstance(arg, np.ndarray):
+                    raise ValueError('"{}" must be a number or an array, you have {}.'.format(name, type(arg)))
+                vectorized = True
+            values.append(arg)
+
+        result = self.function(True)(*values) if vectorized else self._float(*values)
+
+        if self.dimensions.dimensionsless:
+            return result
+        if vectorized:
+            from simplesi.arrays import PhysicalArray
+            return PhysicalArray._trusted(np.asarray(result, dtype=float), self.dimensions, 1.0, None)
+        return Physical._trusted(result, self.dimensions, 1.0, None)
+
+    def _bind(self, args: tuple, kwargs: dict) -> list:
+        """The arguments in the order of the variables"""
+        bound = dict(zip(self.variables, args))
+        for name, value in kwargs.items():
+            if name not in self.variables:
+                raise ValueError('Unknown variable "{}", the variables are {}.'.format(name, self.variables))
+            if name in bound:
+                raise ValueError('Multiple values for "{}".'.format(name))
+            bound[name] = value
+
+        missing = [x for x in self.variables if x not in bound]
+        if missing:
+            raise ValueError('Missing values for {}.'.format(missing))
+        return [bound[x] for x in self.variables]
+
+
+def _unique_nodes(expression: Expression) -> tuple:
+    """
+    The distinct nodes of the graph, children before parents, and the dimensions of the variables by name.
+    Nodes of the same operation on the same operands are merged, even if built separately, e.g. x + y used twice.
+
+    A node is (op, args) where the operands are replaced by their indices in the list.
+    """
+    nodes = []
+    indices = {}  # (op, args) -> index
+    by_id = {}  # id(node) -> index, the same node is visited once
+    variables = {}
+
+    # iterative post-order traversal, a formula may be deeper than the recursion limit
+    stack = [(expression, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in by_id:
+            continue
+
+        if node.op == 'var':
+            name = node.args[0]
+            if variables.setdefault(name, node.dimensions) is not node.dimensions:
+                raise ValueError('The variable "{}" has different dimensions: {} and {}.'.format(
+                    name, variables[name], node.dimensions))
+            key = ('var', name)
+        elif node.op == 'const':
+            key = ('const', node.args[0])
+        elif not expanded:
+            stack.append((node, True))
+            stack.extend((x, False) for x in reversed(node.args))
+            continue
+        else:
+            key = (node.op, tuple(by_id[id(x)] for x in node.args))
+
+        index = indices.get(key)
+        if index is None:
+            index = indices[key] = len(nodes)
+            nodes.append(key)
+        by_id[id(node)] = index
+
+    return nodes, variables
+
+
+@functools.lru_cache(maxsize=256)
+def _code(source: str):
+    """The compiled source of a kernel, kept as the same formula is often compiled again, e.g. by si.solve()"""
+    return builtins.compile(source, '<simplesi.expr>', 'exec')
+
+
+def _source(nodes: list, arguments: dict) -> str:
+    """The Python source of the kernel function, the results used more than once are assigned to local variables"""
+    uses = [0] * len(nodes)
+    uses[-1] = 1
+    for op, args in nodes:
+        if op not in ('var', 'const'):
+            for x in args:
+                uses[x] += 1
+
+    lines = []
+    operands = []  # the (op, text) of the nodes, see _text()
+    for index, (op, args) in enumerate(nodes):
+        if op == 'var':
+            text = arguments[args]
+        elif op == 'const':
+            text = repr(args) if math.isfinite(args) else ('-_inf' if args < 0 else '_inf' if args > 0 else '_nan')
+        else:
+            text = _text(op if op in _BINARY or op in ('neg', 'abs') else '_' + op, [operands[x] for x in args])
+            if uses[index] > 1:
+                lines.append('    _t{} = {}'.format(index, text))
+                op, text = 'var', '_t{}'.format(index)
+        operands.append((op, text))
+
+    return 'def kernel({}):\n{}    return {}\n'.format(
+        ', '.join(arguments.values()), ''.join(x + '\n' for x in lines), operands[-1][1])
+
+
+def compile(expression, variables: tuple = None) -> Kernel:
+    """
+    Compiles the expression into a Kernel, see Kernel.
+
+    :param expression: the expression built of variables, see var()
+    :param variables: the names of the variables in the order of the positional arguments of the kernel,
+    by default in the order of their first appearance in the expression
+    """
+    return Kernel(expression, variables)
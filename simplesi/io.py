@@ -0,0 +1,279 @@
+"""
+Reading and writing columns of quantities as CSV.
+
+The unit of a column is given in the header, e.g. 'span [m]' or 'load [kN/m2]', or in the cells, e.g. '350 mm'.
+It is resolved once per column, using the unit expressions of simplesi.parsing, and the numbers of a chunk of rows
+are converted in bulk. Columns that are not numbers are kept as text.
+
+read_csv() yields the file in chunks of rows, so the memory used does not depend on the size of the file.
+A chunk is a dict of the columns: a PhysicalArray for quantities and a float array for numbers, if NumPy is available,
+a list of Physical instances and a list of floats otherwise. Empty cells are NaN.
+
+>>> import io
+>>> import simplesi as si
+>>> from simplesi import io as si_io
+>>> si.environment(env_name='structural')
+>>> data = io.StringIO('beam,span [m],load\\nB1,3.5,12 kN/m\\nB2,4.0,15 kN/m\\n')
+>>> for chunk in si_io.read_csv(data):
+...     print(chunk['beam'], chunk['span'], chunk['load'])
+['B1', 'B2'] [3500, 4000] mm [12000, 15000] N/m
+>>> out = io.StringIO()
+>>> si_io.write_csv(out, chunk, units={'span': 'cm', 'load': 'kN/m'})
+>>> print(out.getvalue().replace('\\r', ''))
+beam,span [cm],load [kN/m]
+B1,350.0,12.0
+B2,400.0,15.0
+<BLANKLINE>
+"""
+
+import csv
+import itertools
+import math
+import pathlib
+import re
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from simplesi import Physical, current_environment, parsing
+
+# 'name [unit]'
+_HEADER = re.compile(r'^\s*(?P<name>.*?)\s*\[(?P<unit>[^\]]*)\]\s*$')
+
+NAN = float('nan')
+
+
+class _Column:
+    """How the cells of a column are converted: the name, the kind and the unit of the column"""
+
+    def __init__(self, name: str, unit: str = None):
+        self.name = name
+        self.unit = None  # the compiled unit expression
+        self.kind = None  # 'quantity': number and unit in the header, 'cells': number and unit in the cells,
+        # 'number' or 'text', None until decided by the first non-empty cell
+        if unit:
+            self.unit = current_environment().compile_unit(unit)
+            self.kind = 'quantity'
+
+    def decide(self, cells: list) -> None:
+        """The kind of a column without a unit in the header is decided by its first non-empty cell"""
+        cell = next((x for x in cells if x.strip()), None)
+        if cell is None:
+            return
+
+        try:
+            _, unit = parsing.split_quantity(cell)
+        except ValueError:
+            self.kind = 'text'
+            return
+
+        if not unit:
+            self.kind = 'number'
+            return
+
+        try:
+            self.unit = current_environment().compile_unit(unit)
+        except ValueError:
+            # e.g. '12 apples'
+            self.kind = 'text'
+            return
+        self.kind = 'cells'
+
+    def convert(self, cells: list, first_row: int):
+        """The column of the chunk, first_row is the number of its first row in the file, for the error messages"""
+        if self.kind is None:
+            self.decide(cells)
+
+        # not decided yet if all cells are empty so far
+        kind = self.kind or 'number'
+
+        if kind == 'text':
+            return cells
+
+        if kind == 'cells':
+            values = self._values_with_units(cells, first_row)
+        else:
+            values = self._values(cells, first_row)
+
+        if kind == 'number' or self.unit.dimensions.dimensionsless:
+            factor = 1.0 if self.unit is None else self.unit.factor
+            if np is None:
+                return [x * factor for x in values]
+            return values * factor
+
+        return self._quantities(values)
+
+    def _values(self, cells: list, first_row: int):
+        """The numbers of the cells, in bulk if possible"""
+        if np is not None:
+            try:
+                return np.array(cells, dtype=float)
+            except ValueError:
+                # empty or invalid cells, converted one by one below
+                pass
+
+        values = []
+        for row, cell in enumerate(cells, start=first_row):
+            if not cell.strip():
+                values.append(NAN)
+                continue
+            try:
+                values.append(float(cell))
+            except ValueError:
+                raise ValueError('Not a number in column "{}", row {}: "{}".'.format(self.name, row, cell)) from None
+
+        return values if np is None else np.array(values, dtype=float)
+
+    def _values_with_units(self, cells: list, first_row: int):
+        """The numbers of the cells with units, in the unit of the column"""
+        values = []
+        for row, cell in enumerate(cells, start=first_row):
+            if not cell.strip():
+                values.append(NAN)
+                continue
+
+            try:
+                value, unit = parsing.split_quantity(cell)
+                # the compiled expressions are cached, the same unit as in the first cell is a dict lookup
+                compiled = current_environment().compile_unit(unit) if unit else None
+            except ValueError:
+                raise ValueError('Not a quantity in column "{}", row {}: "{}".'.format(self.name, row, cell)) from None
+
+            if compiled is None or compiled.dimensions is not self.unit.dimensions:
+                raise ValueError('The unit in column "{}", row {} is not compatible with "{}": "{}".'.format(
+                    self.name, row, self.unit.symbol, cell))
+            values.append(value * compiled.factor / self.unit.factor)
+
+        return values if np is None else np.array(values, dtype=float)
+
+    def _quantities(self, values):
+        unit = self.unit
+        if np is None:
+            return [Physical._trusted(x * unit.factor, unit.dimensions, 1.0, unit.symbol) for x in values]
+
+        from simplesi.arrays import PhysicalArray
+        return PhysicalArray._trusted(values * unit.factor, unit.dimensions, 1.0, unit.symbol)
+
+
+def _open(file, mode: str, encoding: str):
+    """The opened file and whether it must be closed, file is a path or a file-like object"""
+    if isinstance(file, (str, pathlib.Path)):
+        return open(file, mode, encoding=encoding, newline=''), True
+    return file, False
+
+
+def read_csv(file, chunk_size: int = 10000, units: dict = None, encoding: str = 'utf-8', **fmtparams):
+    """
+    Reads the CSV file in chunks of rows. The first row is the header.
+
+    :param file: the path of the file or a file-like object opened in text mode
+    :param chunk_size: the number of rows in a chunk
+    :param units: the unit expressions of the columns, by the name of the column. These take precedence over the units
+    in the header, the cells must then be numbers.
+    :param encoding: the encoding of the file, if opened by its path
+    :param fmtparams: passed to csv.reader, e.g. delimiter=';'
+    :return: yields dicts of the columns, see the module docstring
+    """
+    if chunk_size < 1:
+        raise ValueError('The chunk size must be positive, you have {}.'.format(chunk_size))
+    units = units or {}
+
+    f, close = _open(file, 'r', encoding)
+    try:
+        reader = csv.reader(f, **fmtparams)
+        header = next(reader, None)
+        if header is None:
+            return
+
+        columns = []
+        for title in header:
+            match = _HEADER.match(title)
+            name, unit = (match.group('name'), match.group('unit')) if match else (title.strip(), None)
+            columns.append(_Column(name, units.get(name, unit)))
+
+        first_row = 2
+        while True:
+            rows = list(itertools.islice(reader, chunk_size))
+            if not rows:
+                return
+
+            for number, row in enumerate(rows, start=first_row):
+                if len(row) != len(columns):
+                    raise ValueError('Row {} has {} cells, the header has {}.'.format(number, len(row), len(columns)))
+
+            yield {column.name: column.convert(list(cells), first_row) for column, cells in zip(columns, zip(*rows))}
+            first_row += len(rows)
+    finally:
+        if close:
+            f.close()
+
+
+def _column_values(name: str, column, unit: str):
+    """The unit and the values of a column to write, converted to the unit"""
+    if isinstance(column, Physical):
+        # a PhysicalArray
+        if unit is None:
+            unit = column._print_unit()
+        _, definition = current_environment().resolve_unit(column.dimensions, unit)
+        return unit, (column.value / (definition['Value'] * definition['Factor'])).tolist()
+
+    column = list(column)
+    physicals = [x for x in column if isinstance(x, Physical)]
+    if not physicals:
+        # numbers or text, written as they are
+        return None, column
+    if len(physicals) != len(column):
+        raise ValueError('Column "{}" mixes Physical instances and other values.'.format(name))
+
+    if unit is None:
+        unit = physicals[0]._print_unit()
+
+    from simplesi import values_in
+    return unit, values_in(physicals, unit)
+
+
+def write_csv(file, chunks, units: dict = None, encoding: str = 'utf-8', **fmtparams) -> None:
+    """
+    Writes columns of quantities to a CSV file, converted to the given units. The units are written to the header.
+
+    :param file: the path of the file or a file-like object opened in text mode
+    :param chunks: a dict of the columns or an iterable of such dicts, e.g. from read_csv().
+    A column is a PhysicalArray or a list of Physical instances, numbers or strings.
+    :param units: the units of the columns by the name of the column, any unit expression, e.g. 'kN/m^2'.
+    If not given for a column, the unit of the first chunk used for printing, see Physical.to().
+    :param encoding: the encoding of the file, if opened by its path
+    :param fmtparams: passed to csv.writer, e.g. delimiter=';'
+    """
+    if isinstance(chunks, dict):
+        chunks = (chunks,)
+    units = dict(units or {})
+
+    f, close = _open(file, 'w', encoding)
+    try:
+        writer = csv.writer(f, **fmtparams)
+        names = None
+        for chunk in chunks:
+            columns = {}
+            for name, column in chunk.items():
+                unit, columns[name] = _column_values(name, column, units.get(name))
+                # the unit of the first chunk is used for the whole file
+                if unit is not None:
+                    units.setdefault(name, unit)
+
+            if names is None:
+                names = list(chunk)
+                writer.writerow(['{} [{}]'.format(x, units[x]) if x in units else x for x in names])
+            elif list(chunk) != names:
+                raise ValueError('All chunks must have the same columns.')
+
+            writer.writerows(zip(*(_cell(x) for x in columns.values())))
+    finally:
+        if close:
+            f.close()
+
+
+def _cell(values: list) -> list:
+    """Empty cells for the NaN values, like when reading"""
+    return ['' if isinstance(x, float) and math.isnan(x) else x for x in values]
@@ -0,0 +1,172 @@
+"""
+Mathematical functions of Physical instances, numbers and arrays.
+
+The functions are looked up once, when this module is imported: numbers are passed to the functions of the math
+module, PhysicalArrays and NumPy arrays to the functions of NumPy, computing all values in one call.
+
+Angles are numbers in radians, or dimensionless Physical instances, e.g. 30 * si.deg, whose value is converted with the
+degree, or the radian, of the environment. The symbol does not matter, so angles computed with arithmetics can be used.
+Other arguments with dimensions raise a ValueError.
+
+>>> import simplesi as si
+>>> si.environment(env_name='structural')
+>>> round(si.math.sin(30 * si.deg), 12)
+0.5
+>>> round(si.math.atan2(1 * si.m, 1000 * si.mm), 12) == round(si.math.pi / 4, 12)
+True
+>>> print(si.math.hypot(3 * si.m, 400 * si.cm))
+5000 mm
+>>> print(si.math.sqrt(si.PhysicalArray.from_unit([4, 9], si.m2)).to('m'))
+[2. 3.]
+"""
+
+import functools
+import math
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from simplesi import Physical, NUMBER, current_environment
+from simplesi.arrays import PhysicalArray
+
+pi = math.pi
+e = math.e
+tau = math.tau
+inf = math.inf
+nan = math.nan
+
+# the unit expressions of the environment the radians of an angle of value 1 were found in, and the radians
+_angle = (None, 1.0)
+
+
+def _radians() -> float:
+    """The radians of a dimensionless Physical of value 1, found by the degree or the radian of the environment"""
+    global _angle
+
+    env = current_environment()
+    # the unit expressions are replaced when the units change
+    if _angle[0] is not env._expressions:
+        radians = 1.0
+        for unit, factor in (('deg', math.pi / 180), ('rad', 1.0)):
+            try:
+                compiled = env.compile_unit(unit)
+            except ValueError:
+                continue
+            if compiled.dimensions.dimensionsless:
+                radians = factor / compiled.factor
+                break
+        _angle = (env._expressions, radians)
+    return _angle[1]
+
+
+def _angle_value(x, name: str):
+    """The angle in radians: a number or an array, or the value of a dimensionless Physical"""
+    if isinstance(x, Physical):
+        if not x.dimensions.dimensionsless:
+            raise ValueError('The argument of {}() must be an angle or a number, not {}.'.format(name, x))
+        radians = _radians()
+        return x.value if radians == 1.0 else x.value * radians
+    return x
+
+
+def _dimensionless_value(x, name: str):
+    """The value of a number or an array, or of a dimensionless Physical"""
+    if isinstance(x, Physical):
+        if not x.dimensions.dimensionsless:
+            raise ValueError('The argument of {}() must be dimensionless, not {}.'.format(name, x))
+        return x.value
+    return x
+
+
+def _values(arguments: tuple, name: str) -> tuple:
+    """The values of the arguments of equal dimensions, and the first argument if they are Physical instances"""
+    first = arguments[0]
+    if not isinstance(first, Physical):
+        if any(isinstance(x, Physical) for x in arguments):
+            raise ValueError('The arguments of {}() must be of equal dimensions, you have {}.'.format(name, arguments))
+        return arguments, None
+    for x in arguments:
+        if not isinstance(x, Physical) or x.dimensions is not first.dimensions:
+            raise ValueError('The arguments of {}() must be of equal dimensions, you have {}.'.format(name, arguments))
+    return tuple(x.value for x in arguments), first
+
+
+def _function(name: str, argument, doc: str):
+    """The function of one argument: the function of the math module for numbers, of NumPy for arrays"""
+    scalar = getattr(math, name)
+    array = getattr(np, name) if np is not None else None
+
+    def function(x):
+        # numbers first, they are the most common
+        if type(x) is float or type(x) is int:
+            return scalar(x)
+        x = argument(x, name)
+        if isinstance(x, NUMBER):
+            return scalar(x)
+        if array is None:
+            raise ImportError("{}() of arrays requires NumPy.".format(name))
+        return array(x)
+
+    function.__name__ = function.__qualname__ = name
+    function.__doc__ = doc
+    return function
+
+
+sin = _function('sin', _angle_value, 'The sine of the angle')
+cos = _function('cos', _angle_value, 'The cosine of the angle')
+tan = _function('tan', _angle_value, 'The tangent of the angle')
+exp = _function('exp', _dimensionless_value, 'e to the power of the dimensionless argument')
+_log = _function('log', _dimensionless_value, 'The natural logarithm of the dimensionless argument')
+
+
+def log(x, base: NUMBER = None):
+    """The logarithm of the dimensionless argument, the natural logarithm if the base is not given"""
+    if base is None:
+        return _log(x)
+    return _log(x) / math.log(base)
+
+
+def atan2(y, x):
+    """The angle of the point (x, y) in radians, x and y of equal dimensions"""
+    (y, x), _ = _values((y, x), 'atan2')
+    if isinstance(y, NUMBER) and isinstance(x, NUMBER):
+        return math.atan2(y, x)
+    if np is None:
+        raise ImportError("atan2() of arrays requires NumPy.")
+    return np.arctan2(y, x)
+
+
+def hypot(*coordinates):
+    """The length of the vector of the coordinates, of equal dimensions, in the unit of the first coordinate"""
+    if not coordinates:
+        return 0.0
+    values, first = _values(coordinates, 'hypot')
+
+    if all(isinstance(x, NUMBER) for x in values):
+        value = math.hypot(*values)
+    elif np is None:
+        raise ImportError("hypot() of arrays requires NumPy.")
+    else:
+        value = functools.reduce(np.hypot, values) if len(values) > 1 else np.abs(values[0])
+
+    if first is None or first.dimensions.dimensionsless:
+        return value
+    # an array if any coordinate is an array
+    cls = Physical if isinstance(value, NUMBER) else PhysicalArray
+    return cls._trusted(value, first.dimensions, first.conv_factor, first.symbol)
+
+
+def sqrt(x):
+    """The square root, of a Physical with the square root of its dimensions"""
+    if type(x) is float or type(x) is int:
+        return math.sqrt(x)
+    if not isinstance(x, Physical):
+        return math.sqrt(x) if isinstance(x, NUMBER) else np.sqrt(x)
+
+    value = math.sqrt(x.value) if isinstance(x.value, NUMBER) else np.sqrt(x.value)
+    dimensions = x.dimensions.power(0.5)
+    if dimensions.dimensionsless:
+        return value
+    return type(x)._trusted(value, dimensions, 1.0, None)
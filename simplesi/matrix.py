@@ -0,0 +1,365 @@
+"""
+Matrices and vectors of quantities of different dimensions, e.g. stiffness matrices, load and displacement vectors.
+
+A PhysicalVector holds a NumPy float array of the values in SI units and one Dimensions per entry.
+A PhysicalMatrix holds a NumPy float matrix and one Dimensions per row and per column: the dimensions of an entry are
+the product of the dimensions of its row and its column. A stiffness matrix relating forces in kN and moments in kNm
+to displacements in m and rotations has rows of kN and kNm and columns of 1/m and 1.
+
+The dimensions are checked once per product or solve, for the rows and columns, and the work is done by NumPy.
+
+>>> import simplesi as si
+>>> si.environment(env_name='structural')
+>>> K = si.PhysicalMatrix.from_units([[200, -50], [-50, 100]], rows=['kN', 'kNm'], columns=['1/m', '1'])
+>>> print(K[0, 0].to('kN/m'), K[1, 0])
+200 kN/m -50 kN
+>>> F = si.PhysicalVector.from_units([10, 5], ['kN', 'kNm'])
+>>> u = K.solve(F)
+>>> print(u)
+[71.43 mm, 0.0857]
+>>> print(K @ u)
+[10 kN, 5.00 kNm]
+
+NumPy is needed to use them.
+"""
+
+from __future__ import annotations
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from simplesi import Physical, NUMBER, current_environment
+from simplesi.dimensions import Dimensions
+
+DIMENSIONLESS = Dimensions(0, 0, 0, 0, 0, 0, 0)
+
+
+def _unit(unit) -> tuple:
+    """The dimensions and the number of base SI units of a unit: a unit expression, a Physical or a Dimensions"""
+    if isinstance(unit, str):
+        compiled = current_environment().compile_unit(unit)
+        return compiled.dimensions, compiled.factor
+    if isinstance(unit, Physical):
+        return unit.dimensions, unit.value
+    if isinstance(unit, Dimensions):
+        return unit, 1.0
+    if isinstance(unit, NUMBER):
+        return DIMENSIONLESS, unit
+    raise ValueError('A unit must be a unit expression, a Physical or a Dimensions, not {}.'.format(type(unit)))
+
+
+def _dimensions(dimensions) -> tuple:
+    return tuple(x if isinstance(x, Dimensions) else Dimensions(*x) for x in dimensions)
+
+
+def _entry(value: float, dimensions: Dimensions):
+    """A Physical, or a float if dimensionless, the same as the result of an operation"""
+    if dimensions.dimensionsless:
+        return value
+    return Physical._trusted(value, dimensions, 1.0, None)
+
+
+def _common(dimensions: list, what: str) -> Dimensions:
+    """The dimensions if all are the same, raises ValueError otherwise"""
+    first = dimensions[0] if dimensions else DIMENSIONLESS
+    # Dimensions are interned, identity is equality
+    if any(x is not first for x in dimensions):
+        raise ValueError('The dimensions of {} do not match.'.format(what))
+    return first
+
+
+class PhysicalVector:
+    """
+    A vector of quantities, each entry with its own dimensions.
+
+    The value is a NumPy float array of the values in SI units, dimensions is a tuple of Dimensions, one per entry.
+    Indexing and iterating give Physical instances, or floats for dimensionless entries.
+    """
+
+    __slots__ = ('value', 'dimensions')
+
+    def __init__(self, value, dimensions):
+        """
+
+        :param value: the values in SI units, anything NumPy can convert to a one-dimensional float array
+        :param dimensions: the dimensions of the entries
+        """
+        if np is None:
+            raise ImportError("PhysicalVector requires NumPy.")
+
+        try:
+            value = np.asarray(value, dtype=float)
+        except (TypeError, ValueError):
+            raise ValueError("Values must be numbers, you have {}.".format(value)) from None
+
+        dimensions = _dimensions(dimensions)
+        if value.ndim != 1 or len(value) != len(dimensions):
+            raise ValueError("A PhysicalVector needs one dimensions per value, you have {} values and {} dimensions."
+                             .format(value.size, len(dimensions)))
+
+        self.value = value
+        self.dimensions = dimensions
+
+    @classmethod
+    def _trusted(cls, value, dimensions: tuple) -> PhysicalVector:
+        """A PhysicalVector of checked arguments, see Physical._trusted()"""
+        self = cls.__new__(cls)
+        self.value = value
+        self.dimensions = dimensions
+        return self
+
+    @classmethod
+    def from_units(cls, values, units) -> PhysicalVector:
+        """The vector of values given in the units, e.g. PhysicalVector.from_units([10, 5], ['kN', 'kNm'])"""
+        dimensions, factors = zip(*[_unit(x) for x in units]) if units else ((), ())
+        return cls(np.asarray(values, dtype=float) * np.asarray(factors, dtype=float), dimensions)
+
+    @classmethod
+    def from_physicals(cls, physicals) -> PhysicalVector:
+        """The vector of the Physical instances and numbers, numbers are dimensionless"""
+        physicals = list(physicals)
+        for p in physicals:
+            if not isinstance(p, (Physical,) + NUMBER):
+                raise ValueError("Can only create a PhysicalVector from Physical instances and numbers, not {}.".format(
+                    type(p)))
+        return cls([p.value if isinstance(p, Physical) else p for p in physicals],
+                   [p.dimensions if isinstance(p, Physical) else DIMENSIONLESS for p in physicals])
+
+    def __len__(self):
+        return len(self.value)
+
+    def __getitem__(self, item: int):
+        return _entry(float(self.value[item]), self.dimensions[item])
+
+    def __iter__(self):
+        for value, dimensions in zip(self.value, self.dimensions):
+            yield _entry(float(value), dimensions)
+
+    def to(self, units) -> np.ndarray:
+        """The values as a float array in the units, one per entry"""
+        units = [_unit(x) for x in units]
+        if len(units) != len(self):
+            raise ValueError('One unit per entry is needed, you have {} for {} entries.'.format(len(units), len(self)))
+        for i, (dimensions, _) in enumerate(units):
+            if dimensions is not self.dimensions[i]:
+                raise ValueError('The unit of entry {} does not match its dimensions {}.'.format(i, self.dimensions[i]))
+        return self.value / np.array([x[1] for x in units], dtype=float)
+
+    def __str__(self):
+        return '[{}]'.format(', '.join(Physical.as_str(x) if isinstance(x, NUMBER) else str(x) for x in self))
+
+    def __repr__(self):
+        return 'PhysicalVector(value={!r}, dimensions={})'.format(self.value, self.dimensions)
+
+    __hash__ = None
+
+    def _check_other(self, other, operation: str):
+        if not isinstance(other, PhysicalVector):
+            raise ValueError('Can only {} between PhysicalVector instances, not {}.'.format(operation, type(other)))
+        if len(other) != len(self) or any(x is not y for x, y in zip(self.dimensions, other.dimensions)):
+            raise ValueError('Can only {} between PhysicalVector instances of equal dimensions.'.format(operation))
+
+    def __add__(self, other):
+        self._check_other(other, 'add')
+        return PhysicalVector._trusted(self.value + other.value, self.dimensions)
+
+    def __sub__(self, other):
+        self._check_other(other, 'subtract')
+        return PhysicalVector._trusted(self.value - other.value, self.dimensions)
+
+    def __neg__(self):
+        return PhysicalVector._trusted(-self.value, self.dimensions)
+
+    def __mul__(self, other):
+        if isinstance(other, NUMBER):
+            return PhysicalVector._trusted(self.value * other, self.dimensions)
+        if isinstance(other, Physical) and isinstance(other.value, NUMBER):
+            return PhysicalVector._trusted(self.value * other.value,
+                                           tuple(x.multiply(other.dimensions) for x in self.dimensions))
+        raise ValueError('Can only multiply a PhysicalVector by a number or a Physical, not {}.'.format(type(other)))
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def __truediv__(self, other):
+        if isinstance(other, NUMBER):
+            return PhysicalVector._trusted(self.value / other, self.dimensions)
+        if isinstance(other, Physical) and isinstance(other.value, NUMBER):
+            return PhysicalVector._trusted(self.value / other.value,
+                                           tuple(x.divide(other.dimensions) for x in self.dimensions))
+        raise ValueError('Can only divide a PhysicalVector by a number or a Physical, not {}.'.format(type(other)))
+
+
+class PhysicalMatrix:
+    """
+    A matrix of quantities, the dimensions of an entry are the product of the dimensions of its row and its column.
+
+    The value is a NumPy float matrix of the values in SI units, rows and columns are tuples of Dimensions.
+    The value can be changed in place, e.g. to assemble a stiffness matrix from element matrices.
+    """
+
+    __slots__ = ('value', 'rows', 'columns')
+
+    # NumPy arrays as left operand leave the operation to PhysicalMatrix
+    __array_ufunc__ = None
+
+    def __init__(self, value, rows, columns):
+        """
+
+        :param value: the values in SI units, anything NumPy can convert to a two-dimensional float array
+        :param rows: the dimensions of the rows
+        :param columns: the dimensions of the columns
+        """
+        if np is None:
+            raise ImportError("PhysicalMatrix requires NumPy.")
+
+        try:
+            value = np.asarray(value, dtype=float)
+        except (TypeError, ValueError):
+            raise ValueError("Values must be numbers, you have {}.".format(value)) from None
+
+        rows, columns = _dimensions(rows), _dimensions(columns)
+        if value.shape != (len(rows), len(columns)):
+            raise ValueError("A PhysicalMatrix of shape {} needs {} row and {} column dimensions, you have {} and {}."
+                             .format(value.shape, *value.shape[:2], len(rows), len(columns)))
+
+        self.value = value
+        self.rows = rows
+        self.columns = columns
+
+    @classmethod
+    def _trusted(cls, value, rows: tuple, columns: tuple) -> PhysicalMatrix:
+        """A PhysicalMatrix of checked arguments, see Physical._trusted()"""
+        self = cls.__new__(cls)
+        self.value = value
+        self.rows = rows
+        self.columns = columns
+        return self
+
+    @classmethod
+    def from_units(cls, values, rows, columns) -> PhysicalMatrix:
+        """
+        The matrix of values given in units, the unit of an entry is the product of the units of its row and column.
+
+        :param values: the values
+        :param rows: the units of the rows, e.g. ['kN', 'kNm']
+        :param columns: the units of the columns, e.g. ['1/m', '1'] for a stiffness matrix in kN/m, kN and kNm
+        """
+        rows, row_factors = zip(*[_unit(x) for x in rows]) if rows else ((), ())
+        columns, column_factors = zip(*[_unit(x) for x in columns]) if columns else ((), ())
+        values = np.asarray(values, dtype=float) * np.outer(row_factors, column_factors)
+        return cls(values, rows, columns)
+
+    @property
+    def shape(self) -> tuple:
+        return self.value.shape
+
+    @property
+    def T(self) -> PhysicalMatrix:
+        """The transposed matrix"""
+        return PhysicalMatrix._trusted(self.value.T, self.columns, self.rows)
+
+    def dimensions(self, row: int, column: int) -> Dimensions:
+        """The dimensions of an entry"""
+        return self.rows[row].multiply(self.columns[column])
+
+    def __getitem__(self, item: tuple):
+        row, column = item
+        return _entry(float(self.value[row, column]), self.dimensions(row, column))
+
+    def to(self, rows, columns) -> np.ndarray:
+        """The values as a float matrix, the unit of an entry is the product of the units of its row and column"""
+        rows = [_unit(x) for x in rows]
+        columns = [_unit(x) for x in columns]
+        if len(rows) != self.shape[0] or len(columns) != self.shape[1]:
+            raise ValueError('One unit per row and column is needed.')
+        # the units may differ from the dimensions of the rows and columns by a common factor, e.g. m and 1/m
+        entries = [r[0].multiply(c[0]) for r in rows for c in columns]
+        if any(x is not self.dimensions(i // len(columns), i % len(columns)) for i, x in enumerate(entries)):
+            raise ValueError('The units do not match the dimensions of the entries.')
+        return self.value / np.outer([x[1] for x in rows], [x[1] for x in columns])
+
+    def __repr__(self):
+        return 'PhysicalMatrix(value={!r}, rows={}, columns={})'.format(self.value, self.rows, self.columns)
+
+    __hash__ = None
+
+    def _check_other(self, other, operation: str):
+        if not isinstance(other, PhysicalMatrix):
+            raise ValueError('Can only {} between PhysicalMatrix instances, not {}.'.format(operation, type(other)))
+        if other.shape != self.shape:
+            raise ValueError('Can only {} between PhysicalMatrix instances of the same shape.'.format(operation))
+        # the dimensions of all entries are equal if those of the first row and the first column are
+        if self.shape[0] and self.shape[1] and (
+                any(self.dimensions(i, 0) is not other.dimensions(i, 0) for i in range(self.shape[0]))
+                or any(self.dimensions(0, j) is not other.dimensions(0, j) for j in range(self.shape[1]))):
+            raise ValueError('Can only {} between PhysicalMatrix instances of equal dimensions.'.format(operation))
+
+    def __add__(self, other):
+        self._check_other(other, 'add')
+        return PhysicalMatrix._trusted(self.value + other.value, self.rows, self.columns)
+
+    def __sub__(self, other):
+        self._check_other(other, 'subtract')
+        return PhysicalMatrix._trusted(self.value - other.value, self.rows, self.columns)
+
+    def __neg__(self):
+        return PhysicalMatrix._trusted(-self.value, self.rows, self.columns)
+
+    def __mul__(self, other):
+        if isinstance(other, NUMBER):
+            return PhysicalMatrix._trusted(self.value * other, self.rows, self.columns)
+        if isinstance(other, Physical) and isinstance(other.value, NUMBER):
+            return PhysicalMatrix._trusted(self.value * other.value,
+                                           tuple(x.multiply(other.dimensions) for x in self.rows), self.columns)
+        raise ValueError('Can only multiply a PhysicalMatrix by a number or a Physical, not {}.'.format(type(other)))
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def __matmul__(self, other):
+        if isinstance(other, PhysicalVector):
+            if len(other) != self.shape[1]:
+                raise ValueError('Can not multiply a matrix of shape {} by a vector of {} entries.'.format(
+                    self.shape, len(other)))
+            # every term of a row has the dimensions of the row times this
+            common = _common([c.multiply(u) for c, u in zip(self.columns, other.dimensions)],
+                             'the columns of the matrix and the entries of the vector')
+            return PhysicalVector._trusted(self.value @ other.value, tuple(x.multiply(common) for x in self.rows))
+
+        if isinstance(other, PhysicalMatrix):
+            if other.shape[0] != self.shape[1]:
+                raise ValueError('Can not multiply matrices of shape {} and {}.'.format(self.shape, other.shape))
+            common = _common([c.multiply(r) for c, r in zip(self.columns, other.rows)],
+                             'the columns of the first matrix and the rows of the second')
+            return PhysicalMatrix._trusted(self.value @ other.value, tuple(x.multiply(common) for x in self.rows),
+                                           other.columns)
+
+        raise ValueError('Can only multiply a PhysicalMatrix by a PhysicalVector or a PhysicalMatrix, not {}.'.format(
+            type(other)))
+
+    def inv(self) -> PhysicalMatrix:
+        """The inverse matrix, e.g. the flexibility matrix of a stiffness matrix. See numpy.linalg.inv."""
+        if self.shape[0] != self.shape[1]:
+            raise ValueError('Only square matrices can be inverted, you have shape {}.'.format(self.shape))
+        return PhysicalMatrix._trusted(np.linalg.inv(self.value), tuple(x.power(-1) for x in self.columns),
+                                       tuple(x.power(-1) for x in self.rows))
+
+    def solve(self, vector: PhysicalVector) -> PhysicalVector:
+        """
+        The vector x for which self @ x is the given vector, e.g. the displacements for the loads. See numpy.linalg.solve.
+
+        The entries of the vector divided by the dimensions of the rows must all have the same dimensions.
+        """
+        if not isinstance(vector, PhysicalVector):
+            raise ValueError('Can only solve for a PhysicalVector, not {}.'.format(type(vector)))
+        if self.shape[0] != self.shape[1] or len(vector) != self.shape[0]:
+            raise ValueError('Can not solve a matrix of shape {} for a vector of {} entries.'.format(
+                self.shape, len(vector)))
+
+        common = _common([v.divide(r) for v, r in zip(vector.dimensions, self.rows)],
+                         'the entries of the vector and the rows of the matrix')
+        value = np.linalg.solve(self.value, vector.value)
+        return PhysicalVector._trusted(value, tuple(common.divide(x) for x in self.columns))
@@ -0,0 +1,75 @@
+"""
+Running a function over many items in worker processes.
+
+The workers need the same units and settings as the calling process. parallel_map() sends the definitions of the
+current environment to every worker once, when the worker starts, and the items in chunks, so that the cost of the
+communication is shared by many items.
+
+>>> import simplesi as si
+>>> si.parallel_map(abs, [-1 * si.m, 2 * si.m], workers=1)
+[Physical(value=1, dimensions=Dimensions(kg=0, m=1, s=0, A=0, cd=0, K=0, mol=0), conv_factor=1.0, symbol=None), Physical(value=2, dimensions=Dimensions(kg=0, m=1, s=0, A=0, cd=0, K=0, mol=0), conv_factor=1.0, symbol=None)]
+"""
+
+import concurrent.futures
+import os
+import pickle
+
+import simplesi
+from simplesi.environment import Environment
+
+
+def _state() -> tuple:
+    """What a worker needs of the current environment: the unit definitions, the settings and the preferred units"""
+    env = simplesi.current_environment()
+    return dict(env.environment or {}), dict(env.settings or {}), dict(env.preferred_units or {})
+
+
+def _initialize(state: tuple) -> None:
+    """Loads the environment of the calling process in the worker"""
+    definitions, settings, preferred_units = state
+    # the units are created when first used, see simplesi.__getattr__. Most workers use only a few of them.
+    env = Environment(si_base_units=simplesi.base_units, preferred_units=preferred_units, environment=definitions,
+                      settings=settings)
+    simplesi.set_environment(env)
+
+
+def _picklable(fn) -> bool:
+    """True if fn can be sent to the worker processes, i.e. it is not a lambda or a local function"""
+    try:
+        pickle.dumps(fn)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return False
+    return True
+
+
+def parallel_map(fn, iterable, workers: int = None, chunk_size: int = None, mp_context=None) -> list:
+    """
+    The results of fn for the items, like list(map(fn, iterable)), computed in worker processes.
+
+    fn and the items must be picklable, e.g. fn is a function defined at the top level of a module. If fn is not,
+    e.g. a lambda, it is called in this process instead. The worker processes use the unit definitions, the settings
+    and the preferred units of the current environment.
+
+    :param fn: the function to call with every item
+    :param iterable: the items
+    :param workers: the number of worker processes, os.cpu_count() by default. With 1 worker no process is started.
+    :param chunk_size: the number of items sent to a worker at once, by default about 4 chunks per worker
+    :param mp_context: the multiprocessing context of the workers, see concurrent.futures.ProcessPoolExecutor
+    :return: the results in the order of the items
+    """
+    items = list(iterable)
+    workers = workers or os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError('The number of workers must be positive, you have {}.'.format(workers))
+
+    if workers == 1 or len(items) < 2 or not _picklable(fn):
+        return [fn(item) for item in items]
+
+    if chunk_size is None:
+        chunk_size = max(1, len(items) // (workers * 4))
+    if chunk_size < 1:
+        raise ValueError('The chunk size must be positive, you have {}.'.format(chunk_size))
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=min(workers, len(items)), mp_context=mp_context,
+                                                initializer=_initialize, initargs=(_state(),)) as executor:
+        return list(executor.map(fn, items, chunksize=chunk_size))
@@ -0,0 +1,242 @@
+"""
+Parsing unit expressions like 'kN/m^2' or 'kN*m/s' built from the units of the environment.
+
+The grammar, evaluated from left to right:
+
+    expression := term (('*' | '·' | '×' | '/' | whitespace) term)*
+    term       := atom (('^' | '**') exponent | superscript)?
+    atom       := unit | number | '(' expression ')'
+    exponent   := ['+' | '-'] number | '(' ['+' | '-'] number ['/' number] ')'
+
+A unit is given by its key or symbol as defined in the environment, superscripts are exponents, e.g. 'm²' or 's⁻¹'.
+Whitespace between two terms means multiplication, e.g. 'kN m'.
+
+An expression is compiled into a UnitExpression: its dimensions, the number of base SI units in it and its symbol.
+The compiled expressions are cached by the environment, see Environment.compile_unit().
+
+>>> import simplesi as si
+>>> si.environment(env_name='structural')
+>>> si.parse_unit('kN/m^2') == si.kN_m2
+True
+>>> si.parse('12.5 kN*m/s').value_in('N*m/s')
+12500.0
+>>> (2.5 * si.kN_m2).to('N/mm^2')
+'0.0025 N/mm^2'
+"""
+
+import re
+from typing import NamedTuple
+
+from simplesi.dimensions import Dimensions
+
+DIMENSIONLESS = Dimensions(0, 0, 0, 0, 0, 0, 0)
+
+_SUPERSCRIPTS = str.maketrans('⁻⁺⁰¹²³⁴⁵⁶⁷⁸⁹', '-+0123456789')
+
+_NUMBER = r'(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?'
+
+_TOKENS = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<number>{number})
+  | (?P<superscript>[⁻⁺]?[⁰¹²³⁴⁵⁶⁷⁸⁹]+)
+  | (?P<operator>\*\*|[*·×/^()+-])
+  | (?P<name>[^\s\d*·×/^()+\-.⁻⁺⁰¹²³⁴⁵⁶⁷⁸⁹][^\s*·×/^()+\-⁻⁺⁰¹²³⁴⁵⁶⁷⁸⁹]*)
+""".format(number=_NUMBER), re.VERBOSE)
+
+# a quantity as text: a number optionally followed by a unit expression
+_QUANTITY = re.compile(r'\s*(?P<value>[+-]?{number})\s*(?P<unit>.*?)\s*$'.format(number=_NUMBER), re.DOTALL)
+
+
+class UnitExpression(NamedTuple):
+    """A compiled unit expression"""
+    dimensions: Dimensions
+    factor: float  # number of base SI units in the expression
+    symbol: str
+
+    @property
+    def definition(self) -> dict:
+        """The expression as a unit definition of the environment"""
+        return {'Dimension': self.dimensions, 'Value': self.factor, 'Factor': 1, 'Symbol': self.symbol}
+
+
+def _tokenize(expression: str) -> list:
+    """
+    The (kind, text, position) tokens of the expression.
+    Whitespace between the end of a term and the start of the next one is a multiplication, otherwise it is dropped.
+    """
+    tokens = []
+    position = 0
+    space = False
+    while position < len(expression):
+        match = _TOKENS.match(expression, position)
+        if match is None:
+            raise ValueError('Could not parse the unit expression "{}": invalid character at position {}.'.format(
+                expression, position))
+
+        kind, text = match.lastgroup, match.group()
+        if kind == 'space':
+            space = True
+        else:
+            if space and tokens and _ends_term(tokens[-1]) and (kind in ('name', 'number') or text == '('):
+                tokens.append(('operator', '*', position))
+            tokens.append((kind, text, position))
+            space = False
+        position = match.end()
+
+    return tokens
+
+
+def _ends_term(token: tuple) -> bool:
+    kind, text, _ = token
+    return kind in ('name', 'number', 'superscript') or text == ')'
+
+
+class _Parser:
+    """Recursive descent parser of a single expression, returns its dimensions and factor"""
+
+    def __init__(self, expression: str, lookup):
+        self.expression = expression
+        self.lookup = lookup
+        self.tokens = _tokenize(expression)
+        self.position = 0
+
+    def error(self, message: str) -> ValueError:
+        return ValueError('Could not parse the unit expression "{}": {}.'.format(self.expression, message))
+
+    def peek(self) -> tuple:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None, None, len(self.expression)
+
+    def next(self) -> tuple:
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def parse(self) -> tuple:
+        if not self.tokens:
+            raise self.error('empty expression')
+
+        result = self.expression_()
+        kind, text, position = self.peek()
+        if kind is not None:
+            raise self.error('unexpected "{}" at position {}'.format(text, position))
+        return result
+
+    def expression_(self) -> tuple:
+        dimensions, factor = self.term()
+        while True:
+            kind, text, _ = self.peek()
+            if kind != 'operator' or text not in ('*', '·', '×', '/'):
+                return dimensions, factor
+
+            self.next()
+            other_dimensions, other_factor = self.term()
+            if text == '/':
+                dimensions, factor = dimensions.divide(other_dimensions), factor / other_factor
+            else:
+                dimensions, factor = dimensions.multiply(other_dimensions), factor * other_factor
+
+    def term(self) -> tuple:
+        dimensions, factor = self.atom()
+
+        kind, text, _ = self.peek()
+        if kind == 'superscript':
+            self.next()
+            exponent = _number(text.translate(_SUPERSCRIPTS))
+        elif kind == 'operator' and text in ('^', '**'):
+            self.next()
+            exponent = self.exponent()
+        else:
+            return dimensions, factor
+
+        return dimensions.power(exponent), factor ** exponent
+
+    def atom(self) -> tuple:
+        kind, text, position = self.next()
+
+        if kind == 'name':
+            unit = self.lookup(text)
+            if unit is None:
+                raise self.error('unknown unit "{}" at position {}'.format(text, position))
+            return unit.dimensions, unit.value
+
+        if kind == 'number':
+            return DIMENSIONLESS, float(text)
+
+        if text == '(':
+            result = self.expression_()
+            if self.next()[1] != ')':
+                raise self.error('missing ")" for "(" at position {}'.format(position))
+            return result
+
+        if kind is None:
+            raise self.error('unexpected end')
+        raise self.error('unexpected "{}" at position {}'.format(text, position))
+
+    def exponent(self):
+        kind, text, position = self.next()
+        if text != '(':
+            return self.signed(kind, text, position)
+
+        numerator = self.signed(*self.next())
+        kind, text, position = self.next()
+        if text == ')':
+            return numerator
+        if text != '/':
+            raise self.error('unexpected "{}" at position {}'.format(text, position))
+
+        denominator = self.signed(*self.next())
+        if self.next()[1] != ')':
+            raise self.error('missing ")" in the exponent')
+        if denominator == 0:
+            raise self.error('zero denominator in the exponent')
+        return _number(numerator / denominator)
+
+    def signed(self, kind, text, position):
+        sign = 1
+        if text in ('+', '-'):
+            sign = -1 if text == '-' else 1
+            kind, text, position = self.next()
+        if kind != 'number':
+            raise self.error('the exponent must be a number, not "{}" at position {}'.format(text, position))
+        return sign * _number(text)
+
+
+def _number(value):
+    """Integral exponents are int, so the Dimensions are canonical"""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def compile_unit(expression: str, lookup) -> UnitExpression:
+    """
+    Compiles the unit expression.
+
+    :param expression: the unit expression, e.g. 'kN/m^2'
+    :param lookup: returns the Physical of a unit given by its key or symbol, None if there is no such unit
+    :return: the dimensions, the number of base SI units and the symbol of the expression
+    """
+    if not isinstance(expression, str):
+        raise ValueError('The unit expression must be a string, not {}.'.format(type(expression)))
+
+    symbol = expression.strip()
+
+    # a single unit, also the ones with a symbol that looks like an expression, e.g. 'kN/m²'
+    unit = lookup(symbol)
+    if unit is not None:
+        return UnitExpression(unit.dimensions, unit.value, symbol)
+
+    dimensions, factor = _Parser(symbol, lookup).parse()
+    return UnitExpression(dimensions, factor, symbol)
+
+
+def split_quantity(text: str) -> tuple:
+    """Splits a quantity like '12.5 kN*m/s' to the value and the unit expression, which is '' if there is none"""
+    if not isinstance(text, str):
+        raise ValueError('The quantity must be a string, not {}.'.format(type(text)))
+
+    match = _QUANTITY.match(text)
+    if match is None:
+        raise ValueError('Could not parse the quantity "{}": it must start with a number.'.format(text))
+    return float(match.group('value')), match.group('unit')
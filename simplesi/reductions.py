@@ -0,0 +1,153 @@
+"""
+Reductions and ordering of many Physical instances of the same dimensions.
+
+The dimensions are checked once, up front, then the work is done on the values in SI units.
+This is faster than the builtins sum(), min(), max() and sorted(), which go through the operators
+of Physical and check the dimensions for every addition or comparison.
+
+The results are Physical instances with the conversion factor and the symbol of the first one.
+min(), max(), argmin(), argmax(), sort() and argsort() take a key function returning the Physical of an item,
+e.g. to pick the governing load case out of the results:
+
+>>> import simplesi as si
+>>> si.environment(env_name='structural')
+>>> cases = [('ULS-1', 12 * si.kNm), ('ULS-2', 15.5 * si.kNm), ('SLS', 9 * si.kNm)]
+>>> si.max(cases, key=lambda x: x[1])[0]
+'ULS-2'
+>>> print(si.fsum(x[1] for x in cases))
+36.50 kNm
+
+A PhysicalArray is reduced by NumPy.
+"""
+
+import builtins
+import math
+
+from simplesi import Physical
+from simplesi.arrays import PhysicalArray
+
+
+def _values(physicals, key=None) -> tuple:
+    """The items, their values and the first Physical, after checking that all have the same dimensions"""
+    items = list(physicals)
+    quantities = items if key is None else [key(x) for x in items]
+    if not quantities:
+        return items, [], None
+
+    first = quantities[0]
+    if not isinstance(first, Physical):
+        raise ValueError("Only Physical instances can be reduced, not {}.".format(type(first)))
+
+    # Dimensions are interned, identity is equality
+    dimensions = first.dimensions
+    for quantity in quantities:
+        if not isinstance(quantity, Physical) or quantity.dimensions is not dimensions:
+            raise ValueError("All items must be Physical instances of equal dimension, not {}.".format(quantity))
+
+    return items, [x.value for x in quantities], first
+
+
+def _new(value, first: Physical):
+    return Physical._trusted(value, first.dimensions, first.conv_factor, first.symbol)
+
+
+def sum(physicals):
+    """
+    The sum of the Physical instances, 0 if there are none, same as the builtin sum().
+    The values are added one by one, use fsum() if the accuracy matters.
+    """
+    if isinstance(physicals, PhysicalArray):
+        return _new(float(physicals.value.sum()), physicals)
+
+    _, values, first = _values(physicals)
+    if first is None:
+        return 0
+
+    total = 0.0
+    for value in values:
+        total += value
+    return _new(total, first)
+
+
+def fsum(physicals):
+    """The sum of the Physical instances using compensated summation, see math.fsum(). 0 if there are none."""
+    if isinstance(physicals, PhysicalArray):
+        return _new(math.fsum(physicals.value.flat), physicals)
+
+    _, values, first = _values(physicals)
+    if first is None:
+        return 0
+    return _new(math.fsum(values), first)
+
+
+def mean(physicals):
+    """The arithmetic mean of the Physical instances, using compensated summation"""
+    if isinstance(physicals, PhysicalArray):
+        if not physicals.value.size:
+            raise ValueError("The mean of an empty PhysicalArray is not defined.")
+        return _new(math.fsum(physicals.value.flat) / physicals.value.size, physicals)
+
+    _, values, first = _values(physicals)
+    if first is None:
+        raise ValueError("The mean of an empty sequence is not defined.")
+    return _new(math.fsum(values) / len(values), first)
+
+
+def argmin(physicals, key=None) -> int:
+    """The index of the smallest item, the first one if there are more"""
+    if isinstance(physicals, PhysicalArray) and key is None:
+        return int(physicals.value.argmin())
+
+    _, values, first = _values(physicals, key)
+    if first is None:
+        raise ValueError("argmin() of an empty sequence.")
+    return values.index(builtins.min(values))
+
+
+def argmax(physicals, key=None) -> int:
+    """The index of the largest item, the first one if there are more"""
+    if isinstance(physicals, PhysicalArray) and key is None:
+        return int(physicals.value.argmax())
+
+    _, values, first = _values(physicals, key)
+    if first is None:
+        raise ValueError("argmax() of an empty sequence.")
+    return values.index(builtins.max(values))
+
+
+def argsort(physicals, key=None, reverse: bool = False) -> list:
+    """The indices of the items in ascending order, or descending if reverse. The sorting is stable."""
+    if isinstance(physicals, PhysicalArray) and key is None:
+        # stable in both directions, like sorted()
+        values = -physicals.value if reverse else physicals.value
+        return values.argsort(kind='stable').tolist()
+
+    _, values, _ = _values(physicals, key)
+    return sorted(range(len(values)), key=values.__getitem__, reverse=reverse)
+
+
+def min(physicals, key=None):
+    """The smallest item, the first one if there are more. Raises ValueError if there are none."""
+    if isinstance(physicals, PhysicalArray) and key is None:
+        return physicals[argmin(physicals)]
+
+    items = list(physicals)
+    return items[argmin(items, key)]
+
+
+def max(physicals, key=None):
+    """The largest item, the first one if there are more. Raises ValueError if there are none."""
+    if isinstance(physicals, PhysicalArray) and key is None:
+        return physicals[argmax(physicals)]
+
+    items = list(physicals)
+    return items[argmax(items, key)]
+
+
+def sort(physicals, key=None, reverse: bool = False):
+    """The items in a new list in ascending order, or descending if reverse. The sorting is stable."""
+    if isinstance(physicals, PhysicalArray) and key is None:
+        return physicals[argsort(physicals, reverse=reverse)]
+
+    items = list(physicals)
+    return [items[i] for i in argsort(items, key, reverse)]
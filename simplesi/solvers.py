@@ -0,0 +1,371 @@
+"""
+Numerical solvers for functions of Physical instances: roots, integrals and minima.
+
+The function is called once with a Physical to find the dimensions of its result, then the solver works on the values
+in SI units only: the function is called with Physical instances made without any checks, and only the dimensions of
+its results are checked. With compile=True, a function written with operators only is compiled into a plain
+function of floats, see si.expr: it is then called once with a variable of si.expr instead of a Physical, and never
+again. Use it for functions without side effects called many times, e.g. by integrate().
+
+>>> import simplesi as si
+>>> si.environment(env_name='structural')
+>>> def stress(h):
+...     return 30 * si.kNm / (200 * si.mm * h ** 2 / 6)
+>>> print(si.solve(stress, 10 * si.mm, 200 * si.mm, target=235 * si.MPa).to('mm'))
+61.89 mm
+>>> print(si.integrate(lambda x: 10 * si.kN_m * x / (4 * si.m), 0 * si.m, 4 * si.m))
+20 kN
+
+SciPy is used if it is installed, otherwise the solvers of this module: Brent's method for roots and minima and
+adaptive Simpson's rule for integrals.
+"""
+
+import math
+
+try:
+    from scipy import integrate as scipy_integrate, optimize as scipy_optimize
+except ImportError:  # pragma: no cover
+    scipy_integrate = scipy_optimize = None
+
+from simplesi import Physical, NUMBER
+from simplesi.dimensions import Dimensions
+
+DIMENSIONLESS = Dimensions(0, 0, 0, 0, 0, 0, 0)
+
+# the golden ratio of the sections of Brent's minimization
+GOLDEN = (3 - math.sqrt(5)) / 2
+
+
+def _bounds(a, b, name: str = 'fn') -> tuple:
+    """The values of the bounds in SI units and the bound giving the unit of the results"""
+    if isinstance(a, Physical) or isinstance(b, Physical):
+        if not (isinstance(a, Physical) and isinstance(b, Physical)) or a.dimensions is not b.dimensions:
+            raise ValueError('The bounds of {}() must be Physical instances of equal dimension, you have {} and {}.'
+                             .format(name, a, b))
+        if not isinstance(a.value, NUMBER) or not isinstance(b.value, NUMBER):
+            raise ValueError('The bounds of {}() must be single values, you have {} and {}.'.format(name, a, b))
+        return float(a.value), float(b.value), a
+    if not isinstance(a, NUMBER) or not isinstance(b, NUMBER):
+        raise ValueError('The bounds of {}() must be Physical instances or numbers, you have {} and {}.'.format(
+            name, a, b))
+    return float(a), float(b), None
+
+
+def _tolerance(tol, unit: Physical, default: float) -> float:
+    """The tolerance in SI units: a Physical of the dimensions of unit, or a number if unit is None"""
+    if tol is None:
+        return default
+    if isinstance(tol, Physical):
+        if unit is None or tol.dimensions is not unit.dimensions:
+            raise ValueError('The tolerance must be of the dimensions of the bounds, you have {}.'.format(tol))
+        return float(tol.value)
+    if unit is not None and not unit.dimensions.dimensionsless:
+        raise ValueError('The tolerance must be a Physical of the dimensions of the bounds, you have {}.'.format(tol))
+    return float(tol)
+
+
+def _result(value: float, dimensions: Dimensions, unit: Physical = None):
+    """The value in SI units as a Physical, in the unit of the bound if given, or a float if dimensionless"""
+    if dimensions.dimensionsless:
+        return value
+    if unit is not None:
+        return Physical._trusted(value, dimensions, unit.conv_factor, unit.symbol)
+    return Physical._trusted(value, dimensions, 1.0, None)
+
+
+def _compiled(fn, dimensions: Dimensions, points: dict):
+    """
+    The compiled function of fn, see si.expr, or None if fn can not be compiled.
+
+    fn is called with a variable of si.expr, the expression it gives must evaluate to the results of fn at all points,
+    a dict of the values of the argument and of the result in SI units.
+    """
+    from simplesi import expr
+
+    try:
+        kernel = expr.compile(fn(expr.var('x', dimensions)), ('x',)).function()
+        if all(math.isclose(kernel(x), y, rel_tol=1e-9) for x, y in points.items()):
+            return kernel
+    except (TypeError, ValueError):
+        # e.g. comparisons or functions of the math module, which do not work with expressions. Other errors are bugs
+        # of fn, raised as they are.
+        pass
+    return None
+
+
+def _scalar(fn, x: float, unit: Physical, compile: bool = False, x1: float = None) -> tuple:
+    """
+    fn as a function of the value of its argument in SI units, and the dimensions of its results.
+
+    fn is called once with the argument x to find the dimensions of its result. If compile is True, fn is compiled and
+    checked against the results of fn at x, x1 and between them, it is called with Physical instances if it can not
+    be compiled.
+    """
+    name = getattr(fn, '__name__', 'fn')
+    dimensions = unit.dimensions if unit is not None else DIMENSIONLESS
+
+    def argument(value: float):
+        if unit is None:
+            return value
+        return Physical._trusted(value, dimensions, unit.conv_factor, unit.symbol)
+
+    y = fn(argument(x))
+    if isinstance(y, Physical) and isinstance(y.value, NUMBER):
+        y_dimensions = y.dimensions
+    elif isinstance(y, NUMBER):
+        y_dimensions = DIMENSIONLESS
+    else:
+        raise ValueError('{}() must return a Physical or a number, you have {}.'.format(name, y))
+
+    def physical(value: float) -> float:
+        result = fn(argument(value))
+        if isinstance(result, Physical):
+            if result.dimensions is not y_dimensions:
+                raise ValueError('{}() must return results of the same dimensions, you have {} and {}.'.format(
+                    name, y, result))
+            return result.value
+        if not y_dimensions.dimensionsless:
+            raise ValueError('{}() must return results of the same dimensions, you have {} and {}.'.format(
+                name, y, result))
+        return result
+
+    if compile:
+        points = {x: y.value if isinstance(y, Physical) else y}
+        if x1 is not None:
+            for value in ((x + x1) / 2, x1):
+                points[value] = physical(value)
+        kernel = _compiled(fn, dimensions, points)
+        if kernel is not None:
+            return kernel, y_dimensions
+
+    return physical, y_dimensions
+
+
+def _brentq(f, a: float, b: float, xtol: float, rtol: float, maxiter: int) -> float:
+    """The root of f between a and b with Brent's method, f(a) and f(b) must be of opposite signs"""
+    fa, fb = f(a), f(b)
+    if fa * fb > 0:
+        raise ValueError('The function must change sign between the bounds, it is {} and {}.'.format(fa, fb))
+    if fa == 0:
+        return a
+    if fb == 0:
+        return b
+
+    xpre, xcur, fpre, fcur = a, b, fa, fb
+    xblk = fblk = spre = scur = 0.0
+    for _ in range(maxiter):
+        if fpre * fcur < 0:
+            xblk, fblk = xpre, fpre
+            spre = scur = xcur - xpre
+        if abs(fblk) < abs(fcur):
+            xpre, xcur, xblk = xcur, xblk, xcur
+            fpre, fcur, fblk = fcur, fblk, fcur
+
+        delta = (xtol + rtol * abs(xcur)) / 2
+        sbis = (xblk - xcur) / 2
+        if fcur == 0 or abs(sbis) < delta:
+            return xcur
+
+        if abs(spre) > delta and abs(fcur) < abs(fpre):
+            if xpre == xblk:
+                # secant
+                stry = -fcur * (xcur - xpre) / (fcur - fpre)
+            else:
+                # inverse quadratic interpolation
+                dpre = (fpre - fcur) / (xpre - xcur)
+                dblk = (fblk - fcur) / (xblk - xcur)
+                stry = -fcur * (fblk * dblk - fpre * dpre) / (dblk * dpre * (fblk - fpre))
+            if 2 * abs(stry) < min(abs(spre), 3 * abs(sbis) - delta):
+                spre, scur = scur, stry
+            else:
+                spre = scur = sbis
+        else:
+            spre = scur = sbis
+
+        xpre, fpre = xcur, fcur
+        xcur += scur if abs(scur) > delta else math.copysign(delta, sbis)
+        fcur = f(xcur)
+
+    raise ValueError('No root was found in {} iterations.'.format(maxiter))
+
+
+def _fminbound(f, a: float, b: float, xtol: float, maxiter: int) -> float:
+    """The minimum of f between a and b with Brent's method: golden sections and parabolic steps"""
+    sqrt_eps = math.sqrt(2.2e-16)
+    xf = nfc = fulc = a + GOLDEN * (b - a)
+    fx = fnfc = ffulc = f(xf)
+    rat = e = 0.0
+    xm = (a + b) / 2
+    tol1 = sqrt_eps * abs(xf) + xtol / 3
+    tol2 = 2 * tol1
+
+    for _ in range(maxiter):
+        if abs(xf - xm) <= tol2 - (b - a) / 2:
+            return xf
+
+        golden = True
+        if abs(e) > tol1:
+            # a parabola through the three best points
+            golden = False
+            r = (xf - nfc) * (fx - ffulc)
+            q = (xf - fulc) * (fx - fnfc)
+            p = (xf - fulc) * q - (xf - nfc) * r
+            q = 2 * (q - r)
+            if q > 0:
+                p = -p
+            q = abs(q)
+            r, e = e, rat
+            if abs(p) < abs(q * r / 2) and q * (a - xf) < p < q * (b - xf):
+                rat = p / q
+                x = xf + rat
+                if x - a < tol2 or b - x < tol2:
+                    rat = math.copysign(tol1, xm - xf) if xm != xf else tol1
+            else:
+                golden = True
+        if golden:
+            e = a - xf if xf >= xm else b - xf
+            rat = GOLDEN * e
+
+        x = xf + (math.copysign(1, rat) if rat else 1) * max(abs(rat), tol1)
+        fu = f(x)
+        if fu <= fx:
+            if x >= xf:
+                a = xf
+            else:
+                b = xf
+            fulc, ffulc = nfc, fnfc
+            nfc, fnfc = xf, fx
+            xf, fx = x, fu
+        else:
+            if x < xf:
+                a = x
+            else:
+                b = x
+            if fu <= fnfc or nfc == xf:
+                fulc, ffulc = nfc, fnfc
+                nfc, fnfc = x, fu
+            elif fu <= ffulc or fulc == xf or fulc == nfc:
+                fulc, ffulc = x, fu
+
+        xm = (a + b) / 2
+        tol1 = sqrt_eps * abs(xf) + xtol / 3
+        tol2 = 2 * tol1
+
+    raise ValueError('No minimum was found in {} iterations.'.format(maxiter))
+
+
+def _simpson(f, a: float, b: float, rtol: float, depth: int) -> float:
+    """The integral of f from a to b with adaptive Simpson's rule"""
+    m = (a + b) / 2
+    fa, fm, fb = f(a), f(m), f(b)
+    fl, fr = f((a + m) / 2), f((m + b) / 2)
+    # the tolerance is relative to the scale of the integral, so it is not 0 if the integral is
+    tol = rtol * abs(b - a) * max(abs(fa), abs(fl), abs(fm), abs(fr), abs(fb))
+
+    def segment(a, b, fa, fm, fb, whole, tol, depth):
+        m = (a + b) / 2
+        fl, fr = f((a + m) / 2), f((m + b) / 2)
+        left = (m - a) / 6 * (fa + 4 * fl + fm)
+        right = (b - m) / 6 * (fm + 4 * fr + fb)
+        error = left + right - whole
+        if depth <= 0 or abs(error) <= 15 * tol:
+            return left + right + error / 15
+        return (segment(a, m, fa, fl, fm, left, tol / 2, depth - 1) +
+                segment(m, b, fm, fr, fb, right, tol / 2, depth - 1))
+
+    left = (m - a) / 6 * (fa + 4 * fl + fm)
+    right = (b - m) / 6 * (fm + 4 * fr + fb)
+    return (segment(a, m, fa, fl, fm, left, tol / 2, depth - 1) +
+            segment(m, b, fm, fr, fb, right, tol / 2, depth - 1))
+
+
+def solve(fn, a, b, target=None, xtol=None, rtol: float = 4 * 2.2e-16, maxiter: int = 100, compile: bool = False):
+    """
+    The root of fn between a and b: the x where fn(x) == 0, or fn(x) == target. Brent's method, see
+    scipy.optimize.brentq(). fn(a) and fn(b) must be of opposite signs.
+
+    :param fn: a function of one Physical, or number if a and b are numbers, returning a Physical or a number
+    :param a: one bound
+    :param b: the other bound, of the dimensions of a
+    :param target: the result looked for, of the dimensions of the results of fn, 0 by default
+    :param xtol: the absolute tolerance of the root, of the dimensions of a, 1e-12 * abs(b - a) by default
+    :param rtol: the relative tolerance of the root
+    :param maxiter: the largest number of iterations
+    :param compile: compile fn into a function of floats, see the module docstring
+    :return: the root in the unit of a, a float if dimensionless
+    """
+    x0, x1, unit = _bounds(a, b, 'solve')
+    xtol = _tolerance(xtol, unit, 1e-12 * abs(x1 - x0))
+    f, dimensions = _scalar(fn, x0, unit, compile, x1)
+
+    if target is not None:
+        if isinstance(target, Physical):
+            if target.dimensions is not dimensions:
+                raise ValueError('The target must be of the dimensions of the results, you have {}.'.format(target))
+            target = target.value
+        elif not dimensions.dimensionsless:
+            raise ValueError('The target must be of the dimensions of the results, you have {}.'.format(target))
+        if target:
+            function, target = f, float(target)
+
+            def f(x):
+                return function(x) - target
+
+    if scipy_optimize is not None:
+        x = scipy_optimize.brentq(f, x0, x1, xtol=xtol, rtol=rtol, maxiter=maxiter)
+    else:
+        x = _brentq(f, x0, x1, xtol, rtol, maxiter)
+    return _result(x, unit.dimensions if unit is not None else DIMENSIONLESS, unit)
+
+
+def minimize(fn, a, b, xtol=None, maxiter: int = 500, compile: bool = False):
+    """
+    The x between a and b where fn(x) is the smallest. Brent's method, see scipy.optimize.minimize_scalar() with
+    bounds.
+
+    :param fn: a function of one Physical, or number if a and b are numbers, returning a Physical or a number
+    :param a: one bound
+    :param b: the other bound, of the dimensions of a
+    :param xtol: the absolute tolerance of the minimum, of the dimensions of a, 1e-9 * abs(b - a) by default
+    :param maxiter: the largest number of iterations
+    :param compile: compile fn into a function of floats, see the module docstring
+    :return: the minimum in the unit of a, a float if dimensionless
+    """
+    x0, x1, unit = _bounds(a, b, 'minimize')
+    x0, x1 = min(x0, x1), max(x0, x1)
+    xtol = _tolerance(xtol, unit, 1e-9 * (x1 - x0))
+    f, _ = _scalar(fn, x0, unit, compile, x1)
+
+    if scipy_optimize is not None:
+        x = scipy_optimize.minimize_scalar(f, bounds=(x0, x1), method='bounded',
+                                           options={'xatol': xtol, 'maxiter': maxiter}).x
+    else:
+        x = _fminbound(f, x0, x1, xtol, maxiter)
+    return _result(float(x), unit.dimensions if unit is not None else DIMENSIONLESS, unit)
+
+
+def integrate(fn, a, b, rtol: float = 1e-10, depth: int = 50, compile: bool = False):
+    """
+    The integral of fn from a to b. Adaptive Simpson's rule, or scipy.integrate.quad() if SciPy is installed.
+
+    :param fn: a function of one Physical, or number if a and b are numbers, returning a Physical or a number
+    :param a: the lower bound
+    :param b: the upper bound, of the dimensions of a
+    :param rtol: the relative tolerance of the integral
+    :param depth: the largest number of halvings of the intervals of Simpson's rule
+    :param compile: compile fn into a function of floats, see the module docstring
+    :return: the integral: a Physical of the dimensions of the results of fn times the dimensions of a, a float if
+    dimensionless
+    """
+    x0, x1, unit = _bounds(a, b, 'integrate')
+    f, dimensions = _scalar(fn, x0, unit, compile, x1)
+    if unit is not None:
+        dimensions = dimensions.multiply(unit.dimensions)
+
+    if x0 == x1:
+        value = 0.0
+    elif scipy_integrate is not None:
+        value = scipy_integrate.quad(f, x0, x1, epsabs=0, epsrel=rtol)[0]
+    else:
+        value = _simpson(f, x0, x1, rtol, depth)
+    return _result(value, dimensions)
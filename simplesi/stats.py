@@ -0,0 +1,149 @@
+"""
+Opt-in counters and timers of the hot paths, to see how much of the runtime is spent in simplesi.
+
+When enabled, the methods of Physical and PhysicalArray are replaced by wrappers that count and time the calls.
+When disabled, the original methods are put back, so there is no cost at all.
+
+>>> import simplesi as si
+>>> si.environment(env_name='structural')
+>>> si.stats.enable()
+>>> a = 2 * si.kN * (3 * si.m)
+>>> si.stats.snapshot()['counts']['operator.*']
+3
+>>> si.stats.disable()
+
+The counters, by name:
+- construct: Physical instances created by Physical(), construct.trusted: the results of operations
+- operator.<op>: the operators by symbol, e.g. operator.* or operator.<. a != b is counted as ==, -a as *.
+- mismatch.<op>: ValueErrors raised by the operators, e.g. adding a length to a force
+- to, str, value_in: the conversions, str includes a call of to(). to.failed: to() calls that printed or raised, as the unit was not available
+- environment.read, environment.validate, environment.build, environment.push: the phases of loading an environment
+
+The snapshot is a dict of plain numbers, e.g. for a metrics pipeline. The counters are thread-safe.
+"""
+
+import collections
+import contextlib
+import functools
+import threading
+import time
+
+# set by enable() and disable(), checked only on paths where it costs nothing, e.g. loading an environment
+enabled = False
+
+_lock = threading.Lock()
+_counts = collections.Counter()
+_times = collections.Counter()
+
+# the original methods, replaced while enabled: (class, name) -> method
+_originals = {}
+
+# __radd__, __rmul__, __neg__ and __ne__ call __add__, __mul__ and __eq__, which count them
+_OPERATORS = {
+    '__add__': '+', '__sub__': '-', '__rsub__': '-', '__mul__': '*', '__truediv__': '/', '__rtruediv__': '/',
+    '__pow__': '**', '__eq__': '==', '__lt__': '<', '__le__': '<=', '__gt__': '>', '__ge__': '>=',
+}
+
+_CONVERSIONS = {'to': 'to', '__str__': 'str', 'value_in': 'value_in'}
+
+
+def record(name: str, elapsed: float = None) -> None:
+    """Counts a call and adds the time it took, in seconds"""
+    with _lock:
+        _counts[name] += 1
+        if elapsed is not None:
+            _times[name] += elapsed
+
+
+@contextlib.contextmanager
+def timer(name: str):
+    """Counts and times the block if enabled"""
+    if not enabled:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def _timed(function, name: str, mismatch: str = None):
+    """Wraps the function to count and time its calls, and the ValueErrors raised if mismatch is given"""
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        except ValueError:
+            if mismatch is not None:
+                record(mismatch)
+            raise
+        finally:
+            record(name, time.perf_counter() - start)
+
+    return wrapper
+
+
+def _replace(cls, name: str, wrapper) -> None:
+    _originals[cls, name] = cls.__dict__[name]
+    setattr(cls, name, wrapper)
+
+
+def enable(reset: bool = True) -> None:
+    """Starts counting, from zero if reset"""
+    global enabled
+    from simplesi import Physical
+    from simplesi.arrays import PhysicalArray
+
+    with _lock:
+        if reset:
+            _counts.clear()
+            _times.clear()
+        if enabled:
+            return
+
+        for cls in (Physical, PhysicalArray):
+            if '__init__' in cls.__dict__:
+                _replace(cls, '__init__', _timed(cls.__dict__['__init__'], 'construct'))
+            for name, symbol in _OPERATORS.items():
+                if name in cls.__dict__:
+                    _replace(cls, name, _timed(cls.__dict__[name], 'operator.' + symbol, 'mismatch.' + symbol))
+            for name, label in _CONVERSIONS.items():
+                if name in cls.__dict__:
+                    _replace(cls, name, _timed(cls.__dict__[name], label))
+
+        # a classmethod, the results of the operations
+        trusted = Physical.__dict__['_trusted'].__func__
+        _replace(Physical, '_trusted', classmethod(_timed(trusted, 'construct.trusted')))
+
+        enabled = True
+
+
+def disable() -> None:
+    """Stops counting and puts back the original methods, the counters are kept"""
+    global enabled
+    with _lock:
+        for (cls, name), method in _originals.items():
+            setattr(cls, name, method)
+        _originals.clear()
+        enabled = False
+
+
+def reset() -> None:
+    """Sets the counters to zero"""
+    with _lock:
+        _counts.clear()
+        _times.clear()
+
+
+def snapshot() -> dict:
+    """The counters as a dict: the number of calls and the total time in seconds, by name"""
+    with _lock:
+        return {
+            'enabled': enabled,
+            'counts': dict(_counts),
+            'times': dict(_times),
+        }
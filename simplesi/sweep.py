@@ -0,0 +1,281 @@
+"""
+Parameter studies: evaluating a function over every combination of the values of its arguments.
+
+sweep() first calls the function once with arrays of all the combinations: functions written with operators only,
+e.g. the formulas of a design check, work with PhysicalArrays the same as with Physical instances.
+If that fails, e.g. the function has an if depending on an argument, it is called for the combinations one by one,
+in worker processes, see parallel_map().
+
+>>> import simplesi as si
+>>> si.environment(env_name='structural')
+>>> def moment(span, q):
+...     return q * span ** 2 / 8
+>>> grid = si.sweep(moment, span=si.linspace(4 * si.m, 8 * si.m, 3), q=[1 * si.kN_m, 2 * si.kN_m])
+>>> grid.shape
+(3, 2)
+>>> print(grid.at(span=6 * si.m, q=2 * si.kN_m))
+9 kNm
+
+Grids that do not fit in memory are written to a CSV file in chunks, see the file argument of sweep().
+"""
+
+import functools
+import itertools
+import math
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from simplesi import Physical, NUMBER
+from simplesi.arrays import PhysicalArray
+from simplesi.parallel import parallel_map
+
+# the number of combinations evaluated at once when writing to a file
+CHUNK_SIZE = 100000
+
+
+def linspace(start, stop, num: int = 50, endpoint: bool = True):
+    """
+    Evenly spaced values from start to stop, see numpy.linspace().
+
+    :param start: the first value, a Physical or a number
+    :param stop: the last value, of the same dimensions as start
+    :param num: the number of values
+    :param endpoint: stop is the last value if True, otherwise it is left out
+    :return: a PhysicalArray with the unit of start, or a list of Physical instances if NumPy is not installed.
+    Numbers give a float array or list.
+    """
+    if num < 0:
+        raise ValueError('The number of values must not be negative, you have {}.'.format(num))
+
+    unit = None
+    if isinstance(start, Physical) or isinstance(stop, Physical):
+        if not (isinstance(start, Physical) and isinstance(stop, Physical)) or start.dimensions is not stop.dimensions:
+            raise ValueError('start and stop must be Physical instances of equal dimension, you have {} and {}.'.format(
+                start, stop))
+        unit, start, stop = start, start.value, stop.value
+
+    if np is not None:
+        values = np.linspace(start, stop, num, endpoint=endpoint)
+        if unit is None:
+            return values
+        return PhysicalArray._trusted(values, unit.dimensions, unit.conv_factor, unit.symbol)
+
+    divisions = (num - 1 if endpoint else num) or 1
+    step = (stop - start) / divisions
+    values = [start + i * step for i in range(num)]
+    if endpoint and num > 1:
+        values[-1] = stop
+    if unit is None:
+        return values
+    return [Physical._trusted(x, unit.dimensions, unit.conv_factor, unit.symbol) for x in values]
+
+
+def _axis(name: str, values):
+    """The values of an axis as a PhysicalArray or float array, as a list if NumPy is not installed"""
+    if isinstance(values, NUMBER) or (isinstance(values, Physical) and not isinstance(values, PhysicalArray)):
+        values = [values]
+
+    if isinstance(values, PhysicalArray) or (np is not None and isinstance(values, np.ndarray)):
+        if len(values.shape) != 1:
+            raise ValueError('The values of "{}" must be one-dimensional.'.format(name))
+        if not isinstance(values, PhysicalArray):
+            values = values.astype(float)
+    else:
+        values = list(values)
+        if np is not None:
+            if values and all(isinstance(x, Physical) for x in values):
+                values = PhysicalArray.from_physicals(values)
+            elif all(isinstance(x, NUMBER) for x in values):
+                values = np.array(values, dtype=float)
+            else:
+                raise ValueError('The values of "{}" must be Physical instances of equal dimension or numbers.'.format(
+                    name))
+
+    if not len(values):
+        raise ValueError('There are no values of "{}".'.format(name))
+    return values
+
+
+def _reshape(values, shape: tuple):
+    """The array of the results in the given shape"""
+    if isinstance(values, PhysicalArray):
+        return PhysicalArray._trusted(values.value.reshape(shape), values.dimensions, values.conv_factor,
+                                      values.symbol)
+    return values.reshape(shape)
+
+
+def _coordinates(axes: dict, start: int, stop: int) -> dict:
+    """The values of the axes for the combinations from start to stop, in row-major order"""
+    if np is None:
+        points = itertools.islice(itertools.product(*axes.values()), start, stop)
+        return dict(zip(axes, map(list, zip(*points))))
+    indices = np.unravel_index(np.arange(start, stop), tuple(len(x) for x in axes.values()))
+    return {name: axis[index] for (name, axis), index in zip(axes.items(), indices)}
+
+
+def _call(fn, kwargs: dict):
+    """fn called with the keyword arguments, defined at the top level so it can be sent to worker processes"""
+    return fn(**kwargs)
+
+
+def _collect(results: list):
+    """The results of the combinations one by one as one array, or as a list if NumPy is not installed"""
+    if np is None:
+        return results
+    if results and all(isinstance(x, Physical) for x in results):
+        return PhysicalArray.from_physicals(results)
+    if all(isinstance(x, NUMBER) for x in results):
+        return np.array(results, dtype=float)
+    return np.array(results, dtype=object)
+
+
+class _Evaluator:
+    """Evaluates fn for a range of the combinations, vectorized if it works"""
+
+    def __init__(self, fn, axes: dict, vectorized, workers, chunk_size):
+        if vectorized and np is None:
+            raise ImportError("Vectorized evaluation requires NumPy.")
+
+        self.fn = fn
+        self.axes = axes
+        self.shape = tuple(len(x) for x in axes.values())
+        self.size = math.prod(self.shape)
+        # None until the first call with arrays decides it
+        self.vectorized = False if np is None else vectorized
+        self.workers = workers
+        self.chunk_size = chunk_size
+
+    def __call__(self, start: int, stop: int) -> tuple:
+        """The coordinates and the results of the combinations from start to stop"""
+        coordinates = _coordinates(self.axes, start, stop)
+
+        if self.vectorized is not False:
+            try:
+                result = self.fn(**coordinates)
+            except (TypeError, ValueError, ZeroDivisionError):
+                if self.vectorized:
+                    raise
+                result = None
+
+            length = stop - start
+            value = result.value if isinstance(result, Physical) else result
+            if isinstance(value, np.ndarray) and value.shape == (length,):
+                self.vectorized = True
+                return coordinates, result
+            if self.vectorized:
+                raise ValueError('With vectorized=True {}() must return an array of {} values, you have {}.'.format(
+                    getattr(self.fn, '__name__', 'fn'), length, result))
+            self.vectorized = False
+
+        points = itertools.islice(itertools.product(*self.axes.values()), start, stop)
+        results = parallel_map(functools.partial(_call, self.fn), (dict(zip(self.axes, x)) for x in points),
+                               workers=self.workers, chunk_size=self.chunk_size)
+        return coordinates, _collect(results)
+
+
+class Grid:
+    """
+    The results of a sweep: the values of the axes and the results of all combinations.
+
+    values is an array of the shape of the grid, a PhysicalArray if the results are Physical instances.
+    If NumPy is not installed, it is a list of the results in row-major order, the last axis changing the fastest.
+    """
+
+    def __init__(self, axes: dict, values):
+        self.axes = axes
+        self.names = tuple(axes)
+        self.shape = tuple(len(x) for x in axes.values())
+        self.values = values
+
+    def __repr__(self):
+        return 'Grid(shape={}, names={})'.format(self.shape, self.names)
+
+    def __len__(self):
+        return math.prod(self.shape)
+
+    def __getitem__(self, indices):
+        """The result of the combination given by the indices of the axes"""
+        if np is not None:
+            return self.values[indices]
+        if not isinstance(indices, tuple):
+            indices = (indices,)
+        if len(indices) != len(self.shape) or not all(isinstance(x, int) for x in indices):
+            raise ValueError('Without NumPy a Grid is indexed by one int per axis.')
+        flat = 0
+        for index, length in zip(indices, self.shape):
+            flat = flat * length + range(length)[index]
+        return self.values[flat]
+
+    def index(self, name: str, value) -> int:
+        """The index of the value in the axis, compared as Physical instances are compared"""
+        if name not in self.axes:
+            raise ValueError('There is no axis "{}", the axes are {}.'.format(name, self.names))
+        for i, x in enumerate(self.axes[name]):
+            if x == value:
+                return i
+        raise ValueError('{} is not a value of "{}".'.format(value, name))
+
+    def at(self, **coordinates):
+        """The result at the values of the axes, e.g. grid.at(span=6 * si.m, q=2 * si.kN_m)"""
+        if set(coordinates) != set(self.names):
+            raise ValueError('The values of all axes {} are needed.'.format(self.names))
+        return self[tuple(self.index(name, coordinates[name]) for name in self.names)]
+
+    def columns(self, name: str = 'result') -> dict:
+        """The grid as columns, one row per combination, e.g. for simplesi.io.write_csv()"""
+        columns = _coordinates(self.axes, 0, len(self))
+        if name in columns:
+            raise ValueError('"{}" is the name of an axis.'.format(name))
+        values = self.values if np is None else _reshape(self.values, (-1,))
+        columns[name] = values
+        return columns
+
+
+def sweep(fn, workers: int = 1, chunk_size: int = None, file=None, units: dict = None, vectorized: bool = None,
+          **axes):
+    """
+    Evaluates fn for every combination of the values of the axes, fn(**combination).
+
+    :param fn: the function, called with the axes as keyword arguments
+    :param workers: the number of worker processes if fn is called for the combinations one by one, see parallel_map().
+    1 by default, fn is then called in this process. Worker processes pay off for slow functions and large grids only,
+    fn must then be picklable, e.g. defined at the top level of a module, else it is called in this process.
+    :param chunk_size: the number of combinations sent to a worker at once, see parallel_map().
+    Writing to a file, the number of combinations evaluated at once, CHUNK_SIZE by default.
+    :param file: if given, the path or file-like object of a CSV file the combinations and the results are written to,
+    one row per combination, see simplesi.io.write_csv(). Nothing is kept in memory and None is returned.
+    :param units: the units of the columns of the file by name, the results are in the column 'result'
+    :param vectorized: True: fn must work with arrays, False: fn is called for the combinations one by one,
+    None: called with arrays first, one by one if that fails
+    :param axes: the values of the arguments: PhysicalArrays, e.g. linspace(), sequences of Physical instances or
+    numbers, or a single value
+    :return: a Grid, None if written to a file
+    """
+    if not axes:
+        raise ValueError('There are no axes to sweep.')
+    if chunk_size is not None and chunk_size < 1:
+        raise ValueError('The chunk size must be positive, you have {}.'.format(chunk_size))
+
+    axes = {name: _axis(name, values) for name, values in axes.items()}
+    evaluator = _Evaluator(fn, axes, vectorized, workers, chunk_size if file is None else None)
+
+    if file is None:
+        _, values = evaluator(0, evaluator.size)
+        return Grid(axes, values if np is None else _reshape(values, evaluator.shape))
+
+    if 'result' in axes:
+        raise ValueError('"result" is the name of the results, it can not be an axis.')
+
+    def chunks():
+        step = chunk_size or CHUNK_SIZE
+        for start in range(0, evaluator.size, step):
+            coordinates, values = evaluator(start, min(start + step, evaluator.size))
+            coordinates['result'] = values
+            yield coordinates
+
+    from simplesi import io
+    io.write_csv(file, chunks(), units=units)
+    return None
@@ -0,0 +1,281 @@
+"""
+Interpolation in tables of quantities, e.g. material data tabulated over the temperature.
+
+A Table holds the breakpoints of its axes, sorted, and the tabulated values as float arrays in SI units. The dimensions
+are checked once, when the table is made, a lookup only compares the dimensions of its arguments to those of the axes.
+Single values are looked up by binary search in plain Python, arrays with NumPy in one call.
+
+>>> import simplesi as si
+>>> si.environment(env_name='thermal')
+>>> viscosity = si.Table([0 * si.dC, 20 * si.dC, 40 * si.dC, 60 * si.dC],
+...                      values=[1792 * si.uPas, 1002 * si.uPas, 653 * si.uPas, 467 * si.uPas])
+>>> print(viscosity(30 * si.dC))
+827.50 uPas
+>>> print(viscosity(si.PhysicalArray.from_unit([10, 50], si.dC)))
+[1397.00, 560] uPas
+
+The interpolation is linear, or a monotone cubic (PCHIP, Fritsch-Carlson) with method='cubic', that does not overshoot
+the tabulated values. Tables of two axes are interpolated along both, bilinear or bicubic.
+
+NumPy is needed to use them.
+"""
+
+import bisect
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from simplesi import Physical, NUMBER
+from simplesi.arrays import PhysicalArray
+from simplesi.dimensions import Dimensions
+
+DIMENSIONLESS = Dimensions(0, 0, 0, 0, 0, 0, 0)
+
+METHODS = ('linear', 'cubic')
+
+
+def _array(values, name: str) -> tuple:
+    """The values as a float array in SI units, and the Physical giving their unit, None if they are numbers"""
+    if isinstance(values, Physical):
+        return np.asarray(values.value, dtype=float), values
+
+    items = np.asarray(values, dtype=object)
+    flat = items.ravel().tolist()
+    if flat and all(isinstance(x, Physical) for x in flat):
+        unit = PhysicalArray.from_physicals(flat)
+        return unit.value.reshape(items.shape), unit
+    if not all(isinstance(x, NUMBER) for x in flat):
+        raise ValueError('The {} must be Physical instances of equal dimension or numbers.'.format(name))
+    return items.astype(float), None
+
+
+def _slopes(x, y):
+    """
+    The slopes of the monotone cubic at the breakpoints x, along the first axis of y. See Fritsch and Carlson (1980)
+    and scipy.interpolate.PchipInterpolator.
+    """
+    h = np.diff(x).reshape((-1,) + (1,) * (y.ndim - 1))
+    delta = np.diff(y, axis=0) / h
+    slopes = np.empty_like(y)
+    if len(x) == 2:
+        slopes[:] = delta[0]
+        return slopes
+
+    # the weighted harmonic mean of the secants, 0 at the extremes
+    w1 = 2 * h[1:] + h[:-1]
+    w2 = h[1:] + 2 * h[:-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = (w1 + w2) / (w1 / delta[:-1] + w2 / delta[1:])
+    slopes[1:-1] = np.where(np.sign(delta[:-1]) * np.sign(delta[1:]) > 0, mean, 0.0)
+    slopes[0] = _end_slope(h[0], h[1], delta[0], delta[1])
+    slopes[-1] = _end_slope(h[-1], h[-2], delta[-1], delta[-2])
+    return slopes
+
+
+def _end_slope(h0, h1, delta0, delta1):
+    """The slope at the first or last breakpoint, by the three-point formula kept monotone"""
+    slope = ((2 * h0 + h1) * delta0 - h0 * delta1) / (h0 + h1)
+    slope = np.where(np.sign(slope) != np.sign(delta0), 0.0, slope)
+    return np.where((np.sign(delta0) != np.sign(delta1)) & (np.abs(slope) > 3 * np.abs(delta0)), 3 * delta0, slope)
+
+
+def _polynomials(x, y, method: str):
+    """
+    The coefficients of the polynomials of the intervals of x, along the first axis of y, in the powers of the distance
+    from the start of the interval: y0 + c1 * s for linear, y0 + c1 * s + c2 * s**2 + c3 * s**3 for the monotone cubic.
+    The shape is (the number of coefficients, the number of intervals, ...).
+    """
+    h = np.diff(x).reshape((-1,) + (1,) * (y.ndim - 1))
+    delta = np.diff(y, axis=0) / h
+    if method == 'linear':
+        return np.stack([y[:-1], delta])
+    slopes = _slopes(x, y)
+    d0, d1 = slopes[:-1], slopes[1:]
+    return np.stack([y[:-1], d0, (3 * delta - 2 * d0 - d1) / h, (d0 + d1 - 2 * delta) / h ** 2])
+
+
+def _evaluate(polynomials, key, s):
+    """The polynomials of the intervals selected by key at the distances s, by Horner's method"""
+    result = polynomials[-1][key]
+    for coefficients in polynomials[-2::-1]:
+        result = result * s + coefficients[key]
+    return result
+
+
+class Table:
+    """
+    A table of values over one or two axes, interpolated linear or monotone cubic.
+
+    table(x) or table(x, y) is the interpolated value: a Physical for Physical instances or numbers, a PhysicalArray
+    for PhysicalArrays, NumPy arrays and sequences, or numbers and float arrays if the values are dimensionless.
+    """
+
+    def __init__(self, *axes, values, method: str = 'linear', extrapolate: bool = False):
+        """
+
+        :param axes: the breakpoints of the axes: PhysicalArrays, sequences of Physical instances or numbers,
+        at least two of each. They are sorted, with the values.
+        :param values: the values at the breakpoints, of the shape of the axes, e.g. a list of rows for two axes:
+        a PhysicalArray, (nested) sequences of Physical instances of equal dimension or numbers
+        :param method: 'linear' or 'cubic', the monotone cubic
+        :param extrapolate: whether values outside of the axes are extrapolated, a ValueError is raised otherwise
+        """
+        if np is None:
+            raise ImportError("Tables require NumPy.")
+        if len(axes) not in (1, 2):
+            raise ValueError('A table has one or two axes, you have {}.'.format(len(axes)))
+        if method not in METHODS:
+            raise ValueError('The method must be one of {}, you have {}.'.format(METHODS, method))
+
+        self.method = method
+        self.extrapolate = extrapolate
+        values, self._unit = _array(values, 'values')
+
+        self._axes = []
+        self._units = []
+        orders = []
+        for axis in axes:
+            axis, unit = _array(axis, 'breakpoints')
+            if axis.ndim != 1 or len(axis) < 2:
+                raise ValueError('The breakpoints of an axis must be a sequence of at least two, you have {}.'.format(
+                    axis))
+            order = np.argsort(axis, kind='stable')
+            axis = axis[order]
+            if np.any(np.diff(axis) <= 0) or not np.all(np.isfinite(axis)):
+                raise ValueError('The breakpoints of an axis must be distinct and finite, you have {}.'.format(axis))
+            self._axes.append(axis)
+            self._units.append(unit)
+            orders.append(order)
+
+        shape = tuple(len(axis) for axis in self._axes)
+        if values.shape != shape:
+            raise ValueError('The values must be of the shape of the axes {}, you have {}.'.format(shape, values.shape))
+        for i, order in enumerate(orders):
+            values = np.take(values, order, axis=i)
+
+        self._values = values
+        self._dimensions = tuple(DIMENSIONLESS if unit is None else unit.dimensions for unit in self._units)
+        # the polynomials of the intervals of the first axis, the bilinear interpolation of two axes uses the values
+        self._polynomials = _polynomials(self._axes[0], values, method)
+
+        # plain Python lists for the lookups of single values
+        self._axis_lists = [axis.tolist() for axis in self._axes]
+        self._value_list = values.tolist()
+        self._polynomial_list = self._polynomials.tolist()
+
+    def __repr__(self):
+        return 'Table(shape={}, method={!r}, extrapolate={})'.format(self.shape, self.method, self.extrapolate)
+
+    @property
+    def shape(self) -> tuple:
+        """The numbers of the breakpoints of the axes"""
+        return self._values.shape
+
+    @property
+    def axes(self) -> tuple:
+        """The sorted breakpoints of the axes, as PhysicalArrays or float arrays"""
+        return tuple(self._physical(axis, unit) for axis, unit in zip(self._axes, self._units))
+
+    @property
+    def values(self):
+        """The values at the breakpoints, as a PhysicalArray or a float array"""
+        return self._physical(self._values, self._unit)
+
+    @staticmethod
+    def _physical(value, unit: Physical):
+        """The value in SI units in the unit of the Physical, as is if it is None or dimensionless"""
+        if unit is None or unit.dimensions.dimensionsless:
+            return value
+        cls = Physical if isinstance(value, NUMBER) else PhysicalArray
+        return cls._trusted(value, unit.dimensions, unit.conv_factor, unit.symbol)
+
+    def _coordinate(self, q, index: int):
+        """The value of the argument for the axis in SI units, a float or an array"""
+        dimensions = self._dimensions[index]
+        if isinstance(q, Physical):
+            # Dimensions are interned, identity is equality
+            if q.dimensions is not dimensions:
+                raise ValueError('The argument {} must be of the dimensions of the axis, {}.'.format(q, dimensions))
+            return q.value
+        if isinstance(q, NUMBER):
+            if not dimensions.dimensionsless:
+                raise ValueError('The argument {} must be of the dimensions of the axis, {}.'.format(q, dimensions))
+            return q
+
+        q, unit = _array(q, 'arguments')
+        if (unit.dimensions if unit is not None else DIMENSIONLESS) is not dimensions:
+            raise ValueError('The arguments must be of the dimensions of the axis, {}.'.format(dimensions))
+        return q
+
+    def _interval(self, axis: list, q: float) -> tuple:
+        """The index of the interval of the axis the value is in, and the distance from the start of the interval"""
+        if not axis[0] <= q <= axis[-1] and not self.extrapolate:
+            raise ValueError('{} is out of the range of the table, from {} to {}.'.format(q, axis[0], axis[-1]))
+        k = bisect.bisect_right(axis, q) - 1
+        k = 0 if k < 0 else len(axis) - 2 if k > len(axis) - 2 else k
+        return k, q - axis[k]
+
+    def _locate(self, axis, q) -> tuple:
+        """The indices of the intervals of the axis the values are in, and the distances from their starts"""
+        # NaN fails the comparisons
+        if not self.extrapolate and len(q) and not (axis[0] <= q.min() and q.max() <= axis[-1]):
+            raise ValueError('Some arguments are out of the range of the table, from {} to {}.'.format(
+                axis[0], axis[-1]))
+        k = np.searchsorted(axis, q, side='right') - 1
+        np.clip(k, 0, len(axis) - 2, out=k)
+        return k, q - axis[k]
+
+    def __call__(self, *coordinates):
+        if len(coordinates) != len(self._axes):
+            raise ValueError('The table has {} axes, you have {} arguments.'.format(len(self._axes), len(coordinates)))
+        coordinates = [self._coordinate(q, i) for i, q in enumerate(coordinates)]
+
+        if all(isinstance(q, NUMBER) for q in coordinates):
+            if len(coordinates) == 2 and self.method == 'cubic':
+                value = float(self._many(*coordinates))
+            else:
+                value = self._single(*coordinates)
+        else:
+            value = self._many(*coordinates)
+        return self._physical(value, self._unit)
+
+    def _single(self, *coordinates) -> float:
+        """The value at single coordinates, in plain Python"""
+        axis = self._axis_lists[0]
+        k, s = self._interval(axis, coordinates[0])
+        if len(coordinates) == 1:
+            return _evaluate(self._polynomial_list, k, s)
+
+        # bilinear
+        values = self._value_list
+        t = s / (axis[k + 1] - axis[k])
+        j, s = self._interval(self._axis_lists[1], coordinates[1])
+        u = s / (self._axis_lists[1][j + 1] - self._axis_lists[1][j])
+        return ((1 - t) * ((1 - u) * values[k][j] + u * values[k][j + 1]) +
+                t * ((1 - u) * values[k + 1][j] + u * values[k + 1][j + 1]))
+
+    def _many(self, *coordinates):
+        """The values at arrays of coordinates, with NumPy"""
+        coordinates = np.broadcast_arrays(*[np.asarray(q, dtype=float) for q in coordinates])
+        shape = coordinates[0].shape
+        axis = self._axes[0]
+        k, s = self._locate(axis, coordinates[0].ravel())
+        if len(coordinates) == 1:
+            return _evaluate(self._polynomials, k, s).reshape(shape)
+
+        y_axis = self._axes[1]
+        j, r = self._locate(y_axis, coordinates[1].ravel())
+        if self.method == 'linear':
+            values = self._values
+            t = s / (axis[k + 1] - axis[k])
+            u = r / (y_axis[j + 1] - y_axis[j])
+            result = ((1 - t) * ((1 - u) * values[k, j] + u * values[k, j + 1]) +
+                      t * ((1 - u) * values[k + 1, j] + u * values[k + 1, j + 1]))
+            return result.reshape(shape)
+
+        # the monotone cubic along the first axis at all breakpoints of the second, then along the second
+        columns = _evaluate(self._polynomials, k, s[:, None])
+        polynomials = _polynomials(y_axis, columns.T, self.method)
+        return _evaluate(polynomials, (j, np.arange(len(j))), r).reshape(shape)
@@ -0,0 +1,9 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+# the environments loaded with the setting 'cache' by the tests are cached in a directory of their own, not the user's
+if not os.environ.get('SIMPLESI_CACHE_DIR'):
+    os.environ['SIMPLESI_CACHE_DIR'] = tempfile.mkdtemp(prefix='simplesi-cache-')
+    atexit.register(shutil.rmtree, os.environ['SIMPLESI_CACHE_DIR'], ignore_errors=True)
@@ -247,7 +247,9 @@ ValueError: No units found for the dimensions Dimensions(kg=0, m=1, s=0, A=0, cd
 >>> print(a.root(3))
 Traceback (most recent call last):
 ...
-ValueError: No units found for the dimensions Dimensions(kg=0.0, m=0.6666666666666666, s=0.0, A=0.0, cd=0.0, K=0.0, mol=0.0).
+ValueError: No units found for the dimensions Dimensions(kg=0, m=Fraction(2, 3), s=0, A=0, cd=0, K=0, mol=0).
+>>> print((a.root(3) * a.root(3) * a.root(3)).to('m2'))
+1 m²
 
 # physrep
 
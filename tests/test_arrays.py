@@ -0,0 +1,125 @@
+import unittest
+from simplesi.dimensions import Dimensions
+from simplesi import Physical, PhysicalArray
+import simplesi as si
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+LENGTH = Dimensions(0, 1, 0, 0, 0, 0, 0)
+FORCE = Dimensions(1, 1, -2, 0, 0, 0, 0)
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestPhysicalArray(unittest.TestCase):
+
+    def setUp(self):
+        self.lengths = PhysicalArray([1.0, 2.0, 3.0], LENGTH)
+        self.forces = PhysicalArray([2.0, 4.0, 6.0], FORCE)
+        self.length = Physical(2.0, LENGTH)
+
+    def test_creation(self):
+        self.assertEqual(self.lengths.shape, (3,))
+        self.assertEqual(len(self.lengths), 3)
+        self.assertEqual(self.lengths[1], Physical(2.0, LENGTH))
+        self.assertIsInstance(self.lengths[1:], PhysicalArray)
+        self.assertEqual(list(self.lengths), [Physical(x, LENGTH) for x in (1.0, 2.0, 3.0)])
+
+        from_physicals = PhysicalArray.from_physicals([Physical(1.0, LENGTH), Physical(2.0, LENGTH)])
+        self.assertTrue(np.array_equal(from_physicals.value, [1.0, 2.0]))
+        with self.assertRaises(ValueError):
+            PhysicalArray.from_physicals([Physical(1.0, LENGTH), Physical(2.0, FORCE)])
+        with self.assertRaises(ValueError):
+            PhysicalArray.from_physicals([1.0, Physical(2.0, LENGTH)])
+
+        with self.assertRaises(ValueError):
+            PhysicalArray(['a'], LENGTH)
+
+    def test_add_sub(self):
+        self.assertTrue(np.array_equal((self.lengths + self.lengths).value, [2.0, 4.0, 6.0]))
+        self.assertTrue(np.array_equal((self.lengths - self.length).value, [-1.0, 0.0, 1.0]))
+        self.assertTrue(np.array_equal((self.length - self.lengths).value, [1.0, 0.0, -1.0]))
+        self.assertTrue(np.array_equal((self.length + self.lengths).value, [3.0, 4.0, 5.0]))
+        self.assertIs(self.lengths + 0, self.lengths)
+        self.assertTrue(np.array_equal((0 - self.lengths).value, [-1.0, -2.0, -3.0]))
+        self.assertTrue(np.array_equal(sum([self.lengths, self.lengths]).value, [2.0, 4.0, 6.0]))
+
+        with self.assertRaises(ValueError):
+            self.lengths + self.forces
+        with self.assertRaises(ValueError):
+            self.length + self.forces
+        with self.assertRaises(ValueError):
+            self.lengths + 1
+
+    def test_mul_div(self):
+        moments = self.forces * self.length
+        self.assertEqual(moments.dimensions, FORCE.multiply(LENGTH))
+        self.assertTrue(np.array_equal(moments.value, [4.0, 8.0, 12.0]))
+
+        moments = self.length * self.forces
+        self.assertIsInstance(moments, PhysicalArray)
+        self.assertTrue(np.array_equal(moments.value, [4.0, 8.0, 12.0]))
+
+        self.assertTrue(np.array_equal((2 * self.lengths).value, [2.0, 4.0, 6.0]))
+        self.assertTrue(np.array_equal((np.array([1, 0, 2]) * self.lengths).value, [1.0, 0.0, 6.0]))
+
+        ratio = self.lengths / self.length
+        self.assertIsInstance(ratio, np.ndarray)
+        self.assertTrue(np.array_equal(ratio, [0.5, 1.0, 1.5]))
+
+        inverse = 6 / self.lengths
+        self.assertEqual(inverse.dimensions, LENGTH.power(-1))
+        self.assertTrue(np.array_equal(inverse.value, [6.0, 3.0, 2.0]))
+
+        inverse = self.length / self.forces
+        self.assertEqual(inverse.dimensions, LENGTH.divide(FORCE))
+
+        with self.assertRaises(ZeroDivisionError):
+            self.lengths / 0
+
+    def test_pow(self):
+        areas = self.lengths ** 2
+        self.assertEqual(areas.dimensions, LENGTH.power(2))
+        self.assertTrue(np.array_equal(areas.value, [1.0, 4.0, 9.0]))
+        self.assertTrue(np.allclose(areas.sqrt().value, self.lengths.value))
+        self.assertTrue(np.allclose((self.lengths ** 3).root(3).value, self.lengths.value))
+
+        with self.assertRaises(ValueError):
+            self.lengths ** self.length
+
+        # the root of a negative value is complex
+        with self.assertRaises(ValueError):
+            (-self.lengths).sqrt()
+        with self.assertRaises(ValueError):
+            (self.lengths - self.length) ** 0.5
+        self.assertTrue(np.array_equal(((-self.lengths) ** 2).value, [1.0, 4.0, 9.0]))
+
+    def test_comparison(self):
+        self.assertTrue(np.array_equal(self.lengths > self.length, [False, False, True]))
+        self.assertTrue(np.array_equal(self.length <= self.lengths, [False, True, True]))
+        self.assertTrue(np.array_equal(self.lengths == self.length, [False, True, False]))
+        self.assertTrue(np.array_equal(self.lengths != self.length, [True, False, True]))
+        self.assertTrue(np.all(self.lengths > 0))
+        self.assertTrue(np.array_equal(-self.lengths < 0, [True, True, True]))
+        self.assertTrue(np.array_equal(abs(-self.lengths).value, self.lengths.value))
+
+        with self.assertRaises(ValueError):
+            self.lengths > self.forces
+
+    def test_to(self):
+        si.environment(env_dict={'mK': {"Dimension": [0, 0, 0, 0, 0, 1, 0], "Value": 0.001}}, replace=False)
+        temperatures = PhysicalArray.from_unit([1, 2], si.K)
+        self.assertTrue(np.allclose(temperatures.to('mK'), [1000, 2000]))
+        self.assertTrue(np.allclose(temperatures.to('K'), [1, 2]))
+
+        to_fails = si.environment.settings['to_fails']
+        si.environment.settings['to_fails'] = 'raise'
+        with self.assertRaises(ValueError):
+            temperatures.to('m')
+        si.environment.settings['to_fails'] = to_fails
+
+
+if __name__ == '__main__':
+    unittest.main()
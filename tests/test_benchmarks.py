@@ -0,0 +1,36 @@
+import unittest
+
+import simplesi as si
+from benchmarks import suite
+
+
+class TestCompare(unittest.TestCase):
+
+    def test_compare(self):
+        baseline = {'results': {'a': 1.0, 'b': 1.0, 'c': 1.0}}
+        current = {'results': {'a': 1.05, 'b': 1.2, 'c': 0.5, 'd': 1.0}}
+
+        rows, regressions = suite.compare(baseline, current, threshold=10)
+        self.assertEqual(regressions, ['b'])
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[-1], ('d', None, 1.0, None, False))
+        self.assertAlmostEqual(rows[0][3], 5.0)
+
+        rows, regressions = suite.compare(baseline, current, threshold=1)
+        self.assertEqual(regressions, ['a', 'b'])
+
+    def test_run(self):
+        results = suite.run(names=['addition', 'load_structural'], repeat=1, scale=0.01)
+        self.assertEqual(set(results['results']), {'addition', 'load_structural'})
+        self.assertIn('commit', results['meta'])
+
+    def test_run_restores_environment(self):
+        settings = dict(si.environment.settings)
+        preferred_units = si.environment.preferred_units
+        suite.run(names=['str_auto'], repeat=1, scale=0.01)
+        self.assertEqual(si.environment.settings, settings)
+        self.assertIs(si.environment.preferred_units, preferred_units)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import json
+import os
+import pathlib
+import shutil
+import tempfile
+import unittest
+
+import simplesi as si
+from simplesi import cache
+from simplesi.dimensions import Dimensions
+from simplesi.environment import Environment
+
+DEFINITIONS = {"mm": {"Dimension": [0, 1, 0, 0, 0, 0, 0], "Value": 0.001},
+               "m2": {"Dimension": [0, 2, 0, 0, 0, 0, 0], "Symbol": "m²"}}
+
+
+class TestCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = pathlib.Path(tempfile.mkdtemp())
+        self._cache_dir = os.environ.get('SIMPLESI_CACHE_DIR')
+        os.environ['SIMPLESI_CACHE_DIR'] = str(self.tmp / 'cache')
+
+        self.path = self.tmp / 'cached.json'
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(DEFINITIONS, f)
+
+        self.environment = Environment(si_base_units=si.base_units, preferred_units={},
+                                       settings=dict(si.environment_settings, cache=True))
+
+    def tearDown(self):
+        if self._cache_dir is None:
+            del os.environ['SIMPLESI_CACHE_DIR']
+        else:
+            os.environ['SIMPLESI_CACHE_DIR'] = self._cache_dir
+        shutil.rmtree(self.tmp)
+
+    def test_roundtrip(self):
+        self.assertIsNone(cache.load(self.path))
+
+        definitions = self.environment._load_definitions(_name='cached', _path=self.tmp)
+        self.assertEqual(len(list((self.tmp / 'cache').iterdir())), 1)
+
+        cached = cache.load(self.path)
+        self.assertEqual(cached, definitions)
+        self.assertIs(cached['mm']['Dimension'], Dimensions(0, 1, 0, 0, 0, 0, 0))
+        self.assertEqual(cached['m2']['Symbol'], 'm²')
+        self.assertEqual(cached['mm']['Factor'], 1)
+
+    def test_cache_is_used(self):
+        self.environment._load_definitions(_name='cached', _path=self.tmp)
+
+        # the file is not read again
+        def fail(*args, **kwargs):
+            raise AssertionError('the file should not be read')
+
+        self.environment._read_from_file = fail
+        self.environment(env_name='cached', env_path=self.tmp)
+        self.assertEqual(self.environment.find_unit(Dimensions(0, 1, 0, 0, 0, 0, 0), 'mm')[0], 'mm')
+
+    def test_invalidated(self):
+        self.environment._load_definitions(_name='cached', _path=self.tmp)
+
+        changed = dict(DEFINITIONS, cm={"Dimension": [0, 1, 0, 0, 0, 0, 0], "Value": 0.01})
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(changed, f)
+
+        self.assertIsNone(cache.load(self.path))
+        definitions = self.environment._load_definitions(_name='cached', _path=self.tmp)
+        self.assertIn('cm', definitions)
+
+    def test_disabled(self):
+        self.environment.settings['cache'] = False
+        self.environment._load_definitions(_name='cached', _path=self.tmp)
+        self.assertFalse((self.tmp / 'cache').exists())
+
+        # off by default
+        self.assertFalse(si.environment_settings['cache'])
+        Environment(si_base_units=si.base_units, preferred_units={},
+                    settings=dict(si.environment_settings))._load_definitions(_name='cached', _path=self.tmp)
+        self.assertFalse((self.tmp / 'cache').exists())
+
+    def test_prune(self):
+        self.environment._load_definitions(_name='cached', _path=self.tmp)
+        other = self.tmp / 'other.json'
+        with open(other, 'w', encoding='utf-8') as f:
+            json.dump(DEFINITIONS, f)
+        self.environment._load_definitions(_name='other', _path=self.tmp)
+        self.assertEqual(len(list((self.tmp / 'cache').iterdir())), 2)
+
+        # the entry of a deleted file is removed when a new entry is written
+        os.remove(other)
+        self.assertEqual(cache.prune(), 1)
+        self.assertEqual(len(list((self.tmp / 'cache').iterdir())), 1)
+        self.assertIsNotNone(cache.load(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+
+import simplesi as si
+from simplesi import Physical, PhysicalArray
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+class TestChecked(unittest.TestCase):
+
+    def setUp(self):
+        si.environment(env_name='structural', top_level=False)
+
+    def test_inputs(self):
+        calls = []
+
+        @si.checked(inputs={'L': 'm', 'q': 'kN/m', 'factor': '1'}, returns='kNm')
+        def moment(L, q, factor=1.0, label=None):
+            calls.append((L, q, factor, label))
+            return factor * q * L ** 2 / 8
+
+        self.assertEqual(moment(4 * si.m, 1.5 * si.kN_m), 3 * si.kNm)
+        self.assertEqual(calls[-1], (4.0, 1.5, 1.0, None))
+        self.assertEqual(moment(q=1.5 * si.kN_m, L=4000 * si.mm, factor=2, label='B1'), 6 * si.kNm)
+        self.assertEqual(calls[-1], (4.0, 1.5, 2, 'B1'))
+        self.assertEqual(moment.__name__, 'moment')
+
+        with self.assertRaises(ValueError):
+            moment(4 * si.m, 1.5 * si.kN)
+        with self.assertRaises(ValueError):
+            moment(4, 1.5 * si.kN_m)
+        with self.assertRaises(TypeError):
+            moment(4 * si.m)
+        with self.assertRaises(ValueError):
+            si.checked(inputs={'x': 'm'})(lambda y: y)
+
+    def test_annotations(self):
+        @si.checked()
+        def stress(N: 'kN', A: 'mm^2', gamma=1.0) -> 'N/mm2':
+            return N * 1000 / A / gamma
+
+        result = stress(150 * si.kN, 1000 * si.mm ** 2)
+        self.assertIsInstance(result, Physical)
+        self.assertAlmostEqual(result.value, 150e6)
+
+        @si.checked(inputs={'L': 'm', 'd': 'm'}, returns=('m', 'm2'))
+        def length_and_area(L, d=si.m * 0.5):
+            return L + d, L * d
+
+        L, A = length_and_area(2 * si.m)
+        self.assertEqual(L, 2.5 * si.m)
+        self.assertEqual(A, 1 * si.m2)
+
+    def test_var_positional(self):
+        @si.checked(inputs={'a': 'm', 'b': 'm'})
+        def f(a, *rest, b):
+            return a, rest, b
+
+        # the arguments in *rest are not converted, b is given by keyword only
+        self.assertEqual(f(1 * si.m, 2, 3 * si.m, b=4 * si.m), (1.0, (2, 3 * si.m), 4.0))
+        self.assertEqual(f(1 * si.m, 2, b=4 * si.m), (1.0, (2,), 4.0))
+        with self.assertRaises(ValueError):
+            f(1 * si.m, 2, 3 * si.m, b=4)
+
+    def test_environment_changes(self):
+        @si.checked(inputs={'I': 'checked_candle'})
+        def candles(I):
+            return I
+
+        si.environment(env_dict={'checked_candle': {"Dimension": [0, 0, 0, 0, 1, 0, 0], "Value": 5}})
+        self.assertEqual(candles(10 * si.cd), 2)
+        # the compiled units are not kept when the definitions change
+        si.environment(env_dict={'checked_candle': {"Dimension": [0, 0, 0, 0, 1, 0, 0], "Value": 2}})
+        self.assertEqual(candles(10 * si.cd), 5)
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_array(self):
+        @si.checked(inputs={'L': 'm', 'q': 'kN/m'}, returns='kNm')
+        def moment(L, q):
+            return q * L ** 2 / 8
+
+        result = moment(PhysicalArray.from_unit([2, 4], si.m), 1.5 * si.kN_m)
+        self.assertIsInstance(result, PhysicalArray)
+        self.assertEqual(result.to('kNm').tolist(), [0.75, 3.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+
+import simplesi as si
+from simplesi import PhysicalArray
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestCombinations(unittest.TestCase):
+
+    def setUp(self):
+        si.environment(env_name='structural', top_level=False)
+        self.cases = {
+            'G': PhysicalArray.from_unit([10, 20, 10], si.kNm),
+            'Q': PhysicalArray.from_unit([5, 10, -5], si.kNm),
+            'W': PhysicalArray.from_unit([-8, 2, 8], si.kNm),
+        }
+
+    def test_table(self):
+        combinations = si.combinations.Combinations({'ULS-1': {'G': 1.35, 'Q': 1.5}, 'ULS-2': {'G': 1.0, 'W': 1.5}})
+        self.assertEqual(combinations.names, ('ULS-1', 'ULS-2'))
+        self.assertEqual(combinations.cases, ('G', 'Q', 'W'))
+        self.assertEqual(combinations.factors.tolist(), [[1.35, 1.5, 0.0], [1.0, 0.0, 1.5]])
+
+        envelope = si.combinations.envelope(self.cases, combinations)
+        self.assertEqual(envelope.max.to('kNm').tolist(), [21.0, 42.0, 22.0])
+        self.assertEqual(envelope.min.to('kNm').tolist(), [-2.0, 23.0, 6.0])
+        self.assertEqual(envelope.argmax.tolist(), [0, 0, 1])
+        self.assertEqual(list(envelope.governing('min')), ['ULS-2', 'ULS-2', 'ULS-1'])
+
+        # the same in chunks of points
+        chunked = si.combinations.envelope(self.cases, combinations, chunk_size=2)
+        self.assertTrue(np.allclose(chunked.min.value, envelope.min.value))
+        self.assertEqual(chunked.argmin.tolist(), envelope.argmin.tolist())
+
+        with self.assertRaises(ValueError):
+            si.combinations.Combinations({'ULS-1': {'G': '1.35'}})
+        with self.assertRaises(ValueError):
+            envelope.governing('mean')
+
+    def test_leading(self):
+        combinations = si.combinations.Combinations.leading(permanent={'G': (1.35, 1.0)},
+                                                            variable={'Q': (1.5, 0.7), 'W': (1.5, 0.6)})
+        self.assertEqual(len(combinations), 10)
+        self.assertAlmostEqual(combinations.table()['1.35 G + 1.5 Q + 0.9 W']['W'], 0.9)
+        self.assertIn('1 G + 1.5 W', combinations.names)
+        self.assertEqual(combinations.names[-2:], ('1.35 G', '1 G'))
+
+        # the permanent actions alone govern the smallest result of the second point
+        envelope = si.combinations.envelope(self.cases, combinations)
+        self.assertTrue(np.allclose(envelope.min.to('kNm'), [-2, 20, 2.5]))
+        self.assertEqual(envelope.governing('min')[1], '1 G')
+
+        unfavourable = si.combinations.Combinations.leading(permanent={'G': (1.35, 1.0)},
+                                                            variable={'Q': (1.5, 0.7), 'W': (1.5, 0.6)},
+                                                            favourable=False)
+        self.assertEqual(unfavourable.names, ('1.35 G + 1.5 Q + 0.9 W', '1.35 G + 1.5 W + 1.05 Q'))
+        self.assertEqual(si.combinations.Combinations.leading(permanent={'G': 1.35}).names, ('1.35 G',))
+
+    def test_checks(self):
+        combinations = {'ULS': {'G': 1.35, 'Q': 1.5}}
+        with self.assertRaises(ValueError):
+            si.combinations.envelope({'G': self.cases['G']}, combinations)
+        with self.assertRaises(ValueError):
+            si.combinations.envelope({'G': self.cases['G'], 'Q': PhysicalArray.from_unit([1, 2, 3], si.kN)},
+                                     combinations)
+        with self.assertRaises(ValueError):
+            si.combinations.envelope({'G': self.cases['G'], 'Q': PhysicalArray.from_unit([1, 2], si.kNm)},
+                                     combinations)
+
+    def test_quantities(self):
+        cases = {
+            'G': {'M': [10 * si.kNm, 20 * si.kNm], 'N': 100 * si.kN},
+            'Q': {'M': [5 * si.kNm, -10 * si.kNm], 'N': 50 * si.kN},
+        }
+        envelopes = si.combinations.envelope(cases, {'ULS-1': {'G': 1.35, 'Q': 1.5}, 'ULS-2': {'G': 1.0}})
+        self.assertEqual(list(envelopes), ['M', 'N'])
+        self.assertEqual(envelopes['M'].max.to('kNm').tolist(), [21.0, 20.0])
+        self.assertEqual(envelopes['N'].max.to('kN').tolist(), 210.0)
+        self.assertEqual(envelopes['N'].argmin.tolist(), 1)
+
+        factors = si.combinations.envelope({'G': [1.0, 2.0], 'Q': [0.5, 0.5]}, {'C': {'G': 2.0, 'Q': 1.0}})
+        self.assertEqual(factors.max.tolist(), [2.5, 4.5])
+
+
+if __name__ == '__main__':
+    unittest.main()
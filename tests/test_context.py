@@ -0,0 +1,120 @@
+import asyncio
+import threading
+import unittest
+
+import simplesi as si
+from simplesi.dimensions import Dimensions
+from simplesi.environment import Environment
+
+
+class TestContext(unittest.TestCase):
+
+    def setUp(self):
+        si.environment(env_name='structural', top_level=False)
+        self.settings = dict(si.environment.settings)
+        si.environment.settings['significant_digits'] = 3
+        si.environment.settings['to_fails'] = 'raise'
+        # forces in kN, whatever the tests run before left
+        self.preferred_units = si.environment.preferred_units
+        si.environment.apply_preferences({'kN': Dimensions(1, 1, -2, 0, 0, 0, 0)})
+
+    def tearDown(self):
+        si.environment.settings.update(self.settings)
+        si.environment.apply_preferences(self.preferred_units)
+
+    def test_use_environment(self):
+        a = 1.23456 * si.kN
+        self.assertEqual(a.to('kN'), '1.23 kN')
+
+        with si.use_environment(settings={'significant_digits': 5}) as env:
+            self.assertIs(si.current_environment(), env)
+            self.assertEqual(a.to('kN'), '1.2346 kN')
+            with si.use_environment(preferred_units={'N': [1, 1, -2, 0, 0, 0, 0]}):
+                self.assertEqual(str(a), '1234.56 N')
+            self.assertEqual(str(a), '1.2346 kN')
+
+        self.assertIs(si.current_environment(), si.environment)
+        self.assertEqual(a.to('kN'), '1.23 kN')
+
+    def test_snapshot(self):
+        snapshot = si.environment.snapshot()
+        with self.assertRaises(TypeError):
+            snapshot.settings['significant_digits'] = 5
+        with self.assertRaises(ValueError):
+            snapshot(env_name='structural')
+        with self.assertRaises(ValueError):
+            snapshot.apply_preferences({})
+        with self.assertRaises(ValueError):
+            snapshot.apply_settings({})
+
+        # units created lazily by the snapshot are not written to the environment
+        env = Environment(si_base_units=si.base_units, preferred_units={}, settings=dict(si.environment_settings),
+                          environment={'ctx_pole': {"Dimension": [0, 0, 0, 0, 1, 0, 0], "Value": 5}})
+        frozen = env.snapshot()
+        self.assertEqual(frozen.physical('ctx_pole').value, 5)
+        self.assertEqual(frozen.compile_unit('ctx_pole/s').factor, 5)
+        self.assertNotIn('ctx_pole', env._units)
+        self.assertNotIn('ctx_pole', env._physicals)
+        self.assertNotIn('ctx_pole/s', env._expressions)
+
+        # later changes of the environment are not seen by the snapshot
+        si.environment(env_dict={'ctx_rod': {"Dimension": [0, 1, 0, 0, 0, 0, 0], "Value": 5.0292}})
+        self.assertIsNone(snapshot.physical('ctx_rod'))
+        self.assertIsNone(snapshot.find_unit((1 * si.m).dimensions, 'ctx_rod'))
+        self.assertEqual(si.environment.find_unit((1 * si.m).dimensions, 'ctx_rod')[0], 'ctx_rod')
+
+    def test_threads(self):
+        a = 1.23456 * si.kN
+        barrier = threading.Barrier(3)
+        results = {}
+
+        def work(digits):
+            with si.use_environment(settings={'significant_digits': digits}):
+                barrier.wait()
+                results[digits] = a.to('kN')
+
+        threads = [threading.Thread(target=work, args=(x,)) for x in (2, 4, 6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, {2: '1.23 kN', 4: '1.235 kN', 6: '1.23456 kN'})
+
+    def test_tasks(self):
+        a = 1.23456 * si.kN
+
+        async def work(digits):
+            with si.use_environment(settings={'significant_digits': digits}):
+                await asyncio.sleep(0)
+                return a.to('kN')
+
+        async def main():
+            return await asyncio.gather(work(4), work(5))
+
+        self.assertEqual(asyncio.run(main()), ['1.235 kN', '1.2346 kN'])
+
+    def test_set_environment(self):
+        old = si.environment
+        env = Environment(si_base_units=si.base_units, preferred_units={}, settings=dict(si.environment_settings))
+        env(env_name='structural')
+        try:
+            published = si.set_environment(env)
+            self.assertIs(published, env)
+            self.assertIs(si.environment, env)
+            self.assertIs(si.current_environment(), env)
+            self.assertEqual((1 * si.kN).to('N'), '1000 N')
+
+            # still an environment that can be changed
+            si.environment.settings['significant_digits'] = 5
+            self.assertEqual((1.23456 * si.kN).to('kN'), '1.2346 kN')
+            si.environment(env_name='structural', settings=dict(si.environment_settings))
+            self.assertEqual((1.23456 * si.kN).to('kN'), '1.23 kN')
+
+            with self.assertRaises(ValueError):
+                si.set_environment(env.snapshot())
+        finally:
+            si.environment = old
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,6 @@
 import unittest
+from fractions import Fraction
+
 from simplesi.dimensions import Dimensions
 
 
@@ -17,6 +19,52 @@ class TestDimensions(unittest.TestCase):
         dim = Dimensions(*[0 for x in range(7)])
         self.assertTrue(dim.dimensionsless)
 
+    def test_interning(self):
+        dim = Dimensions(0, 1, 0, 0, 0, 0, 0)
+        self.assertIs(dim, Dimensions(kg=0, m=1, s=0, A=0, cd=0, K=0, mol=0))
+        self.assertIs(dim, Dimensions(0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 0.0))
+        self.assertIs(dim, dim._replace(m=1))
+        self.assertEqual(dim.uid, Dimensions(0, 1, 0, 0, 0, 0, 0).uid)
+        self.assertNotEqual(dim.uid, Dimensions(0, 2, 0, 0, 0, 0, 0).uid)
+        self.assertFalse(dim.dimensionsless)
+
+        import pickle
+        self.assertIs(pickle.loads(pickle.dumps(dim)), dim)
+
+    def test_algebra(self):
+        length = Dimensions(0, 1, 0, 0, 0, 0, 0)
+        force = Dimensions(1, 1, -2, 0, 0, 0, 0)
+        self.assertIs(force.multiply(length), Dimensions(1, 2, -2, 0, 0, 0, 0))
+        self.assertIs(force.divide(length), Dimensions(1, 0, -2, 0, 0, 0, 0))
+        self.assertIs(length.power(2), Dimensions(0, 2, 0, 0, 0, 0, 0))
+        self.assertIs(length.power(-1), Dimensions(0, -1, 0, 0, 0, 0, 0))
+        self.assertEqual(length.power(0.5), Dimensions(0, 0.5, 0, 0, 0, 0, 0))
+        self.assertTrue(length.divide(length).dimensionsless)
+
+        # memoized
+        self.assertIs(force.multiply(length), force.multiply(length))
+
+    def test_fractional_exponents(self):
+        length = Dimensions(0, 1, 0, 0, 0, 0, 0)
+        third = length.power(1 / 3)
+        self.assertEqual(third.m, Fraction(1, 3))
+        self.assertIs(third, Dimensions(0, Fraction(1, 3), 0, 0, 0, 0, 0))
+        self.assertIs(third.multiply(third).multiply(third), length)
+        self.assertIs(third.power(3), length)
+        self.assertIsInstance(third.power(3).m, int)
+
+        tenth = length.power(0.1)
+        product = tenth
+        for _ in range(9):
+            product = product.multiply(tenth)
+        self.assertIs(product, length)
+
+        # not a simple fraction, kept exactly
+        self.assertEqual(length.power(0.1234567).m, Fraction(0.1234567))
+
+        import pickle
+        self.assertIs(pickle.loads(pickle.dumps(third)), third)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -117,9 +117,12 @@ class TestPhysicalWithUnits(unittest.TestCase):
         self.assertIsNotNone(si.Hz.to())
 
         # unit unknown,prints something but no return value
-        self.assertIsNone(si.Hz.to('1/hour'))  # unkown
         self.assertIsNone(si.Hz.to('whatever'))  # unknown
-        self.assertIsNone(si.Hz.to('1/s'))  # only as Hz available
+        self.assertIsNone(si.Hz.to('1/whatever'))  # unknown
+
+        # unit expressions
+        self.assertEqual(si.Hz.to('1/hour'), '3600 1/hour')
+        self.assertEqual(si.Hz.to('1/s'), '1 1/s')
 
         # this makes sense
         self.assertEqual(si.Hz.__str__(), '1 Hz')
@@ -207,6 +210,13 @@ class TestPhysicalWithUnits(unittest.TestCase):
         with self.assertRaises(ValueError):
             si.m ** si.s
 
+        # the root of a negative quantity is complex
+        with self.assertRaises(ValueError):
+            (-4 * si.m2).sqrt()
+        with self.assertRaises(ValueError):
+            (-4 * si.m2) ** 0.5
+        self.assertEqual((-2 * si.m) ** 2, 4 * si.m2)
+
     def test_environment_definition(self):
 
         from simplesi.environment import Environment
@@ -295,6 +305,114 @@ class TestPhysicalWithUnits(unittest.TestCase):
 
 
 
+class TestRegistry(unittest.TestCase):
+
+    def test_units_by_scale(self):
+        units = [k for k, v in si.environment.units_by_scale((1 * si.m).dimensions)]
+        self.assertEqual(units[0], 'mm')
+        self.assertEqual(units[-1], 'mile')
+        self.assertEqual(si.environment.units_by_scale(Dimensions(0, 0, 0, 0, 0, 7, 0)), ())
+
+    def test_find_unit(self):
+        dims = (1 * si.m2).dimensions
+        # by key and by symbol
+        self.assertEqual(si.environment.find_unit(dims, 'm2')[0], 'm2')
+        self.assertEqual(si.environment.find_unit(dims, 'm²')[0], 'm2')
+        self.assertIsNone(si.environment.find_unit(dims, 'm'))
+
+    def test_scaled_unit(self):
+        dims = (1 * si.m).dimensions
+        self.assertEqual(si.environment.scaled_unit(dims, 3.2), 'm')
+        self.assertEqual(si.environment.scaled_unit(dims, 1.0), 'm')
+        self.assertEqual(si.environment.scaled_unit(dims, 0.0004), 'mm')
+        self.assertEqual(si.environment.scaled_unit(dims, 0), 'mm')
+        self.assertEqual(si.environment.scaled_unit(dims, float('nan')), 'mm')
+        # the SI units only, not mile
+        self.assertEqual(si.environment.scaled_unit(dims, 1e12), 'km')
+        self.assertIsNone(si.environment.scaled_unit(Dimensions(0, 0, 0, 0, 0, 7, 0), 1))
+
+        preferred_units = si.environment.preferred_units
+        print_unit = si.environment.settings['print_unit']
+        si.environment.apply_preferences({})
+        si.environment.settings['print_unit'] = 'auto'
+        try:
+            self.assertEqual((3.2 * si.m)._print_unit(), 'm')
+            self.assertEqual((-3.2 * si.m)._print_unit(), 'm')
+            self.assertEqual((0.0004 * si.m)._print_unit(), 'mm')
+            self.assertEqual((0.1 * si.kN)._print_unit(), 'N')
+            self.assertEqual((4000 * si.kN)._print_unit(), 'kN')
+        finally:
+            si.environment.apply_preferences(preferred_units)
+            si.environment.settings['print_unit'] = print_unit
+
+    def test_rebuilt_on_call(self):
+        si.environment(env_dict={'furlong': {"Dimension": [0, 1, 0, 0, 0, 0, 0], "Value": 201.168}}, replace=False)
+        self.assertEqual(si.environment.find_unit((1 * si.m).dimensions, 'furlong')[0], 'furlong')
+        self.assertEqual((1 * si.furlong).to('furlong'), '1 furlong')
+        self.assertEqual(si.environment.physical('furlong'), si.furlong)
+
+    def test_lazy(self):
+        number_defined_units = si.environment.number_defined_units
+        si.environment(env_dict={'lazy_furlong': {"Dimension": [0, 1, 0, 0, 0, 0, 0], "Value": 201.168},
+                                 'lazy_chain': {"Dimension": [0, 1, 0, 0, 0, 0, 0], "Value": 20.1168}},
+                       lazy=True)
+        self.assertEqual(si.environment.number_defined_units, number_defined_units + 2)
+
+        # not created until first used
+        self.assertNotIn('lazy_furlong', si.__dict__)
+        self.assertIn('lazy_furlong', dir(si))
+        self.assertEqual(10 * si.lazy_chain, si.lazy_furlong)
+        self.assertIn('lazy_furlong', si.__dict__)
+        self.assertIs(si.environment.physical('lazy_furlong'), si.lazy_furlong)
+        self.assertNotIn('lazy_foo', si.__dict__)
+
+        # redefining removes the unit created earlier
+        si.environment(env_dict={'lazy_furlong': {"Dimension": [0, 1, 0, 0, 0, 0, 0], "Value": 201}}, lazy=True)
+        self.assertNotIn('lazy_furlong', si.__dict__)
+        self.assertEqual(si.lazy_furlong.value, 201)
+
+        with self.assertRaises(AttributeError):
+            si.lazy_foo
+
+    def test_incremental(self):
+        # reloading the same environment changes nothing
+        si.environment(env_name='structural')
+        self.assertEqual(si.environment.overridden_units, ())
+
+        # a changed definition is reported and replaces the unit created earlier
+        si.environment(env_dict={'inc_rod': {"Dimension": [0, 1, 0, 0, 0, 0, 0], "Value": 5.0292, "Symbol": "rd"}})
+        rod = si.inc_rod
+        si.environment(env_dict={'inc_rod': {"Dimension": [0, 1, 0, 0, 0, 0, 0], "Value": 5.0292, "Symbol": "rd"},
+                                 'inc_pole': {"Dimension": [0, 1, 0, 0, 0, 0, 0], "Value": 5.0292}})
+        self.assertEqual(si.environment.overridden_units, ())
+        self.assertIs(si.inc_rod, rod)
+        si.environment(env_dict={'inc_rod': {"Dimension": [0, 0, 0, 0, 0, 0, 1], "Value": 5, "Symbol": "rdm"}})
+        self.assertEqual(si.environment.overridden_units, ('inc_rod',))
+        self.assertEqual(si.inc_rod.dimensions, Dimensions(0, 0, 0, 0, 0, 0, 1))
+        self.assertIs(si.environment.physical('rdm'), si.inc_rod)
+        self.assertIsNone(si.environment.find_unit((1 * si.m).dimensions, 'inc_rod'))
+        self.assertIsNone(si.environment.physical('rd'))
+
+        # only the changed units are created and pushed to the namespace
+        pushed = []
+        push_vars = si.environment._push_vars
+        si.environment._push_vars = lambda units, module: (pushed.append(set(units)), push_vars(units, module))
+        try:
+            si.environment(env_dict={'inc_rod': {"Dimension": [0, 0, 0, 0, 0, 0, 1], "Value": 5, "Symbol": "rdm"},
+                                     'inc_mole': {"Dimension": [0, 0, 0, 0, 0, 0, 1], "Value": 7}})
+        finally:
+            del si.environment._push_vars
+        self.assertEqual(pushed, [{'inc_mole'}, set(si.base_units)])
+        self.assertEqual(si.inc_mole.value, 7)
+
+        # the lookup structures are the same as if built from scratch
+        incremental = (dict(si.environment.all_units), dict(si.environment._units_by_dimensions),
+                       dict(si.environment._names_by_dimensions), set(si.environment._ambiguous_names))
+        si.environment._build_registry()
+        self.assertEqual(incremental, (si.environment.all_units, si.environment._units_by_dimensions,
+                                       si.environment._names_by_dimensions, si.environment._ambiguous_names))
+
+
 class TestRepresentation(unittest.TestCase):
 
     def test_PhysRepr_int(self):
@@ -335,9 +453,29 @@ class TestRepresentation(unittest.TestCase):
         self.assertEqual(as_minute.unit, 's')
 
         # no unit found - the provided unit is not defined so it is not possible to convert to it.
-        with self.assertRaises(AttributeError):
+        with self.assertRaises(ValueError):
             as_cm = physical('whatever')
 
+    def test_value_in(self):
+        physical = 1234.5678 * si.mm
+        # not rounded
+        self.assertEqual(physical.value_in('m'), physical.value)
+        self.assertAlmostEqual(physical.value_in('cm'), 123.45678)
+        self.assertAlmostEqual(physical('cm').value, 123.45678)
+        self.assertEqual((1 * si.m2)('m2').unit, 'm²')
+
+        with self.assertRaises(ValueError):
+            physical.value_in('kN')
+
+        values = si.values_in([1 * si.m, 2 * si.ft, 3 * si.inch], 'mm')
+        self.assertEqual(len(values), 3)
+        self.assertAlmostEqual(values[1], 609.6)
+        self.assertAlmostEqual(values[2], 76.2)
+        self.assertEqual(si.values_in([], 'mm'), [])
+
+        with self.assertRaises(ValueError):
+            si.values_in([1 * si.m, 1 * si.s], 'mm')
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,95 @@
+import math
+import unittest
+
+import simplesi as si
+from simplesi import Physical, PhysicalArray
+from simplesi.dimensions import Dimensions
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+LENGTH = Dimensions(0, 1, 0, 0, 0, 0, 0)
+AREA = Dimensions(0, 2, 0, 0, 0, 0, 0)
+
+
+class TestExpr(unittest.TestCase):
+
+    def setUp(self):
+        si.environment(env_name='structural', top_level=False)
+        self.x = si.expr.var('x', si.mm)
+        self.y = si.expr.var('y', 'm')
+
+    def test_graph(self):
+        x, y = self.x, self.y
+        self.assertEqual((x * y).dimensions, AREA)
+        self.assertEqual((x / y).dimensions, Dimensions(0, 0, 0, 0, 0, 0, 0))
+        self.assertEqual(si.expr.sqrt(x * y).dimensions, LENGTH)
+        self.assertIs(0 + x, x)
+        self.assertIs(x - 0, x)
+        self.assertEqual(str((x - y) / (x + y) * si.expr.log(x / y)), '((x - y) / (x + y)) * log(x / y)')
+        self.assertEqual(str(si.kN * x), '1000.0 * x')
+
+        # the dimensions are checked when the graph is built
+        with self.assertRaises(ValueError):
+            x + si.kN
+        with self.assertRaises(ValueError):
+            x + 1
+        with self.assertRaises(ValueError):
+            si.expr.exp(x)
+        with self.assertRaises(ValueError):
+            x ** y
+        with self.assertRaises(ValueError):
+            x < y
+        with self.assertRaises(ValueError):
+            si.expr.compile(x + si.expr.var('x', si.kN) * si.m / si.kN)
+
+    def test_kernel(self):
+        x, y = self.x, self.y
+        kernel = si.expr.compile((x - y) / (x + y) * si.expr.log(x / y))
+        self.assertEqual(kernel.variables, ('x', 'y'))
+
+        a, b = 37 * si.mm, 55 * si.mm
+        expected = (a - b) / (a + b) * math.log(a / b)
+        self.assertAlmostEqual(kernel(a, b), expected)
+        self.assertAlmostEqual(kernel(y=b, x=a), expected)
+        self.assertAlmostEqual(kernel.function()(a.value, b.value), expected)
+
+        kernel = si.expr.compile((x + y) * (x + y) - 2 * x * y, variables=('y', 'x'))
+        # x + y is computed once
+        self.assertEqual(kernel.source.count('+'), 1)
+        result = kernel(2 * si.m, 1 * si.m)
+        self.assertIsInstance(result, Physical)
+        self.assertIs(result.dimensions, AREA)
+        self.assertAlmostEqual(result.value, 5.0)
+
+        with self.assertRaises(ValueError):
+            kernel(1 * si.kN, 1 * si.m)
+        with self.assertRaises(ValueError):
+            kernel(1, 1)
+        with self.assertRaises(ValueError):
+            kernel(1 * si.m)
+        with self.assertRaises(ValueError):
+            kernel(1 * si.m, x=1 * si.m, y=1 * si.m)
+        with self.assertRaises(ValueError):
+            si.expr.compile(x * y, variables=('x',))
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_array(self):
+        x, y = self.x, self.y
+        kernel = si.expr.compile(si.expr.sqrt(x * y) + 1.5 * si.m)
+        xs = PhysicalArray.from_unit([1, 4, 9], si.m)
+        result = kernel(xs, 1 * si.m)
+        self.assertIsInstance(result, PhysicalArray)
+        self.assertIs(result.dimensions, LENGTH)
+        self.assertEqual(result.value.tolist(), [2.5, 3.5, 4.5])
+
+        # dimensionless results are arrays
+        kernel = si.expr.compile(si.expr.cos(x / y * si.expr.var('c')))
+        result = kernel(xs, 1 * si.m, np.array([0.0, 0.0, math.pi / 9]))
+        self.assertEqual(result.tolist(), [1.0, 1.0, -1.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
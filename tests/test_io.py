@@ -0,0 +1,112 @@
+import io
+import math
+import pathlib
+import shutil
+import tempfile
+import unittest
+
+import simplesi as si
+from simplesi import io as si_io
+from simplesi import Physical
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+DATA = """beam,span [m],load [kN/m2],depth,n
+B1,3.5,2.5,350 mm,1
+B2,4.0,3,0.4 m,2
+B3,,3.5,,3
+"""
+
+
+class TestIO(unittest.TestCase):
+
+    def setUp(self):
+        si.environment(env_name='structural', top_level=False)
+        self.to_fails = si.environment.settings['to_fails']
+        si.environment.settings['to_fails'] = 'raise'
+        self.tmp = pathlib.Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        si.environment.settings['to_fails'] = self.to_fails
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_read(self):
+        chunks = list(si_io.read_csv(io.StringIO(DATA)))
+        self.assertEqual(len(chunks), 1)
+        chunk = chunks[0]
+
+        self.assertEqual(list(chunk), ['beam', 'span', 'load', 'depth', 'n'])
+        self.assertEqual(chunk['beam'], ['B1', 'B2', 'B3'])
+        self.assertEqual(chunk['span'][0], 3.5 * si.m)
+        self.assertTrue(math.isnan(chunk['span'][2].value))
+        self.assertEqual(chunk['load'][1], 3 * si.kN_m2)
+        # the unit of the first cell, the others converted
+        self.assertEqual(chunk['depth'][0], 350 * si.mm)
+        self.assertEqual(chunk['depth'][1], 400 * si.mm)
+        self.assertEqual(list(chunk['n']), [1, 2, 3])
+
+    def test_chunks(self):
+        rows = '\n'.join('{},{} kN'.format(i, i) for i in range(25))
+        chunks = list(si_io.read_csv(io.StringIO('i,F\n' + rows), chunk_size=10))
+        self.assertEqual([len(x['i']) for x in chunks], [10, 10, 5])
+        self.assertEqual(chunks[2]['F'][4], 24 * si.kN)
+
+    def test_units(self):
+        chunk = next(si_io.read_csv(io.StringIO('a [m],b\n1,2\n'), units={'a': 'mm', 'b': 'kN'}))
+        self.assertEqual(chunk['a'][0], 1 * si.mm)
+        self.assertEqual(chunk['b'][0], 2 * si.kN)
+
+        # dimensionsless
+        chunk = next(si_io.read_csv(io.StringIO('ratio [mm/m]\n5\n')))
+        self.assertAlmostEqual(chunk['ratio'][0], 0.005)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            list(si_io.read_csv(io.StringIO('a [m]\nx\n')))
+        with self.assertRaises(ValueError):
+            list(si_io.read_csv(io.StringIO('a\n1 m\n2 kN\n')))
+        with self.assertRaises(ValueError):
+            list(si_io.read_csv(io.StringIO('a,b\n1\n')))
+        with self.assertRaises(ValueError):
+            list(si_io.read_csv(io.StringIO('a [whatever]\n1\n')))
+
+    def test_write(self):
+        path = self.tmp / 'out.csv'
+        si_io.write_csv(path, si_io.read_csv(io.StringIO(DATA), chunk_size=2), units={'load': 'N/mm^2'})
+
+        with open(path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[0], 'beam,span [mm],load [N/mm^2],depth [mm],n')
+        self.assertEqual(lines[1], 'B1,3500.0,0.0025,350.0,1.0')
+        self.assertEqual(lines[3], 'B3,,0.0035,,3.0')
+
+        # reading back
+        chunk = next(si_io.read_csv(path))
+        self.assertEqual(chunk['load'][0], 2.5 * si.kN_m2)
+
+        # lists of Physical instances
+        out = io.StringIO()
+        si_io.write_csv(out, {'F': [1 * si.kN, 2 * si.kN]}, units={'F': 'N'})
+        self.assertEqual(out.getvalue().splitlines(), ['F [N]', '1000.0', '2000.0'])
+
+        with self.assertRaises(ValueError):
+            si_io.write_csv(io.StringIO(), {'F': [1 * si.kN, 2]})
+
+    def test_without_numpy(self):
+        _np, si_io.np = si_io.np, None
+        try:
+            chunk = next(si_io.read_csv(io.StringIO(DATA)))
+        finally:
+            si_io.np = _np
+
+        self.assertIsInstance(chunk['span'], list)
+        self.assertIsInstance(chunk['span'][0], Physical)
+        self.assertEqual(chunk['depth'], [350 * si.mm, 400 * si.mm, chunk['depth'][2]])
+        self.assertEqual(chunk['n'], [1, 2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import math
+import unittest
+
+import simplesi as si
+from simplesi import Physical, PhysicalArray
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+class TestMath(unittest.TestCase):
+
+    def setUp(self):
+        si.environment(env_name='structural', top_level=False)
+
+    def test_angles(self):
+        self.assertAlmostEqual(si.math.sin(30 * si.deg), 0.5, places=12)
+        self.assertAlmostEqual(si.math.cos(math.pi / 3), 0.5, places=12)
+        self.assertAlmostEqual(si.math.tan(45 * si.deg), 1, places=12)
+        # the radian of the structural environment is defined in degrees
+        self.assertAlmostEqual(si.math.sin(1 * si.rad), math.sin(1), places=4)
+        # angles computed with arithmetics
+        self.assertAlmostEqual(si.math.sin(2 * (15 * si.deg) + 0 * si.deg), 0.5, places=12)
+        self.assertAlmostEqual((30 * si.deg).sin, 0.5, places=12)
+        self.assertAlmostEqual((60 * si.deg).cos, 0.5, places=12)
+
+        with self.assertRaises(ValueError):
+            si.math.sin(1 * si.m)
+        with self.assertRaises(ValueError):
+            (1 * si.m).cos
+
+    def test_functions(self):
+        self.assertAlmostEqual(si.math.exp(1), math.e)
+        self.assertAlmostEqual(si.math.log(100, 10), 2)
+        self.assertAlmostEqual(si.math.atan2(1 * si.m, -1000 * si.mm), 3 * math.pi / 4)
+        self.assertEqual(si.math.hypot(3 * si.m, 400 * si.cm), 5 * si.m)
+        self.assertEqual(si.math.hypot(3, 4), 5)
+        self.assertEqual(si.math.sqrt(9 * si.m2), 3 * si.m)
+        self.assertEqual(si.math.sqrt(16), 4)
+
+        with self.assertRaises(ValueError):
+            si.math.exp(1 * si.m)
+        with self.assertRaises(ValueError):
+            si.math.log(1 * si.kN)
+        with self.assertRaises(ValueError):
+            si.math.atan2(1 * si.m, 1 * si.kN)
+        with self.assertRaises(ValueError):
+            si.math.hypot(3 * si.m, 4)
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_arrays(self):
+        angles = PhysicalArray.from_unit([0, 30, 90], si.deg)
+        self.assertTrue(np.allclose(si.math.sin(angles), [0, 0.5, 1]))
+        self.assertTrue(np.allclose(angles.sin, [0, 0.5, 1]))
+        self.assertTrue(np.allclose(si.math.cos(np.array([0, math.pi])), [1, -1]))
+
+        x = PhysicalArray.from_unit([3, 6], si.m)
+        length = si.math.hypot(x, PhysicalArray.from_unit([4, 8], si.m))
+        self.assertIsInstance(length, PhysicalArray)
+        self.assertEqual(length.to('m').tolist(), [5, 10])
+        self.assertIsInstance(si.math.hypot(x, 4 * si.m), PhysicalArray)
+
+        root = si.math.sqrt(PhysicalArray.from_unit([4, 9], si.m2))
+        self.assertIsInstance(root, PhysicalArray)
+        self.assertEqual(root.to('m').tolist(), [2, 3])
+        self.assertTrue(np.allclose(si.math.atan2(x, x), math.pi / 4))
+        self.assertIsInstance(si.math.sqrt(9 * si.m2), Physical)
+
+
+if __name__ == '__main__':
+    unittest.main()
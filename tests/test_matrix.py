@@ -0,0 +1,81 @@
+import unittest
+
+import simplesi as si
+from simplesi import Physical
+from simplesi.dimensions import Dimensions
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+LENGTH = Dimensions(0, 1, 0, 0, 0, 0, 0)
+DIMENSIONLESS = Dimensions(0, 0, 0, 0, 0, 0, 0)
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestMatrix(unittest.TestCase):
+
+    def setUp(self):
+        si.environment(env_name='structural', top_level=False)
+        # a cantilever of EI = 1000 kNm2 and L = 2 m: the tip displacement and rotation
+        EI, L = 1000, 2
+        self.K = si.PhysicalMatrix.from_units([[12 * EI / L ** 3, -6 * EI / L ** 2], [-6 * EI / L ** 2, 4 * EI / L]],
+                                              rows=['kN', 'kNm'], columns=['1/m', '1'])
+        self.F = si.PhysicalVector.from_units([10, 0], ['kN', 'kNm'])
+
+    def test_vector(self):
+        self.assertEqual(len(self.F), 2)
+        self.assertEqual(self.F[0], 10 * si.kN)
+        self.assertEqual(list(self.F), [10 * si.kN, 0 * si.kNm])
+        self.assertEqual(self.F.to(['N', 'kNm']).tolist(), [10000.0, 0.0])
+        self.assertEqual((self.F * 2 - self.F)[0], 10 * si.kN)
+        # a Physical on either side
+        self.assertEqual((2 * si.m * self.F)[1], 0 * si.kNm * si.m)
+        self.assertEqual(list(si.m * self.F), list(self.F * si.m))
+        with self.assertRaises(ValueError):
+            self.F.to(['N', 'N'])
+        with self.assertRaises(ValueError):
+            self.F + si.PhysicalVector.from_units([10, 0], ['kN', 'kN'])
+
+        vector = si.PhysicalVector.from_physicals([1 * si.m, 0.5])
+        self.assertEqual(vector.dimensions, (LENGTH, DIMENSIONLESS))
+        self.assertEqual(vector[1], 0.5)
+
+    def test_matrix(self):
+        K = self.K
+        self.assertEqual(K.shape, (2, 2))
+        self.assertEqual(K[0, 0], 1500 * si.kN / si.m)
+        self.assertEqual(K[1, 0], -1500 * si.kN)
+        self.assertEqual(K[1, 1], 2000 * si.kNm)
+        self.assertEqual(K.to(['kN/m', 'kNm/m'], ['1', 'm']).tolist(), [[1500, -1500], [-1500, 2000]])
+        self.assertIsInstance(K.T[0, 1], Physical)
+        self.assertEqual((K + K * 2)[0, 0], 4500 * si.kN / si.m)
+        self.assertEqual((2 * si.m * K)[0, 0], 3000 * si.kN)
+        self.assertEqual((si.m * K).to(['kN', 'kNm'], ['1', 'm']).tolist(),
+                         (K * si.m).to(['kN', 'kNm'], ['1', 'm']).tolist())
+        with self.assertRaises(ValueError):
+            K + K * si.m
+        with self.assertRaises(ValueError):
+            K @ K
+
+    def test_solve(self):
+        u = self.K.solve(self.F)
+        self.assertEqual(u.dimensions, (LENGTH, DIMENSIONLESS))
+        # PL^3/3EI and PL^2/2EI
+        np.testing.assert_allclose(u.to(['m', '1']), [10 * 8 / 3000, 10 * 4 / 2000])
+
+        F = self.K @ u
+        self.assertEqual(F.dimensions, self.F.dimensions)
+        np.testing.assert_allclose(F.value, self.F.value, atol=1e-9)
+
+        np.testing.assert_allclose((self.K.inv() @ self.F).value, u.value)
+
+        with self.assertRaises(ValueError):
+            self.K.solve(si.PhysicalVector.from_units([10, 0], ['kN', 'kN']))
+        with self.assertRaises(ValueError):
+            self.K @ self.F
+
+
+if __name__ == '__main__':
+    unittest.main()
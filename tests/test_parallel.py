@@ -0,0 +1,72 @@
+import multiprocessing
+import pickle
+import unittest
+
+import simplesi as si
+from simplesi import Physical, PhysicalArray
+from simplesi.dimensions import Dimensions
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+def _moment(span):
+    # uses the units and the settings of the calling process
+    return (1.5 * si.kN_m * span ** 2 / 8).to('kNm')
+
+
+class TestPickle(unittest.TestCase):
+
+    def test_physical(self):
+        p = Physical(1.5, Dimensions(1, 1, -2, 0, 0, 0, 0), 1000, 'kN')
+        restored = pickle.loads(pickle.dumps(p))
+        self.assertEqual(restored, p)
+        self.assertIs(restored.dimensions, p.dimensions)
+        self.assertEqual((restored.conv_factor, restored.symbol), (1000, 'kN'))
+
+        # the Dimensions are written once
+        physicals = [Physical(float(x), Dimensions(0, 1, 0, 0, 0, 0, 0)) for x in range(100)]
+        self.assertEqual(pickle.loads(pickle.dumps(physicals)), physicals)
+        self.assertLess(len(pickle.dumps(physicals)), 100 * 20)
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_array(self):
+        a = PhysicalArray([1.0, 2.0], Dimensions(0, 1, 0, 0, 0, 0, 0))
+        restored = pickle.loads(pickle.dumps(a))
+        self.assertIsInstance(restored, PhysicalArray)
+        self.assertTrue(all(restored == a))
+
+
+class TestParallelMap(unittest.TestCase):
+
+    def setUp(self):
+        si.environment(env_name='structural', top_level=False)
+        self.to_fails = si.environment.settings['to_fails']
+        si.environment.settings['to_fails'] = 'raise'
+        self.spans = [x * si.m for x in (3, 4.5, 6)]
+
+    def tearDown(self):
+        si.environment.settings['to_fails'] = self.to_fails
+
+    def test_serial(self):
+        self.assertEqual(si.parallel_map(_moment, self.spans, workers=1), ['1.69 kNm', '3.80 kNm', '6.75 kNm'])
+        self.assertEqual(si.parallel_map(_moment, []), [])
+        with self.assertRaises(ValueError):
+            si.parallel_map(_moment, self.spans, workers=-1)
+
+    def test_processes(self):
+        with si.use_environment(settings={'significant_digits': 5}):
+            results = si.parallel_map(_moment, self.spans, workers=2, chunk_size=2,
+                                      mp_context=multiprocessing.get_context('spawn'))
+        self.assertEqual(results, ['1.6875 kNm', '3.7969 kNm', '6.75 kNm'])
+
+    def test_not_picklable(self):
+        # called in this process
+        results = si.parallel_map(lambda span: _moment(span), self.spans, workers=2)
+        self.assertEqual(results, ['1.69 kNm', '3.80 kNm', '6.75 kNm'])
+
+
+if __name__ == '__main__':
+    unittest.main()
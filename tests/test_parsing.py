@@ -0,0 +1,79 @@
+import unittest
+
+import simplesi as si
+from simplesi import parsing
+from simplesi.dimensions import Dimensions
+
+
+class TestParsing(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # J and Hz are defined in default, kN_m2 and kNm in structural
+        si.environment(env_name='default', top_level=False)
+        si.environment(env_name='structural', top_level=False)
+
+    def setUp(self):
+        self.to_fails = si.environment.settings['to_fails']
+        si.environment.settings['to_fails'] = 'raise'
+
+    def tearDown(self):
+        si.environment.settings['to_fails'] = self.to_fails
+
+    def test_parse_unit(self):
+        self.assertEqual(si.parse_unit('kN/m^2'), si.kN_m2)
+        self.assertEqual(si.parse_unit('kN/m²'), si.kN_m2)
+        self.assertEqual(si.parse_unit('kN m'), si.kNm)
+        self.assertEqual(si.parse_unit('kN·m'), si.kNm)
+        self.assertEqual(si.parse_unit('kg*m**2/s^2'), si.J)
+        self.assertEqual(si.parse_unit('1/s'), si.Hz)
+        self.assertEqual(si.parse_unit('s⁻¹'), si.Hz)
+        self.assertEqual(si.parse_unit('(kN/m)^2'), si.kN_m ** 2)
+        self.assertEqual(si.parse_unit('m^(1/2)').dimensions, Dimensions(0, 0.5, 0, 0, 0, 0, 0))
+        self.assertEqual(si.parse_unit('m^-2').dimensions, Dimensions(0, -2, 0, 0, 0, 0, 0))
+        self.assertEqual(si.parse_unit('kN*m/s').symbol, 'kN*m/s')
+
+        # dimensionsless
+        self.assertAlmostEqual(si.parse_unit('mm/m'), 0.001)
+
+    def test_parse(self):
+        self.assertEqual(si.parse('12.5 kN*m/s'), 12.5 * si.kNm / si.s)
+        self.assertEqual(si.parse('-3e2 mm'), -300 * si.mm)
+        self.assertEqual(si.parse('7'), 7.0)
+        self.assertEqual(si.parse('12.5 kN*m/s').symbol, 'kN*m/s')
+
+    def test_errors(self):
+        for expression in ('', 'kN/', 'kN^x', '(kN', 'kN)', 'foo/m', 'kN^(1/0)', 'kN $'):
+            with self.assertRaises(ValueError):
+                si.parse_unit(expression)
+        with self.assertRaises(ValueError):
+            si.parse_unit(3)
+        with self.assertRaises(ValueError):
+            si.parse('kN')
+
+    def test_cached(self):
+        compiled = si.environment.compile_unit('kN/m^3')
+        self.assertIs(si.environment.compile_unit('kN/m^3'), compiled)
+        self.assertIsInstance(compiled, parsing.UnitExpression)
+        self.assertEqual(compiled.factor, 1000)
+
+        # changing the units empties the cache
+        # a unit of its own dimensions, the print units of other tests are not affected
+        si.environment(env_dict={'parsing_candle': {"Dimension": [0, 0, 0, 0, 1, 0, 0], "Value": 5}})
+        self.assertIsNot(si.environment.compile_unit('kN/m^3'), compiled)
+        self.assertEqual(si.parse_unit('parsing_candle/m'), si.parsing_candle / si.m)
+
+    def test_to(self):
+        q = 2.5 * si.kN_m2
+        self.assertEqual(q.to('N/mm^2'), '0.0025 N/mm^2')
+        self.assertEqual(q.value_in('N/mm^2'), 0.0025)
+        self.assertEqual(q('kN/m^2').physical, q)
+        self.assertEqual(si.values_in([si.kN, 2 * si.kN], 'kg*m/s^2'), [1000, 2000])
+
+        # not the same dimensions
+        with self.assertRaises(ValueError):
+            q.to('kN/m')
+
+
+if __name__ == '__main__':
+    unittest.main()
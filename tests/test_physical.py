@@ -15,6 +15,23 @@ class TestPhysical(unittest.TestCase):
         with self.assertRaises(ValueError):
             Physical('5.0', Dimensions(1, 0, 0, 0, 0, 0, 0))
 
+    def test_trusted(self):
+        trusted = Physical._trusted(5.2, Dimensions(1, 0, 0, 0, 0, 0, 0), 1.0, None)
+        self.assertEqual(trusted, self.physical)
+        self.assertEqual(trusted.conv_factor, 1.0)
+        self.assertIsNone(trusted.symbol)
+
+        # no validation of the user input
+        from simplesi import environment
+        environment.settings['validation'] = 'trusted'
+        try:
+            Physical(5.2, Dimensions(1, 0, 0, 0, 0, 0, 0), conv_factor=-1)
+        finally:
+            environment.settings['validation'] = 'strict'
+
+        with self.assertRaises(ValueError):
+            Physical(5.2, Dimensions(1, 0, 0, 0, 0, 0, 0), conv_factor=-1)
+
     def test_neg(self):
         neg_physical = -self.physical
         self.assertEqual(neg_physical.value, -5.2)
@@ -0,0 +1,78 @@
+import math
+import unittest
+
+import simplesi as si
+from simplesi import Physical, PhysicalArray
+from simplesi.dimensions import Dimensions
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+LENGTH = Dimensions(0, 1, 0, 0, 0, 0, 0)
+
+
+class TestReductions(unittest.TestCase):
+
+    def setUp(self):
+        si.environment(env_name='structural', top_level=False)
+        self.lengths = [Physical(x, LENGTH) for x in (3.0, 1.0, 2.0, 1.0)]
+
+    def test_sum(self):
+        self.assertEqual(si.sum(self.lengths), Physical(7.0, LENGTH))
+        self.assertEqual(si.sum(self.lengths), sum(self.lengths))
+        self.assertEqual(si.sum([]), 0)
+        self.assertEqual(si.fsum([]), 0)
+
+        # compensated summation
+        values = [Physical(x, LENGTH) for x in (1e16, 1.0, -1e16)]
+        self.assertEqual(si.sum(values).value, 0.0)
+        self.assertEqual(si.fsum(values).value, 1.0)
+
+        self.assertEqual(si.mean(self.lengths), Physical(1.75, LENGTH))
+        with self.assertRaises(ValueError):
+            si.mean([])
+
+        # keeps the unit of the first one
+        self.assertEqual(si.sum([1 * si.kN, 2 * si.kN]).symbol, si.kN.symbol)
+
+    def test_dimensions(self):
+        for function in (si.sum, si.fsum, si.mean, si.min, si.max, si.sort, si.argmin, si.argmax, si.argsort):
+            with self.assertRaises(ValueError):
+                function([1 * si.m, 1 * si.kN])
+            with self.assertRaises(ValueError):
+                function([1 * si.m, 1])
+
+    def test_ordering(self):
+        self.assertIs(si.min(self.lengths), self.lengths[1])
+        self.assertIs(si.max(self.lengths), self.lengths[0])
+        self.assertEqual(si.argmin(self.lengths), 1)
+        self.assertEqual(si.argmax(self.lengths), 0)
+        self.assertEqual(si.argsort(self.lengths), [1, 3, 2, 0])
+        self.assertEqual(si.argsort(self.lengths, reverse=True), [0, 2, 1, 3])
+        self.assertEqual(si.sort(self.lengths), sorted(self.lengths))
+        with self.assertRaises(ValueError):
+            si.min([])
+
+    def test_key(self):
+        cases = [('ULS-1', 12 * si.kNm), ('ULS-2', 15.5 * si.kNm), ('SLS', 9 * si.kNm)]
+        self.assertEqual(si.max(cases, key=lambda x: x[1])[0], 'ULS-2')
+        self.assertEqual(si.argmin(cases, key=lambda x: x[1]), 2)
+        self.assertEqual([x[0] for x in si.sort(cases, key=lambda x: x[1], reverse=True)], ['ULS-2', 'ULS-1', 'SLS'])
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_array(self):
+        array = PhysicalArray.from_physicals(self.lengths)
+        self.assertEqual(si.sum(array), Physical(7.0, LENGTH))
+        self.assertEqual(si.fsum(array), Physical(7.0, LENGTH))
+        self.assertEqual(si.mean(array), Physical(1.75, LENGTH))
+        self.assertEqual(si.min(array), Physical(1.0, LENGTH))
+        self.assertEqual(si.argmax(array), 0)
+        self.assertEqual(si.argsort(array), si.argsort(self.lengths))
+        self.assertEqual(si.argsort(array, reverse=True), si.argsort(self.lengths, reverse=True))
+        self.assertEqual(list(si.sort(array).value), [1.0, 1.0, 2.0, 3.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
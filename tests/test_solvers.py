@@ -0,0 +1,94 @@
+import math
+import unittest
+
+import simplesi as si
+from simplesi import Physical
+
+
+def stress(h):
+    return 30 * si.kNm / (200 * si.mm * h ** 2 / 6)
+
+
+def capacity(h):
+    # can not be compiled: the comparison depends on the argument
+    return 200 * si.mm * h * 235 * si.MPa if h < 100 * si.mm else 200 * si.mm * 100 * si.mm * 235 * si.MPa
+
+
+class TestSolvers(unittest.TestCase):
+
+    def setUp(self):
+        si.environment(env_name='structural', top_level=False)
+
+    def test_solve(self):
+        h = si.solve(stress, 10 * si.mm, 200 * si.mm, target=235 * si.MPa)
+        self.assertIsInstance(h, Physical)
+        self.assertAlmostEqual(h.value, math.sqrt(6 * 30e3 / (0.2 * 235e6)), places=12)
+        self.assertEqual(h.symbol, (10 * si.mm).symbol)
+
+        h = si.solve(lambda h: capacity(h) - 2000 * si.kN, 1 * si.mm, 1 * si.m)
+        self.assertAlmostEqual(h.value, 2e6 / (0.2 * 235e6), places=12)
+        self.assertAlmostEqual(si.solve(lambda x: x * x - 2, 0, 2), math.sqrt(2), places=11)
+
+        with self.assertRaises(ValueError):
+            si.solve(stress, 100 * si.mm, 200 * si.mm, target=235 * si.MPa)
+        with self.assertRaises(ValueError):
+            si.solve(stress, 10 * si.mm, 200 * si.mm, target=235 * si.kN)
+        with self.assertRaises(ValueError):
+            si.solve(stress, 10 * si.mm, 200 * si.kN)
+        with self.assertRaises(ValueError):
+            si.solve(stress, 10 * si.mm, 200 * si.mm, xtol=1e-6)
+
+    def test_minimize(self):
+        x = si.minimize(lambda x: (x - 3 * si.m) ** 2 + 1 * si.m2, 10 * si.m, 0 * si.m)
+        self.assertAlmostEqual(x.value, 3, places=6)
+        self.assertAlmostEqual(si.minimize(lambda x: (x - 1) ** 4 + x, -5, 5), 1 - 0.25 ** (1 / 3), places=4)
+
+        x = si.minimize(lambda h: abs(stress(h) - 235 * si.MPa), 10 * si.mm, 200 * si.mm, xtol=1e-9 * si.m)
+        self.assertAlmostEqual(x.value, math.sqrt(6 * 30e3 / (0.2 * 235e6)), places=7)
+
+    def test_integrate(self):
+        moment = si.integrate(lambda x: 10 * si.kN_m * x / (4 * si.m), 0 * si.m, 4 * si.m)
+        self.assertEqual(moment, 20 * si.kN)
+        self.assertAlmostEqual(si.integrate(math.sin, 0, math.pi), 2, places=9)
+        self.assertAlmostEqual(si.integrate(math.sin, 0, 2 * math.pi), 0, places=9)
+        self.assertEqual(si.integrate(capacity, 1 * si.m, 1 * si.m), 0 * si.kN * si.m)
+        self.assertAlmostEqual(si.integrate(capacity, 0 * si.mm, 200 * si.mm).value, 705000, places=3)
+        self.assertAlmostEqual(si.integrate(capacity, 0 * si.mm, 200 * si.mm, compile=True).value, 705000, places=3)
+
+        with self.assertRaises(ValueError):
+            si.integrate(lambda x: 'x', 0, 1)
+        with self.assertRaises(ValueError):
+            si.integrate(lambda x: x if x > 0.5 else 1 * si.m, 0, 1)
+
+    def test_compile(self):
+        # the function is called with a Physical for every evaluation, unless compiled
+        arguments = []
+
+        def logged(h):
+            arguments.append(h)
+            return stress(h)
+
+        result = si.integrate(logged, 10 * si.mm, 200 * si.mm)
+        self.assertGreater(len(arguments), 100)
+        self.assertTrue(all(isinstance(h, Physical) for h in arguments))
+
+        count = len(arguments)
+        self.assertAlmostEqual(si.integrate(logged, 10 * si.mm, 200 * si.mm, compile=True).value, result.value,
+                               delta=1e-9 * result.value)
+        self.assertLess(len(arguments) - count, 10)
+
+        h = si.solve(stress, 10 * si.mm, 200 * si.mm, target=235 * si.MPa, compile=True)
+        self.assertAlmostEqual(h.value, math.sqrt(6 * 30e3 / (0.2 * 235e6)), places=12)
+        x = si.minimize(lambda x: (x - 3 * si.m) ** 2 + 1 * si.m2, 10 * si.m, 0 * si.m, compile=True)
+        self.assertAlmostEqual(x.value, 3, places=6)
+
+        # errors other than those of expressions are not hidden
+        def broken(h):
+            return {}['h'] if isinstance(h, si.expr.Expression) else stress(h)
+
+        with self.assertRaises(KeyError):
+            si.integrate(broken, 10 * si.mm, 200 * si.mm, compile=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
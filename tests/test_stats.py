@@ -0,0 +1,89 @@
+import threading
+import unittest
+
+import simplesi as si
+from simplesi import Physical, PhysicalArray, stats
+from simplesi.environment import Environment
+
+
+class TestStats(unittest.TestCase):
+
+    def setUp(self):
+        si.environment(env_name='structural', top_level=False)
+        self.to_fails = si.environment.settings['to_fails']
+        si.environment.settings['to_fails'] = 'raise'
+
+    def tearDown(self):
+        si.environment.settings['to_fails'] = self.to_fails
+        stats.disable()
+        stats.reset()
+
+    def test_disabled(self):
+        original = Physical.__mul__
+        stats.enable()
+        self.assertIsNot(Physical.__mul__, original)
+        stats.disable()
+
+        # the original methods are back
+        self.assertIs(Physical.__mul__, original)
+        self.assertIs(Physical.__dict__['_trusted'].__func__, Physical._trusted.__func__)
+        counts = stats.snapshot()['counts']
+        2 * si.kN
+        self.assertEqual(stats.snapshot()['counts'], counts)
+        self.assertFalse(stats.snapshot()['enabled'])
+
+    def test_counts(self):
+        stats.enable()
+        a = 2 * si.kN * (3 * si.m)
+        a < 5 * si.kNm
+        with self.assertRaises(ValueError):
+            si.kN + si.m
+        str(a)
+        with self.assertRaises(ValueError):
+            a.to('kN')
+        Physical(1, (0, 1, 0, 0, 0, 0, 0))
+
+        snapshot = stats.snapshot()
+        counts = snapshot['counts']
+        self.assertEqual(counts['operator.*'], 4)
+        self.assertEqual(counts['operator.<'], 1)
+        self.assertEqual(counts['operator.+'], 1)
+        self.assertEqual(counts['mismatch.+'], 1)
+        # the message of the mismatch prints both operands
+        self.assertEqual(counts['str'], 3)
+        self.assertEqual(counts['to'], 4)
+        self.assertEqual(counts['to.failed'], 1)
+        self.assertEqual(counts['construct'], 1)
+        self.assertGreaterEqual(counts['construct.trusted'], 4)
+        self.assertGreater(snapshot['times']['operator.*'], 0)
+
+    def test_environment(self):
+        stats.enable()
+        # a private environment, the units of si.environment loaded by other tests are kept. Lazily loaded, only the
+        # base units are pushed to the module.
+        env = Environment(si_base_units=si.base_units, preferred_units={}, settings=dict(si.environment_settings))
+        env(env_name='structural', lazy=True)
+        counts = stats.snapshot()['counts']
+        for phase in ('read', 'build', 'push'):
+            self.assertIn('environment.' + phase, counts)
+
+        env(env_dict={'stats_rod': {"Dimension": [0, 1, 0, 0, 0, 0, 0], "Value": 5.0292}}, lazy=True)
+        self.assertIn('environment.validate', stats.snapshot()['counts'])
+
+    def test_threads(self):
+        stats.enable()
+
+        def work():
+            for _ in range(1000):
+                si.kN * si.m
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(stats.snapshot()['counts']['operator.*'], 4000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import io
+import unittest
+
+import simplesi as si
+from simplesi import PhysicalArray
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+def moment(span, q, n=1):
+    return q * span ** 2 / 8 * n
+
+
+def branching(span, q):
+    # not vectorizable: the truth value of an array is ambiguous
+    return q * span if span > 5 * si.m else 2 * q * span
+
+
+class TestSweep(unittest.TestCase):
+
+    def setUp(self):
+        si.environment(env_name='structural', top_level=False)
+        self.spans = si.linspace(4 * si.m, 8 * si.m, 3)
+        self.loads = [1 * si.kN_m, 2 * si.kN_m]
+
+    def test_linspace(self):
+        self.assertEqual(list(self.spans), [4 * si.m, 6 * si.m, 8 * si.m])
+        self.assertEqual(list(si.linspace(0, 1, 3)), [0.0, 0.5, 1.0])
+        self.assertEqual(len(si.linspace(0 * si.m, 1 * si.m, 4, endpoint=False)), 4)
+        with self.assertRaises(ValueError):
+            si.linspace(1 * si.m, 1 * si.kN)
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_vectorized(self):
+        grid = si.sweep(moment, span=self.spans, q=self.loads, n=[1, 2, 3, 4], vectorized=True)
+        self.assertEqual(grid.shape, (3, 2, 4))
+        self.assertEqual(grid.names, ('span', 'q', 'n'))
+        self.assertIsInstance(grid.values, PhysicalArray)
+        self.assertEqual(grid[2, 0, 3], 32 * si.kNm)
+        self.assertEqual(grid.at(span=6 * si.m, q=2 * si.kN_m, n=1), 9 * si.kNm)
+        with self.assertRaises(ValueError):
+            grid.at(span=5 * si.m, q=2 * si.kN_m, n=1)
+
+        with self.assertRaises(ValueError):
+            si.sweep(branching, span=self.spans, q=self.loads, vectorized=True)
+
+    def test_one_by_one(self):
+        grid = si.sweep(branching, span=self.spans, q=self.loads, workers=1)
+        expected = [[branching(s, q) for q in self.loads] for s in self.spans]
+        self.assertEqual(grid.shape, (3, 2))
+        for i in range(3):
+            for j in range(2):
+                self.assertEqual(grid[i, j], expected[i][j])
+
+        # in this process by default, and for functions that can not be sent to worker processes
+        self.assertEqual(si.sweep(branching, span=self.spans, q=self.loads)[2, 1], expected[2][1])
+        grid = si.sweep(lambda span, q: branching(span, q), span=self.spans, q=self.loads, workers=2)
+        self.assertEqual(grid[2, 1], expected[2][1])
+
+        # the same results evaluated with arrays
+        vectorized = si.sweep(moment, span=self.spans, q=self.loads)
+        one_by_one = si.sweep(moment, span=self.spans, q=self.loads, vectorized=False, workers=1)
+        self.assertEqual(vectorized[1, 1], one_by_one[1, 1])
+
+    def test_file(self):
+        out = io.StringIO()
+        result = si.sweep(branching, span=self.spans, q=2 * si.kN_m, file=out, chunk_size=2, workers=1,
+                          units={'span': 'm', 'q': 'kN/m', 'result': 'kN'})
+        self.assertIsNone(result)
+        self.assertEqual(out.getvalue().replace('\r', '').splitlines(), [
+            'span [m],q [kN/m],result [kN]',
+            '4.0,2.0,16.0',
+            '6.0,2.0,12.0',
+            '8.0,2.0,16.0',
+        ])
+
+        columns = si.sweep(moment, span=self.spans, q=self.loads, workers=1).columns()
+        self.assertEqual(list(columns), ['span', 'q', 'result'])
+        self.assertEqual(len(columns['result']), 6)
+
+        with self.assertRaises(ValueError):
+            si.sweep(moment, result=self.spans, q=self.loads, file=io.StringIO())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+
+import simplesi as si
+from simplesi import Physical, PhysicalArray
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestTable(unittest.TestCase):
+
+    def setUp(self):
+        si.environment(env_name='structural', top_level=False)
+        self.spans = [6 * si.m, 2 * si.m, 4 * si.m]
+        self.moments = [36 * si.kNm, 4 * si.kNm, 16 * si.kNm]
+
+    def test_linear(self):
+        table = si.Table(self.spans, values=self.moments)
+        self.assertEqual(table.shape, (3,))
+        self.assertEqual(table.axes[0].to('m').tolist(), [2, 4, 6])
+        self.assertEqual(table.values.to('kNm').tolist(), [4, 16, 36])
+
+        self.assertEqual(table(3 * si.m), 10 * si.kNm)
+        self.assertEqual(table(6000 * si.mm), 36 * si.kNm)
+        result = table(PhysicalArray.from_unit([2, 5], si.m))
+        self.assertIsInstance(result, PhysicalArray)
+        self.assertEqual(result.to('kNm').tolist(), [4, 26])
+        self.assertEqual(table([3 * si.m, 4 * si.m]).to('kNm').tolist(), [10, 16])
+
+        with self.assertRaises(ValueError):
+            table(1 * si.m)
+        with self.assertRaises(ValueError):
+            table(PhysicalArray.from_unit([2, 7], si.m))
+        with self.assertRaises(ValueError):
+            table(3 * si.kN)
+        with self.assertRaises(ValueError):
+            table(3)
+        self.assertEqual(si.Table(self.spans, values=self.moments, extrapolate=True)(8 * si.m), 56 * si.kNm)
+
+    def test_construction(self):
+        with self.assertRaises(ValueError):
+            si.Table(self.spans, values=self.moments[:2])
+        with self.assertRaises(ValueError):
+            si.Table([1 * si.m, 1 * si.m], values=[1, 2])
+        with self.assertRaises(ValueError):
+            si.Table(self.spans, values=[1 * si.kN, 2 * si.kN, 3 * si.m])
+        with self.assertRaises(ValueError):
+            si.Table(self.spans, values=self.moments, method='spline')
+
+        numbers = si.Table([0, 1], values=[1, 3])
+        self.assertEqual(numbers(0.25), 1.5)
+        self.assertIsInstance(numbers(0.25), float)
+
+    def test_cubic(self):
+        # a step: the monotone cubic does not overshoot
+        table = si.Table([0, 1, 2, 3, 4], values=[0 * si.kN, 0 * si.kN, 1 * si.kN, 1 * si.kN, 1 * si.kN],
+                         method='cubic')
+        values = table(np.linspace(0, 4, 41)).value
+        self.assertTrue(np.all(np.diff(values) >= 0))
+        self.assertTrue(np.all((values >= 0) & (values <= 1000)))
+        self.assertAlmostEqual(table(1.5).value, 500)
+        self.assertAlmostEqual(table(1.25).value, table(np.array([1.25])).value[0])
+
+        # reproduces straight lines
+        line = si.Table([0, 1, 3], values=[0, 2, 6], method='cubic')
+        self.assertAlmostEqual(line(2.5), 5)
+
+    def test_two_axes(self):
+        spans = [2 * si.m, 4 * si.m]
+        loads = [1 * si.kN_m, 2 * si.kN_m, 3 * si.kN_m]
+        values = [[q * L ** 2 / 8 for q in loads] for L in spans]
+        table = si.Table(spans, loads, values=values)
+        self.assertEqual(table.shape, (2, 3))
+        self.assertEqual(table(4 * si.m, 1.5 * si.kN_m), 3 * si.kNm)
+        self.assertEqual(table(3 * si.m, 2 * si.kN_m), 2.5 * si.kNm)
+        result = table(PhysicalArray.from_unit([2, 4], si.m), 3 * si.kN_m)
+        self.assertEqual(result.to('kNm').tolist(), [1.5, 6])
+
+        cubic = si.Table(spans, loads, values=values, method='cubic')
+        self.assertIsInstance(cubic(3 * si.m, 2 * si.kN_m), Physical)
+        self.assertAlmostEqual(cubic(4 * si.m, 1.5 * si.kN_m).value, 3000)
+        self.assertEqual(cubic(PhysicalArray.from_unit([2, 4], si.m), 2 * si.kN_m).to('kNm').tolist(), [1, 4])
+
+        with self.assertRaises(ValueError):
+            table(3 * si.m)
+
+
+if __name__ == '__main__':
+    unittest.main()